@@ -0,0 +1,37 @@
+import threading
+from collections import deque
+
+
+class ActivityLog:
+    """Bounded, thread-safe buffer of log lines waiting to be displayed
+
+    Any thread may ``append``; the UI thread periodically ``drain``s the
+    buffer and writes the batch to the widget in one go. Only the newest
+    ``capacity`` lines are kept, since older ones would be trimmed from the
+    widget anyway; ``dropped`` counts lines that never reached it.
+    """
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self._pending = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.total = 0
+        self.dropped = 0
+
+    def append(self, line):
+        """Queues one line for display, evicting the oldest pending line if full"""
+        with self._lock:
+            if len(self._pending) == self.capacity:
+                self.dropped += 1
+            self._pending.append(line)
+            self.total += 1
+
+    def drain(self):
+        """Returns and forgets every pending line, oldest first"""
+        with self._lock:
+            lines = list(self._pending)
+            self._pending.clear()
+        return lines
+
+    def __len__(self):
+        return len(self._pending)
@@ -1,64 +1,230 @@
 import time
-import pyautogui
-import pygetwindow as gw
-from datetime import datetime, timedelta
+# Start-up timing is measured from here, before the heavier imports
+STARTED_AT = time.perf_counter()
+import argparse
+from datetime import datetime
+import queue
+import signal
 import threading
 import sys
 
+from backends import create_backends, RecordingBackend, INPUT_BACKENDS
+from commands import Command, MIN_INTERVAL_MINUTES, load_commands, diff_commands
+from config import Config, get_config, ensure_command_ids
+from scheduler import Scheduler
+from schedule_state import ScheduleState
+from input_arbiter import InputArbiter
+from window_resolver import WindowResolver, WindowMatcher
+from typing_engine import TypingEngine, ClipboardPaster, DELIVERY_TYPE, DELIVERY_PASTE
+from simulation import Simulator, DAY
+from capacity import plan_capacity, Overheads
+from metrics import (ExecutionMetrics, PhaseTimer, PHASE_RESOLVE, PHASE_FOCUS, PHASE_OPEN, PHASE_TYPE,
+                     PHASE_SUBMIT, RESULT_OK, RESULT_WINDOW_NOT_FOUND, RESULT_FOCUS_FAILED, RESULT_WRITE_FAILED)
+
 class WindowTextWriter:
-    def __init__(self):
+    # Longest wait for room in a full input queue before checking for a stop
+    SUBMIT_RETRY = 1.0
+    
+    def __init__(self, input_backend=None, window_backend=None, schedule_state=None, input_queue_size=64):
         self.window_title = ""
         self.text_configs = []
         self.running = False
         self.typing_speed = 0.5
+        self.focus_timeout = 1.0  # Max seconds to wait for the window to come to front
+        self.open_delay = 0.5  # Pause after the opening Enter for the console to open
+        self.inter_message_gap = 0.5  # Pause between commands typed into the same window
+        # With a ScheduleState, a restart resumes the previous run's schedule
+        self.scheduler = Scheduler(state=schedule_state)
+        
+        # Input/window backends, pyautogui + pygetwindow unless injected
+        if input_backend is None or window_backend is None:
+            default_input, default_window = create_backends('pyautogui', pause=0.5)
+            input_backend = input_backend or default_input
+            window_backend = window_backend or default_window
+        self.input_backend = input_backend
+        self.window_backend = window_backend
+        self.typing_engine = TypingEngine(self.input_backend.write_char,
+                                          paster=ClipboardPaster(self.input_backend))
+        self.window_resolver = WindowResolver(self.window_backend)
+        self.matchers = {}
+        # Single thread that performs all focus changes and keystrokes
+        self.input_arbiter = InputArbiter(input_queue_size)
+        # Time spent in each phase of every execution
+        self.metrics = ExecutionMetrics()
+        self.metrics.add_histogram('fire_lateness_seconds', "Delay between a command's slot and its fire",
+                                   self.scheduler.lateness)
+        self.metrics.add_histogram('input_queue_wait_seconds', "Time batches wait for the input arbiter",
+                                   self.input_arbiter.wait_times)
+        # Config whose settings.json is followed while running, if any
+        self.watched_config = None
+        self.delivery_mode = DELIVERY_TYPE  # For commands without their own
+        self.quiet = False  # Only report errors, for unattended runs
+        self.interrupted = False  # Stopped by Ctrl+C
         
-        # PyAutoGUI Configuration
-        pyautogui.FAILSAFE = True
-        pyautogui.PAUSE = 0.5
+        # Start-up latency: from started_at to the first keystroke, minus the
+        # time spent waiting for the first window to come to the front
+        self.started_at = STARTED_AT
+        self.first_keystroke_at = None
+        self.first_focus_wait = 0.0
+    
+    def report(self, message):
+        """Prints routine progress, unless running quietly"""
+        if not self.quiet:
+            print(message)
+    
+    def load_settings(self, config):
+        """Takes timing, delivery and schedule settings from a Config"""
+        self.focus_timeout = config.get_focus_timeout()
+        self.open_delay = config.get_open_delay()
+        self.inter_message_gap = config.get_inter_message_gap()
+        self.delivery_mode = config.get_delivery_mode()
+        self.typing_engine.paste_threshold = config.get_paste_threshold()
+        self.scheduler.schedule_mode = config.get_schedule_mode()
+        self.scheduler.missed_fire_policy = config.get_missed_fire_policy()
+        self.scheduler.misfire_grace = config.get_misfire_grace()
+    
+    def capacity_plan(self, horizon=DAY):
+        """Plans the keyboard load of the configured commands with the overheads measured so far"""
+        return plan_capacity(self.text_configs, self.typing_speed, self.open_delay, self.inter_message_gap,
+                             Overheads.from_metrics(self.metrics), self.delivery_mode,
+                             self.typing_engine.paste_threshold, self.scheduler.misfire_grace, horizon)
+    
+    def warn_if_overloaded(self):
+        """Prints a warning when the commands cannot all run on time; returns the plan"""
+        plan = self.capacity_plan()
+        if not plan.feasible:
+            print("WARNING: the schedule is overloaded", file=sys.stderr)
+            for problem in plan.problems():
+                print(f"  {problem}", file=sys.stderr)
+            for line in plan.summary().splitlines():
+                print(f"  {line}", file=sys.stderr)
+        return plan
+    
+    def startup_ms(self):
+        """Milliseconds from start-up to the first keystroke, excluding the focus wait"""
+        if self.first_keystroke_at is None:
+            return None
+        return (self.first_keystroke_at - self.started_at - self.first_focus_wait) * 1000
     
     def configure(self, window_title, text_configs, typing_speed=0.5):
-        """Configures the script with necessary parameters"""
+        """Configures the script with necessary parameters
+        
+        ``text_configs`` are Commands, or command entries as stored in
+        settings.json, which are validated here, once; invalid ones are
+        reported and skipped. Entries without an id get one derived from
+        their content, so the same commands resume their schedule in the
+        next run.
+        """
         self.window_title = window_title
-        self.text_configs = text_configs
+        if all(isinstance(config, Command) for config in text_configs):
+            self.text_configs = list(text_configs)
+        else:
+            self.text_configs, errors = load_commands(ensure_command_ids(text_configs))
+            for error in errors:
+                print(f"Skipping invalid command: {error}")
         self.typing_speed = typing_speed
+        self.compile_matchers()
     
-    def find_window(self):
-        """Finds and returns the window by title"""
+    def update_commands(self, commands, diff=None):
+        """Swaps in a new list of Commands, touching only what changed
+        
+        Unchanged commands keep their place in the schedule; see
+        ``Scheduler.apply_changes``. ``diff`` is what changed, when already
+        known; otherwise the lists are compared. Returns the ``CommandDiff``.
+        """
+        previous = self.text_configs
+        self.text_configs = commands
+        if diff is None:
+            diff = diff_commands(previous, commands)
+        for config in diff.removed:
+            self.matchers.pop(id(config), None)
+        for config, _ in diff.changed:
+            self.matchers.pop(id(config), None)
+        if self.running:
+            self.scheduler.apply_changes(diff)
+        else:
+            for config in diff.removed:
+                self.scheduler.cancel(config)
+        return diff
+    
+    def watch_config(self, config):
+        """Follows the commands in settings.json while running"""
+        def on_reload():
+            diff = self.update_commands(config.get_commands(enabled_only=True), config.take_reload_diff())
+            if diff:
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] settings.json changed: "
+                      f"{len(diff.added)} added, {len(diff.removed)} removed, {len(diff.changed)} changed")
+        self.watched_config = config
+        config.watch(on_reload)
+    
+    def compile_matchers(self):
+        """Compiles the window matcher of every command once"""
+        self.matchers = {}
+        for config in self.text_configs:
+            self.matchers[id(config)] = self.compile_matcher(config)
+    
+    def compile_matcher(self, text_config):
+        """Compiles a command's window spec, falling back to the window title"""
         try:
-            windows = gw.getWindowsWithTitle(self.window_title)
-            if windows:
-                return windows[0]
-            return None
+            return WindowMatcher.from_spec(text_config.window, self.window_title)
+        except ValueError as e:
+            print(f"Invalid window matcher for '{text_config.text}': {e}")
+            return WindowMatcher(self.window_title)
+    
+    def matcher_for(self, text_config):
+        """Returns the compiled window matcher of a command"""
+        matcher = self.matchers.get(id(text_config))
+        if matcher is None:
+            matcher = self.matchers[id(text_config)] = self.compile_matcher(text_config)
+        return matcher
+    
+    def find_window(self, text_config):
+        """Returns the command's target window, reusing the cached one while it is valid"""
+        try:
+            return self.window_resolver.resolve(self.matcher_for(text_config))
         except Exception as e:
             print(f"Error searching for window: {e}")
             return None
     
     def focus_window(self, window):
-        """Focuses the specified window"""
+        """Focuses the specified window, waiting only until it is in front"""
         try:
-            if window.isMinimized:
-                window.restore()
-            window.activate()
-            time.sleep(1)
-            return True
+            return self.window_backend.focus(window, self.focus_timeout)
         except Exception as e:
             print(f"Error focusing window: {e}")
             return False
     
-    def write_text(self, text):
-        """Writes text in the active window character by character"""
+    def write_text(self, text, delivery=DELIVERY_TYPE, timer=None):
+        """Writes text in the active window by typing or pasting it
+        
+        The open, type and submit phases are charged to ``timer`` if given.
+        """
+        if timer is None:
+            timer = PhaseTimer()
         try:
+            if self.first_keystroke_at is None:
+                self.first_keystroke_at = time.perf_counter()
+            
             # Press Enter to open the console
-            pyautogui.press('enter')
-            time.sleep(0.5)  # Pause for console to open
+            self.input_backend.press('enter')
+            time.sleep(self.open_delay)  # Pause for console to open
+            timer.mark(PHASE_OPEN)
             
-            # Write text character by character with configurable delay
-            for char in text:
-                pyautogui.write(char)
-                time.sleep(self.typing_speed)  # Configurable pause between each character
+            # Type paced to the configured speed, or paste in one chord
+            result = self.typing_engine.deliver(text, self.typing_speed, delivery, lambda: self.running)
+            timer.mark(PHASE_TYPE)
+            if result.fallback:
+                print("Paste rejected, typed instead")
+            if not result.completed:
+                return False
+            if result.method == DELIVERY_PASTE:
+                self.report(f"Pasted {result.chars} chars in {result.elapsed * 1000:.1f} ms")
+            else:
+                self.report(f"Typed {result.summary()}")
             
             # Press Enter to send the command
-            pyautogui.press('enter')
+            self.input_backend.press('enter')
+            timer.mark(PHASE_SUBMIT)
             
             return True
         except Exception as e:
@@ -67,85 +233,135 @@ class WindowTextWriter:
     
     def execute_text_write(self, text_config):
         """Executes the writing of a specific text"""
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] Executing: {text_config['text']}")
+        return self.execute_batch([text_config])[0]
+    
+    def execute_batch(self, text_configs):
+        """Executes commands due together, grouped by target window
+
+        Each window is looked up and focused once and its commands are typed
+        back to back, separated by inter_message_gap. Returns one success
+        flag per command, in order.
+        """
+        self.window_resolver.begin_tick()
+        groups = {}
+        for index, text_config in enumerate(text_configs):
+            groups.setdefault(self.matcher_for(text_config).key, []).append(index)
         
-        window = self.find_window()
-        if not window:
-            print(f"Window '{self.window_title}' not found")
-            return False
+        results = [False] * len(text_configs)
+        for indexes in groups.values():
+            if not self.running:
+                break
+            # The lookup is charged to the first command of the window
+            timer = PhaseTimer()
+            window = self.find_window(text_configs[indexes[0]])
+            timer.mark(PHASE_RESOLVE)
+            if not window:
+                for index in indexes:
+                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Executing: {text_configs[index].text}")
+                    print(f"Window '{self.matcher_for(text_configs[index])}' not found")
+                    self.metrics.record(text_configs[index], timer, RESULT_WINDOW_NOT_FOUND)
+                    timer = PhaseTimer()
+                continue
+            for position, index in enumerate(indexes):
+                if not self.running:
+                    break
+                if position:
+                    time.sleep(self.inter_message_gap)
+                    timer = PhaseTimer()
+                results[index] = self.write_to_window(text_configs[index], window, timer)
+        return results
+    
+    def write_to_window(self, text_config, window, timer=None):
+        """Focuses an already resolved window and writes one command into it"""
+        self.report(f"[{datetime.now().strftime('%H:%M:%S')}] Executing: {text_config.text}")
+        if timer is None:
+            timer = PhaseTimer()
         
-        if not self.focus_window(window):
-            print("Could not focus the window")
+        # Returns immediately when the window is still in front
+        focused = self.focus_window(window)
+        timer.mark(PHASE_FOCUS)
+        if not focused:
+            print(f"Could not focus the window for: {text_config.text}")
+            self.metrics.record(text_config, timer, RESULT_FOCUS_FAILED)
             return False
+        if self.first_keystroke_at is None:
+            self.first_focus_wait = timer.durations[PHASE_FOCUS]
         
-        if self.write_text(text_config['text']):
-            print(f"Text written successfully: {text_config['text']}")
+        if self.write_text(text_config.text, text_config.delivery or self.delivery_mode, timer):
+            self.metrics.record(text_config, timer, RESULT_OK)
+            self.report(f"Text written successfully: {text_config.text} "
+                        f"({timer.total_ms():.0f} ms, {timer.breakdown()})")
             return True
         else:
-            print(f"Error writing: {text_config['text']}")
+            self.metrics.record(text_config, timer, RESULT_WRITE_FAILED)
+            print(f"Error writing: {text_config.text}")
             return False
     
-    def start(self):
-        """Starts the continuous process with multiple threads for different intervals"""
+    def start(self, once=False):
+        """Starts the continuous process with multiple threads for different intervals
+        
+        With ``once``, every enabled command is sent a single time and the
+        call returns without touching the saved schedule.
+        """
         self.running = True
-        print("=" * 50)
-        print("    WINDOWS AUTO TEXT WRITER v0.1 - STARTING")
-        print("=" * 50)
-        print(f"Target window: {self.window_title}")
-        print(f"Configured texts: {len(self.text_configs)}")
-        print("Press Ctrl+C to stop")
-        print("=" * 50)
-        print()
+        self.report("=" * 50)
+        self.report("    WINDOWS AUTO TEXT WRITER v0.1 - STARTING")
+        self.report("=" * 50)
+        self.report(f"Target window: {self.window_title}")
+        self.report(f"Configured texts: {len(self.text_configs)}")
+        self.report("Press Ctrl+C to stop")
+        self.report("=" * 50)
+        self.report("")
         
-        # Execute all enabled texts immediately at startup
-        print("=== INITIAL EXECUTION ===")
+        # Commands that fired in an earlier run resume their schedule; the
+        # rest execute immediately as one batch, which anchors theirs
+        self.report("=== INITIAL EXECUTION ===")
+        self.scheduler.clear()
+        enabled_configs = []
         for config in self.text_configs:
-            if config.get('enabled', True):
-                self.execute_text_write(config)
-                time.sleep(2)  # Pause between texts
+            if config.enabled:
+                enabled_configs.append(config)
             else:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] Skipping disabled command: {config['text']}")
-        print("=== INITIAL EXECUTION COMPLETED ===")
-        print()
-        
-        # Initialize next executions after initial execution
-        now = datetime.now()
-        for config in self.text_configs:
-            config['next_execution'] = now + timedelta(minutes=config['interval_minutes'])
+                self.report(f"[{datetime.now().strftime('%H:%M:%S')}] Skipping disabled command: {config.text}")
+        self.input_arbiter.start()
+        if once:
+            fired_at = self.scheduler.clock()
+            initial_batch = [(config, fired_at) for config in enabled_configs]
+        else:
+            initial_batch = self.scheduler.resume(enabled_configs)
+            if len(initial_batch) < len(enabled_configs):
+                self.report(f"Resumed {len(enabled_configs) - len(initial_batch)} commands from the previous run")
+        if initial_batch:
+            initial_job = self.submit_batch(initial_batch)
+            if initial_job is not None:
+                initial_job.done.wait()
+        self.report("=== INITIAL EXECUTION COMPLETED ===")
+        self.report("")
+        if once:
+            self.running = False
         
+        self.interrupted = False
+        ctrl_c_handler = install_ctrl_c_handler(self.interrupt)
         try:
             while self.running:
-                now = datetime.now()
-                
-                # Check which texts should be executed (only enabled ones)
-                for config in self.text_configs:
-                    if config.get('enabled', True) and now >= config['next_execution']:
-                        self.execute_text_write(config)
-                        config['next_execution'] = now + timedelta(minutes=config['interval_minutes'])
+                if not self.quiet:
+                    self.show_next_executions()
                 
-                # Show next executions (only enabled commands)
-                print(f"[{now.strftime('%H:%M:%S')}] Next executions:")
-                for config in self.text_configs:
-                    if config.get('enabled', True):
-                        remaining = config['next_execution'] - now
-                        minutes_left = int(remaining.total_seconds() / 60)
-                        print(f"  '{config['text']}' in {minutes_left} minutes")
-                    else:
-                        print(f"  '{config['text']}' [DISABLED]")
-                
-                # Wait 1 minute before next check
-                print("Waiting 1 minute...")
-                for _ in range(60):
-                    if not self.running:
-                        break
-                    time.sleep(1)
+                # Sleep until the earliest command is due; the arbiter
+                # thread types the batch while this one keeps scheduling
+                self.report("Waiting for next execution...")
+                due_commands = self.scheduler.wait(lambda: self.running)
+                if due_commands:
+                    self.submit_batch(due_commands)
+            if self.interrupted:
+                raise KeyboardInterrupt
                     
         except KeyboardInterrupt:
-            print("\n" + "=" * 50)
-            print("    SCRIPT STOPPED BY USER")
-            print("=" * 50)
-            print("  Developed by JIATech - johndev@jiacode.dev")
-            print("=" * 50)
+            self.report("\n" + "=" * 50)
+            self.report("    SCRIPT STOPPED BY USER")
+            self.report("=" * 50)
+            self.report("  Developed by JIATech - johndev@jiacode.dev")
+            self.report("=" * 50)
             self.running = False
         except Exception as e:
             print(f"\nError in main loop: {e}")
@@ -153,10 +369,87 @@ class WindowTextWriter:
             print("  Developed by JIATech - johndev@jiacode.dev")
             print("=" * 50)
             self.running = False
+        finally:
+            remove_ctrl_c_handler(ctrl_c_handler)
+            if self.watched_config is not None:
+                self.watched_config.stop_watching()
+            self.input_arbiter.stop(timeout=self.focus_timeout)
+    
+    def submit_batch(self, due_commands):
+        """Queues due commands on the input arbiter as one batch
+        
+        Blocks while the arbiter queue is full. Commands that still exist
+        are rescheduled once the batch has run. Returns the job, or None if
+        execution stopped before there was room.
+        """
+        def reschedule(job):
+            if self.running:
+                live = {id(config) for config in self.text_configs}
+                for config, due in due_commands:
+                    if id(config) in live:
+                        self.scheduler.reschedule(config, due)
+        configs = [config for config, _ in due_commands]
+        while self.running:
+            try:
+                return self.input_arbiter.submit(self.execute_batch, configs, on_done=reschedule,
+                                                 timeout=self.SUBMIT_RETRY)
+            except queue.Full:
+                continue
+        return None
+    
+    def show_next_executions(self):
+        """Prints the time left for every configured command"""
+        now = self.scheduler.clock()
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] Next executions:")
+        for config in self.text_configs:
+            due = self.scheduler.due_time(config)
+            if config.enabled and due is not None:
+                minutes_left = int((due - now) / 60)
+                print(f"  '{config.text}' in {minutes_left} minutes")
+            else:
+                print(f"  '{config.text}' [DISABLED]")
+        print(f"Lateness: {self.scheduler.lateness.summary()}")
+        print(f"Window cache: {self.window_resolver.summary()}")
+        print(f"Input queue: {self.input_arbiter.summary()}")
+        print(f"Phases: {self.metrics.summary()}")
     
     def stop(self):
         """Stops the process"""
         self.running = False
+        self.scheduler.interrupt()
+    
+    def interrupt(self):
+        """Stops the process on Ctrl+C"""
+        self.interrupted = True
+        self.stop()
+
+
+def install_ctrl_c_handler(callback):
+    """Calls ``callback`` instead of raising KeyboardInterrupt on Ctrl+C in a Windows console
+    
+    Lock waits cannot be interrupted by Ctrl+C on Windows, so the main thread
+    blocked in Scheduler.wait would otherwise only notice it when the next
+    command is due. Returns the handler for remove_ctrl_c_handler, or None
+    on other platforms, where the wait is interrupted as usual.
+    """
+    if sys.platform != 'win32':
+        return None
+    import ctypes
+    def on_event(event):
+        if event != 0:  # Only CTRL_C_EVENT; Ctrl+Break and closing keep their default
+            return False
+        callback()
+        return True
+    handler = ctypes.WINFUNCTYPE(ctypes.c_int, ctypes.c_uint)(on_event)
+    ctypes.windll.kernel32.SetConsoleCtrlHandler(handler, True)
+    return handler
+
+
+def remove_ctrl_c_handler(handler):
+    """Restores the default Ctrl+C handling"""
+    if handler is not None:
+        import ctypes
+        ctypes.windll.kernel32.SetConsoleCtrlHandler(handler, False)
 
 
 def get_user_configuration():
@@ -296,11 +589,198 @@ def get_user_configuration():
         print("\n\nScript cancelled by user")
         sys.exit(0)
 
-def main():
+def parse_command(value):
+    """Parses a ``MINUTES:TEXT`` command-line argument into a command entry"""
+    minutes, separator, text = value.partition(':')
+    try:
+        interval = float(minutes)
+    except ValueError:
+        interval = 0
+    if not separator or interval <= 0 or not text.strip():
+        raise argparse.ArgumentTypeError(f"expected MINUTES:TEXT, got {value!r}")
+    if interval < MIN_INTERVAL_MINUTES:
+        raise argparse.ArgumentTypeError(f"MINUTES must be at least one second ({MIN_INTERVAL_MINUTES:.4f}), "
+                                         f"got {minutes!r}")
+    return {"text": text, "interval_minutes": int(interval) if interval.is_integer() else interval}
+
+
+def parse_args(argv):
+    """Parses the command line of the non-interactive mode"""
+    parser = argparse.ArgumentParser(
+        prog='auto_text_writer.py',
+        description="Sends text commands to a window at fixed intervals. "
+                    "Without arguments, asks for the configuration interactively.")
+    parser.add_argument('--config', metavar='FILE',
+                        help="settings.json-format file with the commands and settings "
+                             "(default: the GUI's settings.json)")
+    parser.add_argument('--window', metavar='TITLE', help="target window title (default: from the settings)")
+    parser.add_argument('--speed', type=float, metavar='SECONDS',
+                        help="seconds between typed characters (default: from the settings)")
+    parser.add_argument('--command', action='append', type=parse_command, metavar='MINUTES:TEXT',
+                        help="send TEXT every MINUTES; repeat for more commands. "
+                             "Replaces the commands from the settings")
+    parser.add_argument('--backend', choices=INPUT_BACKENDS, help="input backend (default: from the settings)")
+    parser.add_argument('--daemon', action='store_true',
+                        help="run unattended: no banners or progress output, only errors; "
+                             "stops on SIGTERM or Ctrl+C")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="type into fake windows with the recording backend and print what was sent")
+    parser.add_argument('--once', action='store_true', help="send every enabled command once and exit")
+    parser.add_argument('--no-resume', action='store_true',
+                        help="fire every command at start instead of resuming the previous run's schedule")
+    parser.add_argument('--simulate', type=float, metavar='DAYS',
+                        help="replay DAYS of schedule on a virtual clock, without typing anything, "
+                             "and report every fire's lateness and overlaps")
+    parser.add_argument('--timeline', metavar='FILE', help="with --simulate, write every fire to a CSV file")
+    parser.add_argument('--plan', action='store_true',
+                        help="print the expected keyboard load of the commands and exit; "
+                             "exits with 1 when they cannot all run on time")
+    parser.add_argument('--metrics-file', metavar='FILE',
+                        help="export execution metrics to FILE in the Prometheus text format "
+                             "(default: metrics_textfile from the settings)")
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help="serve execution metrics on http://127.0.0.1:PORT/metrics "
+                             "(default: metrics_port from the settings)")
+    parser.add_argument('--report-startup', action='store_true',
+                        help="print the time from start-up to the first keystroke, excluding the focus wait")
+    return parser.parse_args(argv)
+
+
+def add_dry_run_windows(backend, writer):
+    """Gives the recording backend one fake window per target, so every command can run"""
+    backend.add_window(writer.window_title)
+    for config in writer.text_configs:
+        spec = config.window
+        if isinstance(spec, str):
+            backend.add_window(spec)
+        elif spec:
+            backend.add_window(spec.get('title', writer.window_title),
+                               class_name=spec.get('class_name') or '', process=spec.get('process') or '')
+
+
+def run_simulation(args, config, window_title, typing_speed):
+    """Replays the configured schedule on a virtual clock and prints the report"""
+    if args.command:
+        commands, errors = load_commands(ensure_command_ids(args.command))
+    else:
+        commands, errors = config.get_commands(enabled_only=True), []
+    for error in errors:
+        print(f"Skipping invalid command: {error}")
+    simulator = Simulator(commands, window_title, typing_speed,
+                          open_delay=config.get_open_delay(),
+                          inter_message_gap=config.get_inter_message_gap(),
+                          schedule_mode=config.get_schedule_mode(),
+                          missed_fire_policy=config.get_missed_fire_policy(),
+                          misfire_grace=config.get_misfire_grace(),
+                          delivery_mode=config.get_delivery_mode(),
+                          paste_threshold=config.get_paste_threshold())
+    if not simulator.commands:
+        print("No enabled commands to simulate", file=sys.stderr)
+        return 2
+    result = simulator.run(args.simulate * DAY)
+    print(result.summary())
+    
+    overlaps = [fire for fire in result.fires if fire.overlapped]
+    if overlaps:
+        print(f"Overlaps (first {min(len(overlaps), 10)} of {len(overlaps)}):")
+        for fire in overlaps[:10]:
+            print(f"  {result.offset(fire.due)}: '{fire.command.text}' waited {fire.lateness:.1f} s "
+                  f"for '{fire.blocked_by.text}'")
+    if args.timeline:
+        result.write_timeline(args.timeline)
+        print(f"Timeline written to {args.timeline}")
+    return 0
+
+
+def run_headless(args):
+    """Runs from command-line flags and a settings file, without prompts; returns the exit code"""
+    config = Config(config_file=args.config) if args.config else get_config()
+    window_title = args.window or config.get_window_title()
+    if not window_title:
+        print("No target window: pass --window or set window_title in the settings", file=sys.stderr)
+        return 2
+    typing_speed = args.speed if args.speed is not None else config.get_typing_speed()
+    
+    if args.simulate:
+        return run_simulation(args, config, window_title, typing_speed)
+    
+    # One-shot and dry runs leave the saved schedule alone
+    resume = config.get_resume_schedule() and not (args.once or args.dry_run or args.plan or args.no_resume)
+    schedule_state = ScheduleState(config.schedule_state_file) if resume else None
+    if args.dry_run or args.plan:
+        input_backend = window_backend = RecordingBackend()
+    else:
+        input_backend, window_backend = create_backends(args.backend or config.get_input_backend(), pause=0.1)
+    writer = WindowTextWriter(input_backend, window_backend, schedule_state, config.get_input_queue_size())
+    writer.quiet = args.daemon
+    writer.load_settings(config)
+    writer.configure(window_title, args.command or config.get_commands(enabled_only=True), typing_speed)
+    if not writer.text_configs:
+        print("No commands: pass --command or add commands to the settings", file=sys.stderr)
+        return 2
+    if args.plan:
+        plan = writer.capacity_plan()
+        print(plan.summary())
+        for problem in plan.problems():
+            print(f"WARNING: {problem}")
+        return 0 if plan.feasible else 1
+    writer.warn_if_overloaded()
+    if args.dry_run:
+        add_dry_run_windows(input_backend, writer)
+    
+    metrics_file = args.metrics_file or config.get_metrics_textfile()
+    metrics_port = args.metrics_port if args.metrics_port is not None else config.get_metrics_port()
+    try:
+        writer.metrics.start_export(metrics_file, metrics_port)
+    except OSError as e:
+        print(f"Cannot export metrics: {e}", file=sys.stderr)
+        writer.metrics.stop_export()
+        if schedule_state is not None:
+            schedule_state.close()
+        return 1
+    
+    # Commands from the settings file follow edits made while running
+    if not args.command and not args.once:
+        writer.watch_config(config)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, lambda signum, frame: writer.stop())
+    
+    writer.start(once=args.once)
+    config.stop_watching()
+    writer.metrics.stop_export()
+    if metrics_file:
+        writer.metrics.write_textfile(metrics_file)
+    if schedule_state is not None:
+        schedule_state.close()
+    
+    if args.report_startup:
+        startup_ms = writer.startup_ms()
+        if startup_ms is None:
+            print("Start-up: no keystroke was sent")
+        else:
+            print(f"Start-up: first keystroke after {startup_ms:.1f} ms "
+                  f"(focus wait of {writer.first_focus_wait * 1000:.1f} ms excluded)")
+    if args.dry_run:
+        for window in input_backend.windows:
+            typed = input_backend.typed_text(window)
+            if typed:
+                print(f"Dry run: {window.title!r} received {typed!r}")
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        sys.exit(run_headless(parse_args(argv)))
+    
     # Request complete configuration from user
     window_title, typing_speed, text_configs = get_user_configuration()
     
-    writer = WindowTextWriter()
+    # Fire times are checkpointed next to the GUI settings so a restart
+    # resumes the schedule instead of firing everything again
+    config = get_config()
+    schedule_state = ScheduleState(config.schedule_state_file) if config.get_resume_schedule() else None
+    writer = WindowTextWriter(schedule_state=schedule_state, input_queue_size=config.get_input_queue_size())
     
     # Configure the writer with specified values
     writer.configure(window_title, text_configs, typing_speed)
@@ -313,16 +793,35 @@ def main():
     print(f"Target window: {window_title}")
     print(f"Typing speed: {typing_speed} seconds/character")
     print(f"Configured commands:")
-    for i, config in enumerate(text_configs, 1):
-        status = "✓ ACTIVE" if config.get('enabled', True) else "✗ DISABLED"
-        print(f"  {i}. '{config['text']}' every {config['interval_minutes']} minutes [{status}]")
+    for i, command in enumerate(writer.text_configs, 1):
+        status = "✓ ACTIVE" if command.enabled else "✗ DISABLED"
+        print(f"  {i}. '{command.text}' every {command.interval_minutes} minutes [{status}]")
     print("=" * 50)
     print("  Developed by JIATech - johndev@jiacode.dev")
     print("=" * 50)
     print()
     
+    # Long texts on short intervals can need more keyboard time than there is
+    if not writer.warn_if_overloaded().feasible:
+        try:
+            if input("Start anyway? (y/N): ").strip().lower() not in ('y', 'yes'):
+                sys.exit(0)
+        except KeyboardInterrupt:
+            sys.exit(0)
+    
     # Start the process
+    try:
+        writer.metrics.start_export(config.get_metrics_textfile(), config.get_metrics_port())
+    except OSError as e:
+        print(f"Cannot export metrics: {e}", file=sys.stderr)
+        writer.metrics.stop_export()
+        if schedule_state is not None:
+            schedule_state.close()
+        sys.exit(1)
     writer.start()
+    writer.metrics.stop_export()
+    if schedule_state is not None:
+        schedule_state.close()
 
 
 if __name__ == "__main__":
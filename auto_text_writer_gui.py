@@ -1,24 +1,44 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import time
-import pyautogui
-import pygetwindow as gw
-from datetime import datetime, timedelta
+from datetime import datetime
 import threading
 import sys
 import json
 import os
+import queue
 from pynput import keyboard
 
 # Import internationalization and configuration modules
 from i18n import t, set_language, get_language, get_available_languages, get_i18n
 from config import get_config
+from commands import Command, diff_commands
+from backends import create_backends
+from scheduler import Scheduler
+from schedule_state import ScheduleState
+from input_arbiter import InputArbiter, PRIORITY_MANUAL
+from activity_log import ActivityLog
+from commands_view import sync_rows
+from window_resolver import WindowResolver, WindowMatcher
+from typing_engine import TypingEngine, ClipboardPaster, DELIVERY_PASTE
+from capacity import plan_from_config, format_duration
+from metrics import (ExecutionMetrics, PhaseTimer, PHASE_RESOLVE, PHASE_FOCUS, PHASE_OPEN, PHASE_TYPE,
+                     PHASE_SUBMIT, RESULT_OK, RESULT_WINDOW_NOT_FOUND, RESULT_FOCUS_FAILED, RESULT_WRITE_FAILED)
 
 class AutoTextWriterGUI:
-    def __init__(self):
+    # Interval between activity log flushes to the widget (about 30 fps)
+    LOG_FLUSH_INTERVAL_MS = 33
+    # Longest wait for room in a full input queue before checking for a stop
+    SUBMIT_RETRY = 1.0
+    
+    def __init__(self, input_backend=None, window_backend=None):
         # Initialize configuration and i18n
         self.config = get_config()
         
+        # Log lines are buffered here and written to the widget in batches
+        self.activity_log = ActivityLog(self.config.get_log_capacity())
+        self.log_line_count = 0
+        
         # Load language from config and set up i18n
         saved_language = self.config.get_language()
         set_language(saved_language)
@@ -30,10 +50,18 @@ class AutoTextWriterGUI:
         
         # State variables
         self.running = False
+        self.closing = False
         self.text_configs = []
+        self.tree_rows = {}  # Command id -> values currently shown in the tree
+        self.scheduler = Scheduler(
+            schedule_mode=self.config.get_schedule_mode(),
+            missed_fire_policy=self.config.get_missed_fire_policy(),
+            misfire_grace=self.config.get_misfire_grace(),
+            state=ScheduleState(self.config.schedule_state_file) if self.config.get_resume_schedule() else None
+        )
         
         # Load saved configuration
-        saved_commands = self.config.get_text_commands()
+        saved_commands = self.config.get_commands()
         saved_window_title = self.config.get_window_title()
         saved_typing_speed = self.config.get_typing_speed()
         
@@ -57,9 +85,33 @@ class AutoTextWriterGUI:
         saved_theme = self.config.get_theme()
         self.dark_mode = (saved_theme == 'dark')
         
-        # Pyautogui configuration
-        pyautogui.FAILSAFE = True
-        pyautogui.PAUSE = 0.1
+        # Input/window backends from settings unless injected
+        if input_backend is None or window_backend is None:
+            default_input, default_window = create_backends(self.config.get_input_backend(), pause=0.1)
+            input_backend = input_backend or default_input
+            window_backend = window_backend or default_window
+        self.input_backend = input_backend
+        self.window_backend = window_backend
+        self.typing_engine = TypingEngine(self.input_backend.write_char,
+                                          paster=ClipboardPaster(self.input_backend),
+                                          paste_threshold=self.config.get_paste_threshold())
+        self.window_resolver = WindowResolver(self.window_backend, self.report_window_candidates)
+        self.matchers = {}  # id(command) -> (window title, compiled matcher)
+        
+        # Every keystroke and focus change goes through the arbiter thread
+        self.input_arbiter = InputArbiter(self.config.get_input_queue_size())
+        self.input_arbiter.start()
+        
+        # Time spent in each phase of every execution, exported if configured
+        self.metrics = ExecutionMetrics()
+        self.metrics.add_histogram('fire_lateness_seconds', "Delay between a command's slot and its fire",
+                                   self.scheduler.lateness)
+        self.metrics.add_histogram('input_queue_wait_seconds', "Time batches wait for the input arbiter",
+                                   self.input_arbiter.wait_times)
+        try:
+            self.metrics.start_export(self.config.get_metrics_textfile(), self.config.get_metrics_port())
+        except OSError as e:
+            self.log(t("log.metrics_export_error", str(e)))
         
         # Variable for key listener
         self.key_listener = None
@@ -72,6 +124,10 @@ class AutoTextWriterGUI:
             # Refresh the tree to show loaded commands
             self.refresh_commands_tree()
         self.setup_key_listener()
+        self.root.after(self.LOG_FLUSH_INTERVAL_MS, self._flush_log)
+        
+        # Pick up edits made to settings.json while the application runs
+        self.config.watch(lambda: self.root.after(0, self.on_config_reloaded))
         
     def setup_ui(self):
         """Sets up the user interface"""
@@ -170,6 +226,10 @@ class AutoTextWriterGUI:
                                        command=self.delete_command)
         self.delete_button.pack(side=tk.LEFT, padx=(0, 5))
         
+        self.run_now_button = ttk.Button(buttons_frame, text=t("buttons.run_now"), 
+                                        command=self.run_selected_command)
+        self.run_now_button.pack(side=tk.LEFT, padx=(0, 5))
+        
         self.defaults_button = ttk.Button(buttons_frame, text=t("buttons.load_defaults"), 
                                          command=self.load_default_commands)
         self.defaults_button.pack(side=tk.LEFT)
@@ -290,9 +350,11 @@ class AutoTextWriterGUI:
         """Handle window title changes"""
         if hasattr(self, 'config'):  # Ensure config is initialized
             new_title = self.window_title_var.get().strip()
+            self.window_title = new_title
+            if new_title == self.config.get_window_title():
+                return
             should_auto_save = self.config.get_auto_save()
             self.config.set_window_title(new_title, auto_save=should_auto_save)
-            self.window_title = new_title
             if not should_auto_save:
                 self.config.mark_changed()
     
@@ -301,9 +363,11 @@ class AutoTextWriterGUI:
         if hasattr(self, 'config'):  # Ensure config is initialized
             try:
                 new_speed = self.typing_speed_var.get()
+                self.typing_speed = new_speed
+                if new_speed == self.config.get_typing_speed():
+                    return
                 should_auto_save = self.config.get_auto_save()
                 self.config.set_typing_speed(new_speed, auto_save=should_auto_save)
-                self.typing_speed = new_speed
                 if not should_auto_save:
                     self.config.mark_changed()
             except tk.TclError:
@@ -314,7 +378,7 @@ class AutoTextWriterGUI:
         """Handle auto-save preference changes"""
         if hasattr(self, 'config'):  # Ensure config is initialized
             new_auto_save = self.auto_save_var.get()
-            self.config.set_auto_save(new_auto_save)  # This always saves immediately
+            self.config.set_auto_save(new_auto_save)  # This always auto-saves
             self.log(f"Auto-save {'enabled' if new_auto_save else 'disabled'}")
     
     def manual_save(self):
@@ -343,6 +407,7 @@ class AutoTextWriterGUI:
         self.add_button.configure(text=t("buttons.add_command"))
         self.edit_button.configure(text=t("buttons.edit_command"))
         self.delete_button.configure(text=t("buttons.delete_command"))
+        self.run_now_button.configure(text=t("buttons.run_now"))
         self.defaults_button.configure(text=t("buttons.load_defaults"))
         
         # Update treeview headers
@@ -382,35 +447,102 @@ class AutoTextWriterGUI:
         
     def load_default_commands(self):
         """Loads default commands using translations"""
-        self.text_configs = [
-            {"text": t("defaults.test_message"), "interval_minutes": 5, "enabled": True},
-            {"text": t("defaults.reminder_message"), "interval_minutes": 10, "enabled": True},
-            {"text": t("defaults.note_message"), "interval_minutes": 15, "enabled": True}
-        ]
+        self.set_text_configs([
+            Command(t("defaults.test_message"), 5),
+            Command(t("defaults.reminder_message"), 10),
+            Command(t("defaults.note_message"), 15)
+        ])
         self.refresh_commands_tree()
         self.log(t("log.default_commands_loaded"))
         
         # Save the default commands based on auto-save preference
         should_auto_save = self.config.get_auto_save()
         if should_auto_save:
-            self.config.set_text_commands(self.text_configs, auto_save=True)
+            self.config.set_commands(self.text_configs, auto_save=True)
             self.log(t("log.config_saved"))
         else:
-            self.config.set_text_commands(self.text_configs, auto_save=False)
+            self.config.set_commands(self.text_configs, auto_save=False)
             self.config.mark_changed()
         
-    def refresh_commands_tree(self):
-        """Updates the commands view"""
-        for item in self.commands_tree.get_children():
-            self.commands_tree.delete(item)
+    def set_text_configs(self, configs, diff=None):
+        """Replaces the command list and brings the live schedule in line
+        
+        The list is never mutated in place, so the execution thread can keep
+        iterating over the one it already holds. Only commands that were
+        added, removed or changed touch the schedule; see
+        ``Scheduler.apply_changes``. ``diff`` is what changed, when already
+        known; otherwise the lists are compared. Returns the ``CommandDiff``.
+        """
+        previous = self.text_configs
+        self.text_configs = configs
+        
+        if diff is None:
+            diff = diff_commands(previous, configs)
+        for config in diff.removed:
+            self.matchers.pop(id(config), None)
+        for config, _ in diff.changed:
+            self.matchers.pop(id(config), None)
+            
+        if self.running:
+            self.scheduler.apply_changes(diff)
+        else:
+            for config in diff.removed:
+                self.scheduler.cancel(config)
+        return diff
+        
+    def on_config_reloaded(self):
+        """Applies settings.json edits made outside the application"""
+        if self.closing:
+            return
+        diff = self.set_text_configs(self.config.get_commands(), self.config.take_reload_diff())
+        if diff:
+            self.refresh_commands_tree()
+            self.log(t("log.config_reloaded", len(diff.added), len(diff.removed), len(diff.changed)))
+        
+        # The traces skip values that already match the configuration
+        window_title = self.config.get_window_title()
+        if window_title and window_title != self.window_title_var.get().strip():
+            self.window_title_var.set(window_title)
+        typing_speed = self.config.get_typing_speed()
+        if typing_speed != self.typing_speed:
+            self.typing_speed_var.set(typing_speed)
+                    
+    def run_selected_command(self):
+        """Queues the selected command to run now, ahead of scheduled ones"""
+        selection = self.commands_tree.selection()
+        if not selection:
+            messagebox.showwarning(t("messages.warning"), t("messages.select_command_run"))
+            return
             
-        for i, config in enumerate(self.text_configs):
-            status = t("table.active") if config.get('enabled', True) else t("table.inactive")
-            self.commands_tree.insert('', 'end', iid=i, values=(
-                config['text'], 
-                config['interval_minutes'], 
-                status
-            ))
+        index = self.command_index(selection[0])
+        if index is None:
+            return
+        config = self.text_configs[index]
+        try:
+            self.input_arbiter.submit(self.execute_batch, [config], lambda: not self.closing,
+                                      priority=PRIORITY_MANUAL, block=False)
+            self.log(t("log.manual_run_queued", config.text))
+        except queue.Full:
+            self.log(t("log.input_queue_full", config.text))
+            
+    def refresh_commands_tree(self):
+        """Updates the commands view, touching only rows that changed"""
+        active, inactive = t("table.active"), t("table.inactive")
+        rows = {}
+        for config in self.text_configs:
+            rows[config.id] = (
+                config.text, 
+                config.interval_minutes, 
+                active if config.enabled else inactive
+            )
+        self.tree_rows = sync_rows(self.commands_tree, self.tree_rows, rows)
+        
+    def command_index(self, command_id):
+        """Returns the list index of the command with an id, or None"""
+        for index, config in enumerate(self.text_configs):
+            if config.id == command_id:
+                return index
+        return None
             
     def add_command(self):
         """Opens dialog to add command"""
@@ -423,9 +555,10 @@ class AutoTextWriterGUI:
             messagebox.showwarning(t("messages.warning"), t("messages.select_command_edit"))
             return
             
-        index = int(selection[0])
-        config = self.text_configs[index]
-        self.show_command_dialog(config, index)
+        index = self.command_index(selection[0])
+        if index is None:
+            return
+        self.show_command_dialog(self.text_configs[index])
         
     def delete_command(self):
         """Deletes the selected command"""
@@ -435,25 +568,27 @@ class AutoTextWriterGUI:
             return
             
         if messagebox.askyesno(t("messages.confirm"), t("messages.confirm_delete")):
-            index = int(selection[0])
-            del self.text_configs[index]
+            index = self.command_index(selection[0])
+            if index is None:
+                return
+            self.set_text_configs(self.text_configs[:index] + self.text_configs[index + 1:])
             self.refresh_commands_tree()
             self.log(t("log.command_deleted"))
             
             # Save the changes based on auto-save preference
             should_auto_save = self.config.get_auto_save()
             if should_auto_save:
-                self.config.set_text_commands(self.text_configs, auto_save=True)
+                self.config.set_commands(self.text_configs, auto_save=True)
                 self.log(t("log.config_saved"))
             else:
-                self.config.set_text_commands(self.text_configs, auto_save=False)
+                self.config.set_commands(self.text_configs, auto_save=False)
                 self.config.mark_changed()
             
-    def show_command_dialog(self, config=None, index=None):
+    def show_command_dialog(self, config=None):
         """Shows dialog to add/edit command"""
         dialog = tk.Toplevel(self.root)
         dialog.title(t("dialogs.add_command_title") if config is None else t("dialogs.edit_command_title"))
-        dialog.geometry("600x200")
+        dialog.geometry("600x300")
         dialog.resizable(False, False)
         dialog.grab_set()
         
@@ -465,26 +600,61 @@ class AutoTextWriterGUI:
         
         # Command text
         ttk.Label(frame, text=t("dialogs.command_text")).grid(row=0, column=0, sticky=tk.W, pady=5)
-        text_var = tk.StringVar(value=config['text'] if config else "")
+        text_var = tk.StringVar(value=config.text if config else "")
         text_entry = ttk.Entry(frame, textvariable=text_var, width=40)
         text_entry.grid(row=0, column=1, pady=5, padx=(10, 0))
         text_entry.focus()
         
         # Interval
         ttk.Label(frame, text=t("dialogs.interval_minutes")).grid(row=1, column=0, sticky=tk.W, pady=5)
-        interval_var = tk.IntVar(value=config['interval_minutes'] if config else 30)
+        interval_var = tk.IntVar(value=config.interval_minutes if config else 30)
         interval_spinbox = ttk.Spinbox(frame, from_=1, to=9999, textvariable=interval_var, width=10)
         interval_spinbox.grid(row=1, column=1, sticky=tk.W, pady=5, padx=(10, 0))
         
         # Status
         ttk.Label(frame, text=t("dialogs.status_label")).grid(row=2, column=0, sticky=tk.W, pady=5)
-        enabled_var = tk.BooleanVar(value=config.get('enabled', True) if config else True)
+        enabled_var = tk.BooleanVar(value=config.enabled if config else True)
         enabled_check = ttk.Checkbutton(frame, text=t("dialogs.enabled"), variable=enabled_var)
         enabled_check.grid(row=2, column=1, sticky=tk.W, pady=5, padx=(10, 0))
         
+        # Schedule mode
+        mode_names = {
+            'fixed_rate': t("dialogs.mode_fixed_rate"),
+            'fixed_delay': t("dialogs.mode_fixed_delay")
+        }
+        ttk.Label(frame, text=t("dialogs.schedule_mode")).grid(row=3, column=0, sticky=tk.W, pady=5)
+        mode_var = tk.StringVar(value=mode_names.get(
+            config.schedule_mode if config else None, mode_names[self.config.get_schedule_mode()]))
+        ttk.Combobox(frame, textvariable=mode_var, values=list(mode_names.values()),
+                     state="readonly", width=20).grid(row=3, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+        
+        # Missed-fire policy
+        policy_names = {
+            'catch_up': t("dialogs.policy_catch_up"),
+            'coalesce': t("dialogs.policy_coalesce"),
+            'skip': t("dialogs.policy_skip")
+        }
+        ttk.Label(frame, text=t("dialogs.missed_fire_policy")).grid(row=4, column=0, sticky=tk.W, pady=5)
+        policy_var = tk.StringVar(value=policy_names.get(
+            config.missed_fire_policy if config else None, policy_names[self.config.get_missed_fire_policy()]))
+        ttk.Combobox(frame, textvariable=policy_var, values=list(policy_names.values()),
+                     state="readonly", width=20).grid(row=4, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+        
+        # Delivery mode
+        delivery_names = {
+            'type': t("dialogs.delivery_type"),
+            'paste': t("dialogs.delivery_paste"),
+            'auto': t("dialogs.delivery_auto")
+        }
+        ttk.Label(frame, text=t("dialogs.delivery")).grid(row=5, column=0, sticky=tk.W, pady=5)
+        delivery_var = tk.StringVar(value=delivery_names.get(
+            config.delivery if config else None, delivery_names[self.config.get_delivery_mode()]))
+        ttk.Combobox(frame, textvariable=delivery_var, values=list(delivery_names.values()),
+                     state="readonly", width=20).grid(row=5, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+        
         # Buttons
         buttons_frame = ttk.Frame(frame)
-        buttons_frame.grid(row=3, column=0, columnspan=2, pady=20)
+        buttons_frame.grid(row=6, column=0, columnspan=2, pady=20)
         
         def save_command():
             text = text_var.get().strip()
@@ -499,19 +669,30 @@ class AutoTextWriterGUI:
                 messagebox.showerror(t("messages.error"), t("messages.invalid_interval"))
                 return
                 
-            new_config = {
+            fields = {
                 "text": text,
                 "interval_minutes": interval,
-                "enabled": enabled
+                "enabled": enabled,
+                "schedule_mode": next(code for code, name in mode_names.items() if name == mode_var.get()),
+                "missed_fire_policy": next(code for code, name in policy_names.items() if name == policy_var.get()),
+                "delivery": next(code for code, name in delivery_names.items() if name == delivery_var.get())
             }
+            # Editing keeps the id, creation date, window and tags
+            new_config = config.replace(**fields) if config else Command(**fields)
             
             if config is None:
                 # Add new
-                self.text_configs.append(new_config)
+                self.set_text_configs(self.text_configs + [new_config])
                 self.log(f"{t('log.command_added')}: '{text}'")
             else:
-                # Edit existing
-                self.text_configs[index] = new_config
+                # Edit existing, looked up by id in case the list changed meanwhile
+                index = self.command_index(config.id)
+                if index is None:
+                    dialog.destroy()
+                    return
+                configs = list(self.text_configs)
+                configs[index] = new_config
+                self.set_text_configs(configs)
                 self.log(f"{t('log.command_edited')}: '{text}'")
                 
             self.refresh_commands_tree()
@@ -519,10 +700,10 @@ class AutoTextWriterGUI:
             # Save the changes based on auto-save preference
             should_auto_save = self.config.get_auto_save()
             if should_auto_save:
-                self.config.set_text_commands(self.text_configs, auto_save=True)
+                self.config.set_commands(self.text_configs, auto_save=True)
                 self.log(t("log.config_saved"))
             else:
-                self.config.set_text_commands(self.text_configs, auto_save=False)
+                self.config.set_commands(self.text_configs, auto_save=False)
                 self.config.mark_changed()
             
             dialog.destroy()
@@ -833,6 +1014,14 @@ class AutoTextWriterGUI:
             messagebox.showerror(t("messages.error"), t("messages.empty_window_title"))
             return
             
+        # Long texts on short intervals can need more keyboard time than there is
+        if not self.confirm_capacity():
+            return
+            
+        # Compile window matchers once per run
+        self.compile_matchers()
+        self.window_resolver.invalidate()
+            
         self.running = True
         self.start_button.configure(text=t("buttons.stop"), style='Red.TButton')
         self.status_var.set(t("messages.status_running"))
@@ -843,147 +1032,243 @@ class AutoTextWriterGUI:
         
         self.log(f"{t('log.started')}: '{self.window_title}', {t('ui.typing_speed')} {self.typing_speed}s")
         
+    def confirm_capacity(self):
+        """Warns when the commands cannot all run on time; returns whether to start"""
+        plan = plan_from_config(self.text_configs, self.config, self.typing_speed, self.metrics)
+        if plan.feasible:
+            return True
+        problems = []
+        if plan.utilisation >= 1.0:
+            problems.append(t("messages.capacity_overloaded", plan.utilisation * 100))
+        if plan.worst_delay > plan.misfire_grace:
+            problems.append(t("messages.capacity_delay", format_duration(plan.worst_delay),
+                              format_duration(plan.misfire_grace)))
+        self.log(t("log.capacity_warning", plan.utilisation * 100, format_duration(plan.worst_delay)))
+        return messagebox.askyesno(t("messages.capacity_title"),
+                                   "\n\n".join(problems + [t("messages.capacity_start_anyway")]))
+        
     def stop_execution(self):
         """Stops command execution"""
         self.running = False
+        self.scheduler.interrupt()
+        self.input_arbiter.cancel_pending()
         self.start_button.configure(text=t("buttons.start"), style='Green.TButton')
         self.status_var.set(t("messages.status_stopped"))
         self.log(t("log.execution_stopped"))
         
     def execution_loop(self):
         """Main execution loop"""
-        # Execute enabled commands immediately
+        # Commands that fired in an earlier run resume their schedule; the
+        # rest execute immediately as one batch, which anchors theirs
         self.log(t("log.initial_execution"))
+        self.scheduler.clear()
         for config in self.text_configs:
-            if not self.running:
-                break
-            if config.get('enabled', True):
-                self.execute_text_write(config)
-                time.sleep(2)
-            else:
-                self.log(f"{t('log.skipping_disabled')}: {config['text']}")
+            if not config.enabled:
+                self.log(f"{t('log.skipping_disabled')}: {config.text}")
+        enabled_configs = self.enabled_commands()
+        initial_batch = self.scheduler.resume(enabled_configs)
+        if len(initial_batch) < len(enabled_configs):
+            self.log(t("log.schedule_resumed", len(enabled_configs) - len(initial_batch)))
+        if initial_batch:
+            initial_job = self.submit_batch(initial_batch)
+            if initial_job is not None:
+                initial_job.done.wait()
         
         if self.running:
             self.log(t("log.initial_completed"))
         
-        # Initialize next executions
-        now = datetime.now()
-        for config in self.text_configs:
-            config['next_execution'] = now + timedelta(minutes=config['interval_minutes'])
-            
-        # Main loop
+        # Main loop: this thread only produces batches, the arbiter types them
         while self.running:
-            now = datetime.now()
-            
-            # Check commands to execute
-            for config in self.text_configs:
-                if not self.running:
-                    break
-                if config.get('enabled', True) and now >= config['next_execution']:
-                    self.execute_text_write(config)
-                    config['next_execution'] = now + timedelta(minutes=config['interval_minutes'])
+            # Update status after every round of executions
+            self.update_status_display()
             
-            # Update status every minute
-            if self.running:
-                self.update_status_display()
+            # Sleep until the earliest command is due
+            due_commands = self.scheduler.wait(lambda: self.running)
+            if due_commands:
+                self.submit_batch(due_commands)
                 
-            # Wait 1 minute
-            for _ in range(60):
-                if not self.running:
-                    break
-                time.sleep(1)
+    def enabled_commands(self):
+        """The enabled commands, loaded from the command store without the disabled ones
+        
+        Returns the objects in ``text_configs``, which the schedule and the
+        reschedule check work with; the store is kept in step with it.
+        """
+        live = {config.id: config for config in self.text_configs}
+        return [live[command.id] for command in self.config.get_commands(enabled_only=True)
+                if command.id in live]
+        
+    def submit_batch(self, due_commands):
+        """Hands due commands to the input arbiter as one batch
+        
+        Blocks while the arbiter queue is full (backpressure); each command
+        is rescheduled once the arbiter has run the batch. Returns the job,
+        or None if execution stopped before there was room.
+        """
+        configs = [config for config, _ in due_commands]
+        while self.running:
+            try:
+                return self.input_arbiter.submit(self.execute_batch, configs,
+                                                 on_done=lambda job: self.reschedule_batch(due_commands),
+                                                 timeout=self.SUBMIT_RETRY)
+            except queue.Full:
+                continue
+        return None
+        
+    def reschedule_batch(self, due_commands):
+        """Reschedules the commands of a finished batch that still exist"""
+        if not self.running:
+            return
+        live = {id(config) for config in self.text_configs}
+        for config, due in due_commands:
+            if id(config) in live:
+                self.scheduler.reschedule(config, due)
                 
     def execute_text_write(self, config):
         """Executes text writing for a command"""
-        self.log(f"{t('log.executing')}: {config['text']}")
-        
-        window = self.find_window()
-        if not window:
-            self.log(t("log.window_not_found", self.window_title))
-            return False
+        return self.execute_batch([config])[0]
+        
+    def execute_batch(self, configs, should_continue=None):
+        """Executes commands due together, grouped by target window
+        
+        Each window is looked up and focused once and its commands are typed
+        back to back, separated by the inter-message gap. Stops early once
+        ``should_continue()`` (by default: still running) returns false.
+        Returns one success flag per command, in order.
+        """
+        if should_continue is None:
+            should_continue = lambda: self.running
+        self.window_resolver.begin_tick()
+        groups = {}
+        for index, config in enumerate(configs):
+            groups.setdefault(self.matcher_for(config).key, []).append(index)
             
-        if not self.focus_window(window):
+        results = [False] * len(configs)
+        gap = self.config.get_inter_message_gap()
+        for indexes in groups.values():
+            if not should_continue():
+                break
+            # The lookup is charged to the first command of the window
+            timer = PhaseTimer()
+            window = self.find_window(configs[indexes[0]])
+            timer.mark(PHASE_RESOLVE)
+            if not window:
+                for index in indexes:
+                    self.log(f"{t('log.executing')}: {configs[index].text}")
+                    self.log(t("log.window_not_found", self.matcher_for(configs[index]).title))
+                    self.metrics.record(configs[index], timer, RESULT_WINDOW_NOT_FOUND)
+                    timer = PhaseTimer()
+                continue
+            for position, index in enumerate(indexes):
+                if not should_continue():
+                    break
+                if position:
+                    time.sleep(gap)
+                    timer = PhaseTimer()
+                results[index] = self.write_to_window(configs[index], window, should_continue, timer)
+        return results
+        
+    def write_to_window(self, config, window, should_continue, timer=None):
+        """Focuses an already resolved window and writes one command into it"""
+        self.log(f"{t('log.executing')}: {config.text}")
+        if timer is None:
+            timer = PhaseTimer()
+            
+        # Returns immediately when the window is still in front
+        focused = self.focus_window(window)
+        timer.mark(PHASE_FOCUS)
+        if not focused:
             self.log(t("log.error_focus_window"))
+            self.metrics.record(config, timer, RESULT_FOCUS_FAILED)
             return False
             
-        if self.write_text(config['text']):
-            self.log(f"{t('log.command_executed')}: {config['text']}")
+        if self.write_text(config.text, config.delivery or self.config.get_delivery_mode(), should_continue, timer):
+            self.metrics.record(config, timer, RESULT_OK)
+            self.log(f"{t('log.command_executed')}: {config.text}")
+            self.log(t("log.execution_timing", timer.total_ms(), timer.breakdown()))
             return True
         else:
-            self.log(f"{t('log.error_executing')}: {config['text']}")
+            self.metrics.record(config, timer, RESULT_WRITE_FAILED)
+            self.log(f"{t('log.error_executing')}: {config.text}")
             return False
             
-    def find_window(self):
-        """Searches for window by partial title match"""
-        try:
-            # First try exact search (faster)
-            windows = gw.getWindowsWithTitle(self.window_title)
-            if windows:
-                return windows[0]
-            
-            # If not found by exact title, search by partial match
-            all_windows = gw.getAllWindows()
-            matching_windows = []
+    def compile_matchers(self):
+        """Compiles the window matcher of every command once"""
+        self.matchers = {id(config): (self.window_title, self.compile_matcher(config))
+                         for config in self.text_configs}
             
-            for window in all_windows:
-                if window.title and self.window_title.lower() in window.title.lower():
-                    matching_windows.append(window)
+    def compile_matcher(self, config):
+        """Compiles a command's window spec, falling back to the window title"""
+        try:
+            return WindowMatcher.from_spec(config.window, self.window_title)
+        except ValueError as e:
+            self.log(t("log.invalid_window_matcher", config.text, str(e)))
+            return WindowMatcher(self.window_title)
             
-            if matching_windows:
-                # If multiple matches, prioritize visible window
-                visible_windows = [w for w in matching_windows if w.visible]
-                if visible_windows:
-                    if len(visible_windows) > 1:
-                        self.log(t("log.multiple_windows_warning", len(visible_windows), self.window_title))
-                        for i, w in enumerate(visible_windows):
-                            self.log(f"  {i+1}. '{w.title}'")
-                        self.log(t("log.using_first", visible_windows[0].title))
-                    else:
-                        self.log(t("log.window_found_partial", visible_windows[0].title))
-                    return visible_windows[0]
-                else:
-                    if len(matching_windows) > 1:
-                        self.log(t("log.multiple_windows_warning", len(matching_windows), self.window_title) + " (not visible):")
-                        for i, w in enumerate(matching_windows):
-                            self.log(f"  {i+1}. '{w.title}'")
-                        self.log(t("log.using_first", matching_windows[0].title))
-                    else:
-                        self.log(t("log.window_found_partial", matching_windows[0].title))
-                    return matching_windows[0]
+    def matcher_for(self, config):
+        """Returns the compiled window matcher of a command
+        
+        Matchers are kept with the window title they were compiled for, so
+        editing the title while running retargets commands that use it.
+        """
+        entry = self.matchers.get(id(config))
+        if entry is None or entry[0] != self.window_title:
+            entry = self.matchers[id(config)] = (self.window_title, self.compile_matcher(config))
+        return entry[1]
             
-            return None
+    def find_window(self, config):
+        """Returns the command's target window, reusing the cached one while it is valid"""
+        try:
+            return self.window_resolver.resolve(self.matcher_for(config))
         except Exception as e:
             self.log(t("log.error_searching_window", str(e)))
             return None
             
+    def report_window_candidates(self, matcher, candidates):
+        """Logs the window a full search picked and any duplicates"""
+        if len(candidates) > 1:
+            self.log(t("log.multiple_windows_warning", len(candidates), matcher.title))
+            for i, w in enumerate(candidates):
+                self.log(f"  {i+1}. '{w.title}'")
+            self.log(t("log.using_first", candidates[0].title))
+        elif candidates and candidates[0].title != matcher.title:
+            self.log(t("log.window_found_partial", candidates[0].title))
+            
     def focus_window(self, window):
-        """Focuses the window"""
+        """Focuses the window, waiting only until it is in front"""
         try:
-            if window.isMinimized:
-                window.restore()
-            window.activate()
-            time.sleep(1)
-            return True
+            return self.window_backend.focus(window, self.config.get_focus_timeout())
         except Exception as e:
             self.log(t("log.error_focusing_window", str(e)))
             return False
             
-    def write_text(self, text):
-        """Writes text character by character"""
+    def write_text(self, text, delivery, should_continue, timer=None):
+        """Writes text by typing it character by character or pasting it
+        
+        The open, type and submit phases are charged to ``timer`` if given.
+        """
+        if timer is None:
+            timer = PhaseTimer()
         try:
             # Enter to open console
-            pyautogui.press('enter')
-            time.sleep(0.5)
+            self.input_backend.press('enter')
+            time.sleep(self.config.get_open_delay())
+            timer.mark(PHASE_OPEN)
             
-            # Write character by character
-            for char in text:
-                if not self.running:
-                    return False
-                pyautogui.write(char)
-                time.sleep(self.typing_speed)
+            # Type paced to the configured speed, or paste in one chord
+            result = self.typing_engine.deliver(text, self.typing_speed, delivery, should_continue)
+            timer.mark(PHASE_TYPE)
+            if result.fallback:
+                self.log(t("log.paste_rejected"))
+            if not result.completed:
+                return False
+            if result.method == DELIVERY_PASTE:
+                self.log(t("log.pasted_text", result.chars, result.elapsed * 1000))
+            else:
+                self.log(t("log.typing_rate", result.chars, result.elapsed, result.rate, result.target_rate))
                 
             # Enter to send
-            pyautogui.press('enter')
+            self.input_backend.press('enter')
+            timer.mark(PHASE_SUBMIT)
             return True
         except Exception as e:
             self.log(t("log.error_writing_text", str(e)))
@@ -994,35 +1279,42 @@ class AutoTextWriterGUI:
         if not self.running:
             return
             
-        now = datetime.now()
+        now = self.scheduler.clock()
         status_info = []
         
-        for config in self.text_configs:
-            if config.get('enabled', True):
-                remaining = config['next_execution'] - now
-                minutes_left = int(remaining.total_seconds() / 60)
-                status_info.append(f"'{config['text']}' en {minutes_left}min")
+        for config, due in self.scheduler.upcoming():
+            if config.enabled:
+                minutes_left = int((due - now) / 60)
+                status_info.append(f"'{config.text}' en {minutes_left}min")
                 
         if status_info:
             self.log(f"{t('log.next_executions')}: {' | '.join(status_info)}")
+        self.log(t("log.lateness_summary", self.scheduler.lateness.summary()))
+        self.log(t("log.window_cache_summary", self.window_resolver.summary()))
+        self.log(t("log.input_queue_summary", self.input_arbiter.summary()))
+        self.log(t("log.phase_summary", self.metrics.summary()))
             
     def log(self, message):
-        """Adds message to log"""
+        """Adds message to log (any thread)"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        log_message = f"[{timestamp}] {message}\n"
-        
-        # Execute in main thread
-        self.root.after(0, lambda: self._append_log(log_message))
-        
-    def _append_log(self, message):
-        """Adds message to log widget (main thread)"""
-        self.log_text.insert(tk.END, message)
-        self.log_text.see(tk.END)
-        
-        # Limit log lines
-        lines = self.log_text.get("1.0", tk.END).split("\n")
-        if len(lines) > 100:
-            self.log_text.delete("1.0", f"{len(lines) - 100}.0")
+        self.activity_log.append(f"[{timestamp}] {message}\n")
+        
+    def _flush_log(self):
+        """Writes buffered log lines to the widget in one batch (main thread)"""
+        lines = self.activity_log.drain()
+        if lines:
+            text = "".join(lines)
+            self.log_text.insert(tk.END, text)
+            self.log_line_count += text.count("\n")
+            
+            # Trim the oldest lines, tracked by count instead of re-reading the widget
+            excess = self.log_line_count - self.activity_log.capacity
+            if excess > 0:
+                self.log_text.delete("1.0", f"{excess + 1}.0")
+                self.log_line_count -= excess
+            self.log_text.see(tk.END)
+            
+        self.root.after(self.LOG_FLUSH_INTERVAL_MS, self._flush_log)
             
     def on_closing(self):
         """Handles application closure"""
@@ -1047,6 +1339,15 @@ class AutoTextWriterGUI:
         
         if self.running:
             self.stop_execution()
+        self.closing = True
+        self.config.stop_watching()
+        self.input_arbiter.stop(timeout=self.config.get_focus_timeout())
+        self.metrics.stop_export()
+        if self.scheduler.state is not None:
+            self.scheduler.state.close()
+        
+        # Write any debounced auto-save before the process exits
+        self.config.flush()
             
         if self.key_listener:
             self.key_listener.stop()
@@ -0,0 +1,368 @@
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+
+
+class InputBackend:
+    """Interface for injecting keystrokes into the focused window"""
+
+    name = 'base'
+
+    def press(self, key):
+        """Presses and releases a named key such as 'enter'"""
+        raise NotImplementedError
+
+    def write_char(self, char):
+        """Types a single character without any built-in pause"""
+        raise NotImplementedError
+
+    def get_clipboard(self):
+        """Returns the clipboard text"""
+        raise NotImplementedError
+
+    def set_clipboard(self, text):
+        """Replaces the clipboard text"""
+        raise NotImplementedError
+
+    def paste(self):
+        """Sends the paste chord (Ctrl+V) to the focused window"""
+        raise NotImplementedError
+
+
+class PyperclipClipboard:
+    """Clipboard access through pyperclip, imported on first use"""
+
+    def _pyperclip(self):
+        import pyperclip
+        return pyperclip
+
+    def get_clipboard(self):
+        return self._pyperclip().paste()
+
+    def set_clipboard(self, text):
+        self._pyperclip().copy(text)
+
+
+class WindowBackend:
+    """Interface for enumerating and activating top-level windows
+
+    Window objects follow the pygetwindow API: ``title``, ``visible``,
+    ``isMinimized``, ``isActive``, ``restore()`` and ``activate()``.
+    """
+
+    name = 'base'
+
+    # Poll interval while waiting for a window to reach the foreground
+    FOCUS_POLL_INTERVAL = 0.01
+
+    def get_windows_with_title(self, title):
+        """Returns windows whose title is exactly the given text"""
+        raise NotImplementedError
+
+    def get_all_windows(self):
+        """Returns every top-level window"""
+        raise NotImplementedError
+
+    def get_active_window(self):
+        """Returns the foreground window, or None"""
+        raise NotImplementedError
+
+    def get_window_class(self, window):
+        """Returns the window class name, or '' if unknown"""
+        return ''
+
+    def get_window_process(self, window):
+        """Returns the executable name of the owning process, or '' if unknown"""
+        return ''
+
+    def is_window_valid(self, window):
+        """Cheaply checks that a previously found window still exists"""
+        try:
+            window.title
+        except Exception:
+            return False
+        return True
+
+    def is_foreground(self, window):
+        """Checks whether a window is the foreground window"""
+        try:
+            active = self.get_active_window()
+        except Exception:
+            return False
+        return active is not None and active == window
+
+    def focus(self, window, timeout=1.0, clock=time.perf_counter, sleep=time.sleep):
+        """Brings a window to the foreground and waits for confirmation
+
+        Activation is skipped when the window is already in front. Returns
+        True once the window is confirmed as the foreground window, or False
+        if that does not happen within ``timeout`` seconds.
+        """
+        if not window.isMinimized and self.is_foreground(window):
+            return True
+
+        if window.isMinimized:
+            window.restore()
+        try:
+            window.activate()
+        except Exception:
+            # pygetwindow can raise even though activation worked, so
+            # trust the foreground check below instead
+            pass
+
+        deadline = clock() + timeout
+        while not self.is_foreground(window):
+            if clock() >= deadline:
+                return False
+            sleep(self.FOCUS_POLL_INTERVAL)
+        return True
+
+
+class PyAutoGUIInputBackend(PyperclipClipboard, InputBackend):
+    """Keystrokes through pyautogui"""
+
+    name = 'pyautogui'
+
+    def __init__(self, pause=0.1):
+        import pyautogui
+        self._pyautogui = pyautogui
+        pyautogui.FAILSAFE = True
+        pyautogui.PAUSE = pause
+
+    def press(self, key):
+        # Callers pace their own presses (open delay, inter-message gap)
+        self._pyautogui.press(key, _pause=False)
+
+    def write_char(self, char):
+        self._pyautogui.write(char, _pause=False)
+
+    def paste(self):
+        self._pyautogui.hotkey('ctrl', 'v')
+
+
+class PynputInputBackend(PyperclipClipboard, InputBackend):
+    """Keystrokes through pynput's keyboard controller"""
+
+    name = 'pynput'
+
+    def __init__(self):
+        from pynput import keyboard
+        self._keyboard = keyboard
+        self._controller = keyboard.Controller()
+
+    def _key(self, key):
+        """Maps a pyautogui-style key name to a pynput key"""
+        return getattr(self._keyboard.Key, key, key)
+
+    def press(self, key):
+        key = self._key(key)
+        self._controller.press(key)
+        self._controller.release(key)
+
+    def write_char(self, char):
+        self._controller.type(char)
+
+    def paste(self):
+        with self._controller.pressed(self._keyboard.Key.ctrl):
+            self._controller.press('v')
+            self._controller.release('v')
+
+
+class PyGetWindowBackend(WindowBackend):
+    """Window management through pygetwindow"""
+
+    name = 'pygetwindow'
+
+    def __init__(self):
+        import pygetwindow
+        self._gw = pygetwindow
+
+    def get_windows_with_title(self, title):
+        return self._gw.getWindowsWithTitle(title)
+
+    def get_all_windows(self):
+        return self._gw.getAllWindows()
+
+    def get_active_window(self):
+        return self._gw.getActiveWindow()
+
+    def _hwnd(self, window):
+        """Returns the Win32 handle of a window, or None off Windows"""
+        if sys.platform != 'win32':
+            return None
+        return getattr(window, '_hWnd', None)
+
+    def get_window_class(self, window):
+        hwnd = self._hwnd(window)
+        if hwnd is None:
+            return ''
+        import ctypes
+        buffer = ctypes.create_unicode_buffer(256)
+        ctypes.windll.user32.GetClassNameW(hwnd, buffer, 256)
+        return buffer.value
+
+    def get_window_process(self, window):
+        hwnd = self._hwnd(window)
+        if hwnd is None:
+            return ''
+        import ctypes
+        user32 = ctypes.windll.user32
+        kernel32 = ctypes.windll.kernel32
+        pid = ctypes.c_ulong()
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        # PROCESS_QUERY_LIMITED_INFORMATION
+        handle = kernel32.OpenProcess(0x1000, False, pid.value)
+        if not handle:
+            return ''
+        try:
+            buffer = ctypes.create_unicode_buffer(260)
+            size = ctypes.c_ulong(260)
+            if kernel32.QueryFullProcessImageNameW(handle, 0, buffer, ctypes.byref(size)):
+                return os.path.basename(buffer.value)
+            return ''
+        finally:
+            kernel32.CloseHandle(handle)
+
+    def is_window_valid(self, window):
+        hwnd = self._hwnd(window)
+        if hwnd is not None:
+            import ctypes
+            return bool(ctypes.windll.user32.IsWindow(hwnd))
+        return super().is_window_valid(window)
+
+
+KeyEvent = namedtuple('KeyEvent', ['timestamp', 'action', 'key', 'window'])
+
+
+class FakeWindow:
+    """In-memory window used by the recording backend"""
+
+    def __init__(self, backend, title, visible=True, minimized=False, class_name='', process=''):
+        self._backend = backend
+        self.title = title
+        self.visible = visible
+        self.isMinimized = minimized
+        self.class_name = class_name
+        self.process = process
+        self.closed = False
+        self.typed = []
+
+    @property
+    def isActive(self):
+        return self._backend.active_window is self
+
+    def restore(self):
+        self.isMinimized = False
+
+    def activate(self):
+        self._backend.active_window = self
+
+    def close(self):
+        """Removes the window from its backend"""
+        self._backend.remove_window(self)
+
+    def __repr__(self):
+        return f"FakeWindow({self.title!r})"
+
+
+class RecordingBackend(InputBackend, WindowBackend):
+    """Headless input and window backend that records everything in memory
+
+    Keystrokes are stored as timestamped ``KeyEvent`` tuples and typed
+    characters are appended to the active fake window, so throughput and
+    timing can be measured without a display. Set ``reject_paste`` to make
+    the fake clipboard refuse pastes.
+    """
+
+    name = 'recording'
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.windows = []
+        self.events = []
+        self.active_window = None
+        self.clipboard = ''
+        self.reject_paste = False
+        self._lock = threading.Lock()
+
+    def add_window(self, title, visible=True, minimized=False, class_name='', process=''):
+        """Creates a fake window and returns it"""
+        window = FakeWindow(self, title, visible, minimized, class_name, process)
+        self.windows.append(window)
+        return window
+
+    def remove_window(self, window):
+        """Removes a fake window"""
+        self.windows.remove(window)
+        window.closed = True
+        if self.active_window is window:
+            self.active_window = None
+
+    def _record(self, action, key):
+        with self._lock:
+            window = self.active_window
+            self.events.append(KeyEvent(self.clock(), action, key, window))
+            if window is not None and action in ('write', 'paste'):
+                window.typed.append(key)
+
+    def press(self, key):
+        self._record('press', key)
+
+    def write_char(self, char):
+        self._record('write', char)
+
+    def get_clipboard(self):
+        return self.clipboard
+
+    def set_clipboard(self, text):
+        if self.reject_paste:
+            raise RuntimeError("Clipboard is locked")
+        self.clipboard = text
+
+    def paste(self):
+        self._record('paste', self.clipboard)
+
+    def get_windows_with_title(self, title):
+        return [window for window in self.windows if window.title == title]
+
+    def get_all_windows(self):
+        return list(self.windows)
+
+    def get_active_window(self):
+        return self.active_window
+
+    def get_window_class(self, window):
+        return window.class_name
+
+    def get_window_process(self, window):
+        return window.process
+
+    def is_window_valid(self, window):
+        return not window.closed
+
+    def typed_text(self, window=None):
+        """Returns the characters typed into a window (or all of them)"""
+        return ''.join(event.key for event in self.events
+                       if event.action in ('write', 'paste') and (window is None or event.window is window))
+
+    def clear_events(self):
+        """Forgets every recorded event"""
+        with self._lock:
+            self.events = []
+
+
+INPUT_BACKENDS = ('pyautogui', 'pynput', 'recording')
+
+
+def create_backends(name='pyautogui', pause=0.1):
+    """Returns an (input backend, window backend) pair by name"""
+    if name == 'recording':
+        backend = RecordingBackend()
+        return backend, backend
+    if name == 'pynput':
+        return PynputInputBackend(), PyGetWindowBackend()
+    if name == 'pyautogui':
+        return PyAutoGUIInputBackend(pause), PyGetWindowBackend()
+    raise ValueError(f"Unknown input backend: {name}")
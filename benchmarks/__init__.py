@@ -0,0 +1,7 @@
+"""Headless benchmarks for the Windows Auto Text Writer hot paths
+
+Run a benchmark from the repository root, e.g.:
+    python -m benchmarks.bench_scheduler
+
+``python -m benchmarks.run`` runs the suite and stores the results as JSON.
+"""
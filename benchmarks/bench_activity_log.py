@@ -0,0 +1,139 @@
+import threading
+import time
+
+from activity_log import ActivityLog
+from scheduler import LatenessHistogram
+
+RATES = [100, 1000, 5000]
+DURATION = 3.0
+CAPACITY = 100
+PROBE_INTERVAL_MS = 10
+FLUSH_INTERVAL_MS = 33
+
+
+def bench_buffer(lines=200000):
+    """Appends per second into the ring buffer, drained every 100 lines"""
+    log = ActivityLog(CAPACITY)
+    start = time.perf_counter()
+    for index in range(lines):
+        log.append(f"[12:00:00] Line {index}\n")
+        if index % 100 == 99:
+            log.drain()
+    return lines / (time.perf_counter() - start)
+
+
+class LegacyView:
+    """The old logging path: one after(0) per line, re-read to trim"""
+
+    def __init__(self, root, text):
+        self.root = root
+        self.text = text
+
+    def log(self, line):
+        self.root.after(0, lambda: self._append(line))
+
+    def _append(self, line):
+        import tkinter as tk
+        self.text.insert(tk.END, line)
+        self.text.see(tk.END)
+        lines = self.text.get("1.0", tk.END).split("\n")
+        if len(lines) > CAPACITY:
+            self.text.delete("1.0", f"{len(lines) - CAPACITY}.0")
+
+
+class BufferedView:
+    """The ring-buffer path used by the GUI: batched flushes, counted lines"""
+
+    def __init__(self, root, text):
+        self.root = root
+        self.text = text
+        self.buffer = ActivityLog(CAPACITY)
+        self.line_count = 0
+        self.root.after(FLUSH_INTERVAL_MS, self._flush)
+
+    def log(self, line):
+        self.buffer.append(line)
+
+    def _flush(self):
+        import tkinter as tk
+        lines = self.buffer.drain()
+        if lines:
+            text = "".join(lines)
+            self.text.insert(tk.END, text)
+            self.line_count += text.count("\n")
+            excess = self.line_count - CAPACITY
+            if excess > 0:
+                self.text.delete("1.0", f"{excess + 1}.0")
+                self.line_count -= excess
+            self.text.see(tk.END)
+        self.root.after(FLUSH_INTERVAL_MS, self._flush)
+
+
+def bench_event_loop(view_class, rate):
+    """Tk timer lateness while a worker thread logs ``rate`` lines per second"""
+    import tkinter as tk
+    root = tk.Tk()
+    text = tk.Text(root, height=8, width=80)
+    text.pack()
+    view = view_class(root, text)
+    lateness = LatenessHistogram()
+    deadline = time.perf_counter() + DURATION
+
+    def producer():
+        # Log in 10 ms bursts so the rate holds regardless of sleep granularity
+        per_burst = max(1, rate // 100)
+        index = 0
+        while time.perf_counter() < deadline:
+            for _ in range(per_burst):
+                view.log(f"[12:00:00] Line {index}\n")
+                index += 1
+            time.sleep(0.01)
+
+    def probe(expected):
+        now = time.perf_counter()
+        lateness.record(max(0.0, now - expected))
+        if now < deadline:
+            root.after(PROBE_INTERVAL_MS, probe, now + PROBE_INTERVAL_MS / 1000)
+        else:
+            root.quit()
+
+    threading.Thread(target=producer, daemon=True).start()
+    root.after(PROBE_INTERVAL_MS, probe, time.perf_counter() + PROBE_INTERVAL_MS / 1000)
+    root.mainloop()
+    root.destroy()
+    return lateness
+
+
+def collect():
+    """Results for benchmarks.run; the event-loop figures need a display"""
+    results = {'appends_per_s': bench_buffer()}
+    try:
+        import tkinter as tk
+        tk.Tk().destroy()
+    except Exception:
+        return results
+    for rate in RATES:
+        lateness = bench_event_loop(BufferedView, rate)
+        results[f"event_loop_p99_ms_{rate}"] = lateness.percentile(0.99)
+        results[f"event_loop_max_ms_{rate}"] = lateness.max
+    return results
+
+
+def main():
+    print(f"Ring buffer: {bench_buffer():,.0f} appends/s")
+    try:
+        import tkinter as tk
+        tk.Tk().destroy()
+    except Exception as e:
+        print(f"Skipping Tk event-loop benchmark ({e}); run it under a display, "
+              f"e.g. xvfb-run python -m benchmarks.bench_activity_log")
+        return
+
+    print(f"{'lines/s':>8} {'view':>9}  event-loop lateness")
+    for rate in RATES:
+        for label, view_class in (('legacy', LegacyView), ('buffered', BufferedView)):
+            print(f"{rate:>8} {label:>9}  {bench_event_loop(view_class, rate).summary()}")
+
+
+if __name__ == "__main__":
+    main()
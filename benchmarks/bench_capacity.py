@@ -0,0 +1,38 @@
+import random
+import time
+
+from capacity import plan_capacity
+from commands import Command
+
+SIZES = [100, 1000, 10000, 100000]
+
+
+def make_commands(count):
+    """Commands with whole-minute intervals, as the front ends create them"""
+    rng = random.Random(count)
+    return [Command(f"Text {i} " * rng.randint(1, 5), rng.randint(5, 240), id=f"cmd{i:06d}")
+            for i in range(count)]
+
+
+def bench_plan(count):
+    """Milliseconds to plan a day of ``count`` commands; returns (ms, plan)"""
+    commands = make_commands(count)
+    start = time.perf_counter()
+    plan = plan_capacity(commands, 0.05)
+    return (time.perf_counter() - start) * 1000, plan
+
+
+def collect():
+    """Results for benchmarks.run"""
+    return {f"plan_ms_{size}": bench_plan(size)[0] for size in SIZES}
+
+
+def main():
+    print(f"{'commands':>9} {'plan':>10} {'fire times':>11} {'utilisation':>12}")
+    for size in SIZES:
+        elapsed, plan = bench_plan(size)
+        print(f"{size:>9} {elapsed:>7.1f} ms {plan.fires:>11} {plan.utilisation * 100:>11.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Start-up to first keystroke budget in ms, excluding the focus wait; the
+# check fails above it
+BUDGET_MS = 200.0
+RUNS = 5
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'auto_text_writer.py')
+
+
+def write_settings(directory):
+    """A settings.json with one window and a few commands"""
+    settings = {
+        'app_version': '0.4',
+        'application_config': {'window_title': 'Notepad', 'typing_speed': 0, 'open_delay': 0},
+        'text_commands': [{'id': f'cmd{i}', 'text': f'Text {i}', 'interval_minutes': 5} for i in range(10)]
+    }
+    path = os.path.join(directory, 'settings.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(settings, f)
+    return path
+
+
+def measure(settings_file, appdata):
+    """Runs one headless dry run in a fresh interpreter; returns the reported start-up ms"""
+    env = dict(os.environ, APPDATA=appdata)
+    output = subprocess.run([sys.executable, SCRIPT, '--config', settings_file, '--dry-run', '--once',
+                             '--daemon', '--report-startup'],
+                            env=env, check=True, capture_output=True, text=True).stdout
+    for line in output.splitlines():
+        if line.startswith('Start-up: first keystroke after '):
+            return float(line.split()[4])
+    raise RuntimeError(f"No start-up time reported:\n{output}")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        settings_file = write_settings(directory)
+        # The first run also compiles the bytecode cache, so it is not timed
+        measure(settings_file, directory)
+        results = sorted(measure(settings_file, directory) for _ in range(RUNS))
+
+    ok = results[-1] <= BUDGET_MS
+    print(f"start-up to first keystroke: best {results[0]:.1f} ms, median {results[len(results) // 2]:.1f} ms, "
+          f"worst {results[-1]:.1f} ms (budget {BUDGET_MS:.0f} ms) {'' if ok else 'FAIL'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import random
+import time
+import tracemalloc
+
+from commands import load_commands
+from scheduler import Scheduler
+
+COUNT = 100000
+ROUNDS = 5
+
+
+def make_entries(count):
+    """Command entries shaped like the ones stored in settings.json"""
+    rng = random.Random(count)
+    return [{"id": f"cmd{i:06d}", "text": f"Text {i}", "interval_minutes": rng.randint(1, 120),
+             "enabled": rng.random() > 0.1, "created_date": "2025-01-01T00:00:00"}
+            for i in range(count)]
+
+
+def measure(build):
+    """Returns (result, bytes allocated by build)"""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def best_of(fn):
+    """Best wall-clock seconds over ROUNDS calls"""
+    best = float('inf')
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def scan_dicts(commands):
+    """The front ends' per-tick scan: enabled commands and their intervals"""
+    return sum(cmd['interval_minutes'] for cmd in commands if cmd.get('enabled', True))
+
+
+def scan_records(commands):
+    return sum(cmd.interval_minutes for cmd in commands if cmd.enabled)
+
+
+def main():
+    entries = make_entries(COUNT)
+    dicts, dict_bytes = measure(lambda: [dict(entry) for entry in entries])
+    (records, errors), record_bytes = measure(lambda: load_commands(entries))
+    assert not errors and len(records) == COUNT
+
+    print(f"{COUNT} commands")
+    print(f"  memory:     dict {dict_bytes / COUNT:.0f} B/command, "
+          f"Command {record_bytes / COUNT:.0f} B/command ({dict_bytes / record_bytes:.1f}x smaller)")
+
+    dict_scan = best_of(lambda: scan_dicts(dicts))
+    record_scan = best_of(lambda: scan_records(records))
+    print(f"  iteration:  dict {dict_scan * 1000:.1f} ms, Command {record_scan * 1000:.1f} ms "
+          f"({dict_scan / record_scan:.1f}x faster)")
+
+    validate = best_of(lambda: load_commands(entries))
+    print(f"  validation: {validate * 1000:.0f} ms once at load ({validate / COUNT * 1e6:.2f} us/command)")
+
+    def schedule_all():
+        scheduler = Scheduler()
+        for command in records:
+            scheduler.schedule_in(command, command.interval_minutes * 60)
+        return scheduler
+    _, schedule_bytes = measure(schedule_all)
+    print(f"  schedule:   {schedule_bytes / COUNT:.0f} B/command of scheduler state")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import time
+
+from commands_view import sync_rows
+
+SIZES = [1000, 10000, 50000]
+
+
+class CountingTree:
+    """Stand-in for a Treeview that only counts widget calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def delete(self, *items):
+        self.calls += 1
+
+    def insert(self, parent, index, iid=None, values=()):
+        self.calls += 1
+
+    def item(self, iid, values=()):
+        self.calls += 1
+
+    def move(self, iid, parent, index):
+        self.calls += 1
+
+
+def make_rows(count, status="✓ Active"):
+    """Rows keyed by stable command id, like the GUI builds them"""
+    return {f"cmd{i:06d}": (f"Text {i}", 30, status) for i in range(count)}
+
+
+def edits(rows):
+    """The single-row changes the GUI makes, as (name, new rows) pairs"""
+    middle = f"cmd{len(rows) // 2:06d}"
+    edited = dict(rows)
+    edited[middle] = ("Edited text", 45, rows[middle][2])
+    deleted = dict(rows)
+    del deleted[middle]
+    added = dict(rows)
+    added["new"] = ("New command", 10, "✓ Active")
+    relabelled = {row_id: values[:2] + ("✓ Activo",) for row_id, values in rows.items()}
+    return [('edit', edited), ('delete', deleted), ('add', added), ('language', relabelled)]
+
+
+def legacy_refresh(tree, rows):
+    """The old refresh: delete every row, then insert them all again"""
+    for item in tree.get_children():
+        tree.delete(item)
+    for row_id, values in rows.items():
+        tree.insert('', 'end', iid=row_id, values=values)
+
+
+def bench_calls(size):
+    """Widget calls per change for the legacy refresh and the diff"""
+    rows = make_rows(size)
+    results = {}
+    for name, changed in edits(rows):
+        tree = CountingTree()
+        sync_rows(tree, rows, changed)
+        results[name] = (size + len(changed), tree.calls)
+    return results
+
+
+def bench_tk(size):
+    """Wall-clock ms per change on a real Treeview, legacy vs diff"""
+    import tkinter as tk
+    from tkinter import ttk
+    root = tk.Tk()
+    tree = ttk.Treeview(root, columns=("Text", "Interval", "Status"), show='headings')
+    tree.pack()
+    rows = make_rows(size)
+    results = {}
+    for name, changed in edits(rows):
+        legacy_refresh(tree, rows)
+        root.update()
+        start = time.perf_counter()
+        legacy_refresh(tree, changed)
+        root.update()
+        legacy = time.perf_counter() - start
+
+        legacy_refresh(tree, rows)
+        root.update()
+        start = time.perf_counter()
+        sync_rows(tree, rows, changed)
+        root.update()
+        results[name] = (legacy * 1000, (time.perf_counter() - start) * 1000)
+    root.destroy()
+    return results
+
+
+def main():
+    print("Widget calls per change (legacy rebuild vs diff):")
+    for size in SIZES:
+        cells = ', '.join(f"{name} {legacy}/{diff}" for name, (legacy, diff) in bench_calls(size).items())
+        print(f"  {size:>6} commands: {cells}")
+
+    try:
+        import tkinter as tk
+        tk.Tk().destroy()
+    except Exception as e:
+        print(f"Skipping Treeview timings ({e}); run under Xvfb, "
+              f"e.g. xvfb-run python -m benchmarks.bench_commands_tree")
+        return
+
+    print("Treeview ms per change (legacy rebuild vs diff):")
+    for size in SIZES:
+        cells = ', '.join(f"{name} {legacy:.1f}/{diff:.1f}" for name, (legacy, diff) in bench_tk(size).items())
+        print(f"  {size:>6} commands: {cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import statistics
+import tempfile
+import time
+
+from config import Config
+
+KEYSTROKES = 40
+KEYSTROKE_INTERVAL = 0.05
+COMMAND_COUNTS = [3, 1000]
+SAVE_COMMAND_COUNTS = [3, 1000, 10000]
+SAVE_ROUNDS = 5
+
+
+def bench_editing(save_delay, command_count):
+    """Types a window title one auto-saved keystroke at a time
+
+    Returns the number of saves requested and written and how long each
+    ``set`` call blocked the caller, which is the Tk thread in the GUI.
+    """
+    with tempfile.TemporaryDirectory() as config_dir:
+        config = Config(config_dir, save_delay=save_delay)
+        config.set_text_commands([{"text": f"Text {i}", "interval_minutes": 30, "enabled": True}
+                                  for i in range(command_count)], auto_save=False)
+
+        title = "Untitled - Notepad and a long window title"[:KEYSTROKES]
+        stalls = []
+        for length in range(1, len(title) + 1):
+            start = time.perf_counter()
+            config.set_window_title(title[:length], auto_save=True)
+            stalls.append(time.perf_counter() - start)
+            time.sleep(KEYSTROKE_INTERVAL)
+
+        config.flush()
+        saved = Config(config_dir).get_window_title()
+        return {
+            'requested': config.saves_requested,
+            'writes': config.writes,
+            'mean_stall_ms': statistics.mean(stalls) * 1000,
+            'max_stall_ms': max(stalls) * 1000,
+            'saved_ok': saved == title
+        }
+
+
+def bench_save(command_count):
+    """Best milliseconds of one save_config: serialise and atomically replace the file"""
+    with tempfile.TemporaryDirectory() as config_dir:
+        config = Config(config_dir, save_delay=0)
+        config.set_text_commands([{"id": f"cmd{i:06d}", "text": f"Text {i}", "interval_minutes": 30,
+                                   "enabled": True, "created_date": "2025-01-01T00:00:00"}
+                                  for i in range(command_count)], auto_save=False)
+        best = float('inf')
+        for _ in range(SAVE_ROUNDS):
+            start = time.perf_counter()
+            config.save_config()
+            best = min(best, time.perf_counter() - start)
+        return best * 1000
+
+
+def collect():
+    """Results for benchmarks.run"""
+    results = {f"save_config_ms_{count}": bench_save(count) for count in SAVE_COMMAND_COUNTS}
+    for count in COMMAND_COUNTS:
+        stats = bench_editing(Config.SAVE_DELAY, count)
+        results[f"edit_writes_{count}"] = stats['writes']
+        results[f"edit_max_stall_ms_{count}"] = stats['max_stall_ms']
+    return results
+
+
+def main():
+    print("save_config: " + ", ".join(f"{count} commands {bench_save(count):.1f} ms"
+                                      for count in SAVE_COMMAND_COUNTS))
+    print(f"{'commands':>9} {'mode':>14} {'requested':>10} {'writes':>7} "
+          f"{'mean stall':>11} {'max stall':>11} {'saved':>6}")
+    for count in COMMAND_COUNTS:
+        for label, delay in (('synchronous', 0), ('write-behind', Config.SAVE_DELAY)):
+            stats = bench_editing(delay, count)
+            print(f"{count:>9} {label:>14} {stats['requested']:>10} {stats['writes']:>7} "
+                  f"{stats['mean_stall_ms']:>8.3f} ms {stats['max_stall_ms']:>8.3f} ms "
+                  f"{'yes' if stats['saved_ok'] else 'NO':>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import time
+
+from i18n import I18n
+
+LOOKUPS = 200000
+KEYS = [
+    ('ui.commands', ()),
+    ('buttons.start', ()),
+    ('log.executing', ()),
+    ('log.window_not_found', ('Notepad',)),
+    ('log.typing_rate', (12, 0.6, 20.0, 20.0)),
+    ('log.no_such_key', ())
+]
+
+
+def legacy_t(i18n, key_path, *args):
+    """The old lookup: split the key and walk nested dicts, then English"""
+    for lang_code in (i18n.current_language, 'en'):
+        value = i18n.load_language(lang_code)
+        for key in key_path.split('.'):
+            if isinstance(value, dict) and key in value:
+                value = value[key]
+            else:
+                value = None
+                break
+        if value is not None:
+            break
+    if args and isinstance(value, str):
+        try:
+            return value.format(*args)
+        except (IndexError, ValueError):
+            return value
+    return value if isinstance(value, str) else key_path
+
+
+def bench(lookup, language):
+    """Lookups per second for a translate function over a mix of keys"""
+    i18n = I18n()
+    i18n.set_language(language)
+    rounds = LOOKUPS // len(KEYS)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for key, args in KEYS:
+            lookup(i18n, key, *args)
+    return rounds * len(KEYS) / (time.perf_counter() - start)
+
+
+def collect():
+    """Results for benchmarks.run"""
+    return {f"lookups_per_s_{language}": bench(I18n.t, language) for language in ('en', 'es')}
+
+
+def main():
+    print(f"{'language':>9} {'legacy/s':>12} {'flat/s':>12} {'speedup':>8}")
+    for language in ('en', 'es'):
+        legacy = bench(legacy_t, language)
+        flat = bench(I18n.t, language)
+        print(f"{language:>9} {legacy:>12,.0f} {flat:>12,.0f} {flat / legacy:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import socket
+import time
+import urllib.request
+
+from commands import Command
+from metrics import ExecutionMetrics, PhaseTimer, PHASES, RESULT_OK
+
+COMMAND_COUNTS = [10, 100, 1000, 10000]
+EXECUTIONS = 20000
+# Shortest real execution: the default 0.5 s open delay alone
+EXECUTION_FLOOR_MS = 500.0
+
+
+def timed_execution(metrics, command):
+    """The instrumentation of one execution, without the work it times"""
+    timer = PhaseTimer()
+    for phase in PHASES:
+        timer.mark(phase)
+    metrics.record(command, timer, RESULT_OK)
+
+
+def bench_overhead():
+    """Microseconds of instrumentation per execution"""
+    metrics = ExecutionMetrics()
+    commands = [Command(f"Text {i}", 5, id=f"cmd{i}") for i in range(100)]
+    start = time.perf_counter()
+    for i in range(EXECUTIONS):
+        timed_execution(metrics, commands[i % len(commands)])
+    return (time.perf_counter() - start) / EXECUTIONS * 1e6
+
+
+def filled_metrics(count):
+    """Metrics of ``count`` commands that each executed a few times"""
+    metrics = ExecutionMetrics()
+    for i in range(count):
+        command = Command(f"Text {i}", 5, id=f"cmd{i}")
+        for _ in range(3):
+            timed_execution(metrics, command)
+    return metrics
+
+
+def free_port():
+    """A local port nothing listens on"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def bench_scrape(metrics):
+    """Milliseconds to fetch the metrics over HTTP"""
+    port = metrics.start_export(port=free_port())
+    try:
+        start = time.perf_counter()
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            response.read()
+        return (time.perf_counter() - start) * 1000
+    finally:
+        metrics.stop_export()
+
+
+def main():
+    overhead = bench_overhead()
+    print(f"instrumentation: {overhead:.1f} us per execution "
+          f"({overhead / 1000 / EXECUTION_FLOOR_MS * 100:.4f}% of a {EXECUTION_FLOOR_MS:.0f} ms execution)")
+
+    print(f"{'commands':>10} {'render':>10} {'size':>10} {'scrape':>10}")
+    for count in COMMAND_COUNTS:
+        metrics = filled_metrics(count)
+        start = time.perf_counter()
+        text = metrics.render()
+        render_ms = (time.perf_counter() - start) * 1000
+        scrape_ms = bench_scrape(metrics)
+        print(f"{count:>10} {render_ms:>7.1f} ms {len(text) / 1024:>7.0f} KB {scrape_ms:>7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
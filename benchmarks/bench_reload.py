@@ -0,0 +1,68 @@
+import json
+import tempfile
+import time
+
+from config import Config
+from scheduler import Scheduler
+
+SIZES = [1000, 10000, 100000]
+
+
+def write_commands(config, entries):
+    """Rewrites settings.json as an outside editor would"""
+    data = dict(config.config_data, text_commands=entries)
+    config.config_file.write_text(json.dumps(data, indent=2), encoding='utf-8')
+
+
+def reload(config, scheduler, commands):
+    """One watcher pass: check, reload and apply the delta; returns (ms, new commands, diff)"""
+    start = time.perf_counter()
+    diff = None
+    if config.reload_if_changed():
+        new_commands = config.get_commands()
+        diff = config.take_reload_diff()
+        scheduler.apply_changes(diff)
+        commands = new_commands
+    return (time.perf_counter() - start) * 1000, commands, diff
+
+
+def bench(size):
+    """Reload cost for an untouched file, one edited command and every command edited"""
+    with tempfile.TemporaryDirectory() as directory:
+        config = Config(directory, save_delay=0)
+        entries = [{"id": f"cmd{i:06d}", "text": f"Text {i}", "interval_minutes": 30,
+                    "enabled": True, "created_date": "2025-01-01T00:00:00"} for i in range(size)]
+        write_commands(config, entries)
+        config.reload_if_changed()
+        commands = config.get_commands()
+        config.take_reload_diff()
+        scheduler = Scheduler()
+        for command in commands:
+            scheduler.schedule_in(command, 1800)
+
+        results = {}
+        results['untouched'], commands, _ = reload(config, scheduler, commands)
+
+        entries = [dict(entry) for entry in entries]
+        entries[size // 2]['interval_minutes'] = 45
+        write_commands(config, entries)
+        results['one edit'], commands, diff = reload(config, scheduler, commands)
+        assert len(diff.changed) == 1 and not diff.added and not diff.removed
+
+        entries = [dict(entry, interval_minutes=60) for entry in entries]
+        write_commands(config, entries)
+        results['all edited'], commands, diff = reload(config, scheduler, commands)
+        assert len(diff.changed) == size
+        return results
+
+
+def main():
+    print(f"{'commands':>10} {'untouched':>12} {'one edit':>12} {'all edited':>12}")
+    for size in SIZES:
+        results = bench(size)
+        print(f"{size:>10} {results['untouched']:>9.3f} ms {results['one edit']:>9.1f} ms "
+              f"{results['all edited']:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
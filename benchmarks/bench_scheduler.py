@@ -0,0 +1,123 @@
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+from commands import load_commands
+from scheduler import Scheduler
+
+SIZES = [10, 100, 1000, 10000, 100000]
+TICKS = 2000
+
+
+class FakeClock:
+    """Virtual clock whose sleep() advances time instantly"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def make_commands(count):
+    """Builds command dicts shaped like the ones stored in settings.json"""
+    rng = random.Random(count)
+    return [{"text": f"Text {i}", "interval_minutes": rng.randint(1, 120), "enabled": True}
+            for i in range(count)]
+
+
+def make_records(count):
+    """The same commands as validated Command records, as the front ends use them"""
+    return load_commands(make_commands(count))[0]
+
+
+def bench_legacy_tick(commands):
+    """Per-tick cost of the old scan-every-command loop"""
+    now = datetime.now()
+    rng = random.Random(1)
+    for config in commands:
+        config['next_execution'] = now + timedelta(seconds=rng.randint(1, 7200))
+
+    ticks = min(TICKS, 200)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        now = datetime.now()
+        for config in commands:
+            if config.get('enabled', True) and now >= config['next_execution']:
+                config['next_execution'] = now + timedelta(minutes=config['interval_minutes'])
+    return (time.perf_counter() - start) / ticks
+
+
+def bench_heap_tick(commands):
+    """Per-fire cost of the heap scheduler: wait, fire and reschedule"""
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock.time, sleep=clock.sleep)
+    rng = random.Random(1)
+    for config in commands:
+        scheduler.schedule(config, rng.uniform(1, 7200))
+
+    fired = 0
+    start = time.perf_counter()
+    while fired < TICKS:
+        for config, _ in scheduler.wait(lambda: True):
+            scheduler.schedule_in(config, config.interval_minutes * 60)
+            fired += 1
+    return (time.perf_counter() - start) / fired
+
+
+def bench_idle_wakeups(commands, idle_seconds=600):
+    """Wakeups per idle minute while nothing is due"""
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock.time, sleep=clock.sleep)
+    for config in commands:
+        scheduler.schedule(config, idle_seconds + config.interval_minutes * 60)
+
+    scheduler.wait(lambda: clock.now < idle_seconds)
+    return scheduler.wakeups / (idle_seconds / 60)
+
+
+def bench_stop_latency(commands, idle_seconds=0.5):
+    """Real-time wait: wakeups while idle, then ms from a stop request to wait() returning"""
+    scheduler = Scheduler()
+    for config in commands:
+        scheduler.schedule_in(config, config.interval_minutes * 60)
+    running = [True]
+    waiter = threading.Thread(target=scheduler.wait, args=(lambda: running[0],))
+    waiter.start()
+    time.sleep(idle_seconds)
+    start = time.perf_counter()
+    running[0] = False
+    scheduler.interrupt()
+    waiter.join()
+    return scheduler.wakeups, (time.perf_counter() - start) * 1000
+
+
+def collect():
+    """Results for benchmarks.run"""
+    results = {}
+    for size in SIZES:
+        results[f"heap_tick_us_{size}"] = bench_heap_tick(make_records(size)) * 1e6
+        results[f"idle_wakeups_per_min_{size}"] = bench_idle_wakeups(make_records(size))
+    wakeups, latency = bench_stop_latency(make_records(100))
+    results['real_idle_wakeups'] = wakeups
+    results['stop_latency_ms'] = latency
+    return results
+
+
+def main():
+    print(f"{'commands':>10} {'legacy tick':>14} {'heap tick':>14} {'wakeups/min':>12}")
+    for size in SIZES:
+        legacy = bench_legacy_tick(make_commands(size))
+        heap = bench_heap_tick(make_records(size))
+        wakeups = bench_idle_wakeups(make_records(size))
+        print(f"{size:>10} {legacy * 1e6:>11.1f} us {heap * 1e6:>11.1f} us {wakeups:>12.1f}")
+    wakeups, latency = bench_stop_latency(make_records(100))
+    print(f"Real clock: {wakeups} wakeups while idle, stopped after {latency:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import random
+
+from commands import Command, load_commands
+from simulation import Simulator, DAY
+
+SIZES = [100, 1000, 10000]
+# The commands the console wizard suggests
+DEFAULT_COMMANDS = [{"text": "Text 1", "interval_minutes": 91},
+                    {"text": "Text 2", "interval_minutes": 31},
+                    {"text": "Text 3", "interval_minutes": 32}]
+
+
+def bench_week():
+    """A week of the default commands at the default speed and delays"""
+    commands = load_commands(DEFAULT_COMMANDS)[0]
+    return Simulator(commands, "Notepad", typing_speed=0.2).run(7 * DAY)
+
+
+def bench_scale(count):
+    """A day of ``count`` commands with instant typing; statistics only"""
+    rng = random.Random(count)
+    commands = [Command(f"Text {i}", rng.randint(30, 600), id=f"cmd{i:06d}") for i in range(count)]
+    simulator = Simulator(commands, "Notepad", typing_speed=0, open_delay=0, inter_message_gap=0)
+    return simulator.run(DAY, timeline=False)
+
+
+def collect():
+    """Results for benchmarks.run"""
+    week = bench_week()
+    results = {'default_week_ms': week.elapsed * 1000}
+    for size in SIZES:
+        result = bench_scale(size)
+        results[f"fires_per_s_{size}"] = result.count / result.elapsed
+    return results
+
+
+def main():
+    week = bench_week()
+    print("A week of the default commands:")
+    print(week.summary())
+    print()
+    print(f"{'commands':>9} {'fires/day':>10} {'real time':>10} {'fires/s':>10}")
+    for size in SIZES:
+        result = bench_scale(size)
+        print(f"{size:>9} {result.count:>10} {result.elapsed:>8.2f} s {result.count / result.elapsed:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+# Import-time budget per module in ms, including its stdlib imports (json,
+# pathlib, threading); the check fails above it. The baseline modules took
+# about 20 ms
+IMPORT_BUDGET_MS = {
+    'config': 30.0,
+    'i18n': 30.0
+}
+RUNS = 10
+# Bytecode cache of the timed imports, kept out of the source tree
+PYCACHE = os.path.join(tempfile.gettempdir(), 'bench_startup_pycache')
+
+# Runs in a fresh interpreter: times the import, then reports side effects
+PROBE = """
+import os, sys, time
+start = time.perf_counter()
+module = __import__(sys.argv[1])
+elapsed = (time.perf_counter() - start) * 1000
+created = os.path.exists(os.path.join(os.environ['APPDATA'], 'WindowsAutoTextWriter'))
+loaded = sorted(module._i18n.languages) if getattr(module, '_i18n', None) else []
+print(elapsed, created, ','.join(loaded))
+"""
+
+
+def measure_import(module):
+    """Imports a module in a fresh interpreter; returns (ms, dir created, languages loaded)"""
+    with tempfile.TemporaryDirectory() as appdata:
+        # Imports are timed from the bytecode cache, as users run them; with
+        # PYTHONDONTWRITEBYTECODE every run would compile the source instead
+        env = dict(os.environ, APPDATA=appdata, PYTHONPYCACHEPREFIX=PYCACHE)
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+        output = subprocess.run([sys.executable, '-c', PROBE, module], env=env, check=True,
+                                capture_output=True, text=True, cwd=os.getcwd()).stdout.split()
+    return float(output[0]), output[1] == 'True', output[2] if len(output) > 2 else ''
+
+
+def check_lazy_languages():
+    """Returns the languages loaded after selecting Spanish and translating"""
+    from i18n import I18n
+    i18n = I18n()
+    i18n.set_language('es')
+    i18n.t('log.no_such_key')
+    return sorted(i18n.languages)
+
+
+def main():
+    failed = False
+    print(f"{'module':>8} {'best import':>12} {'budget':>9} {'side effects':>14}")
+    for module, budget in IMPORT_BUDGET_MS.items():
+        # The first run also compiles the bytecode cache, so it is not timed
+        measure_import(module)
+        results = [measure_import(module) for _ in range(RUNS)]
+        best = min(result[0] for result in results)
+        created = any(result[1] for result in results)
+        languages = results[0][2]
+        effects = 'AppData dir' if created else (f"loaded {languages}" if languages else 'none')
+        ok = best <= budget and effects == 'none'
+        failed = failed or not ok
+        print(f"{module:>8} {best:>9.2f} ms {budget:>6.1f} ms {effects:>14} {'' if ok else 'FAIL'}")
+
+    loaded = check_lazy_languages()
+    print(f"Languages loaded for 'es': {', '.join(loaded)}")
+    if loaded != ['en', 'es']:
+        failed = True
+        print("FAIL: expected only the active language and the English fallback")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
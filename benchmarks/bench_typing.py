@@ -0,0 +1,79 @@
+import statistics
+
+from auto_text_writer import WindowTextWriter
+from backends import RecordingBackend
+from typing_engine import TypingEngine
+
+SPEEDS = [0.0, 0.001, 0.005, 0.01]
+TEXT_LENGTH = 200
+
+
+def bench_pacing(seconds_per_char, length=TEXT_LENGTH):
+    """Types into the recording backend and measures keystroke timing"""
+    backend = RecordingBackend()
+    window = backend.add_window("Notepad")
+    window.activate()
+    engine = TypingEngine(backend.write_char)
+
+    result = engine.type_text("x" * length, seconds_per_char)
+    stamps = [event.timestamp for event in backend.events]
+    start = stamps[0]
+    errors = [abs((stamp - start) - index * seconds_per_char) for index, stamp in enumerate(stamps)]
+    return {
+        'target_rate': result.target_rate,
+        'rate': result.rate,
+        'mean_error_ms': statistics.mean(errors) * 1000,
+        'max_error_ms': max(errors) * 1000
+    }
+
+
+def bench_write_text(seconds_per_char, length=TEXT_LENGTH):
+    """Pacing of the keystrokes ``write_text`` sends between its two Enters"""
+    backend = RecordingBackend()
+    backend.add_window("Notepad").activate()
+    writer = WindowTextWriter(backend, backend)
+    writer.running = True
+    writer.quiet = True
+    writer.open_delay = 0
+    writer.typing_speed = seconds_per_char
+
+    writer.write_text("x" * length)
+    stamps = [event.timestamp for event in backend.events if event.action == 'write']
+    start = stamps[0]
+    errors = [abs((stamp - start) - index * seconds_per_char) for index, stamp in enumerate(stamps)]
+    return {
+        'mean_error_ms': statistics.mean(errors) * 1000,
+        'max_error_ms': max(errors) * 1000,
+        'chars': len(stamps)
+    }
+
+
+def collect():
+    """Results for benchmarks.run"""
+    results = {}
+    for speed in SPEEDS:
+        engine = bench_pacing(speed)
+        writer = bench_write_text(speed)
+        results[f"engine_mean_error_ms_{speed}"] = engine['mean_error_ms']
+        results[f"engine_max_error_ms_{speed}"] = engine['max_error_ms']
+        results[f"write_text_mean_error_ms_{speed}"] = writer['mean_error_ms']
+        results[f"write_text_max_error_ms_{speed}"] = writer['max_error_ms']
+    return results
+
+
+def main():
+    print(f"{'s/char':>8} {'target/s':>10} {'achieved/s':>12} {'mean err':>10} {'max err':>10}")
+    for speed in SPEEDS:
+        stats = bench_pacing(speed)
+        print(f"{speed:>8} {stats['target_rate']:>10.0f} {stats['rate']:>12.0f} "
+              f"{stats['mean_error_ms']:>7.3f} ms {stats['max_error_ms']:>7.3f} ms")
+
+    print()
+    print(f"{'s/char':>8} {'write_text mean err':>20} {'max err':>10}")
+    for speed in SPEEDS:
+        stats = bench_write_text(speed)
+        print(f"{speed:>8} {stats['mean_error_ms']:>17.3f} ms {stats['max_error_ms']:>7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import time
+
+from backends import RecordingBackend
+from window_resolver import WindowResolver, WindowMatcher, MATCH_SUBSTRING, MATCH_REGEX
+
+SIZES = [10, 100, 1000, 10000]
+LOOKUPS = 200
+MATCHERS = [
+    ('substring', WindowMatcher("notepad", MATCH_SUBSTRING)),
+    ('regex', WindowMatcher(r"- Notepad$", MATCH_REGEX)),
+    ('process', WindowMatcher("notepad", process='notepad.exe'))
+]
+
+
+def make_desktop(count):
+    """A recording backend with ``count`` windows; the target is the last one enumerated"""
+    backend = RecordingBackend()
+    for i in range(count - 1):
+        backend.add_window(f"Document {i} - Editor", class_name='Editor', process='editor.exe')
+    backend.add_window("Untitled - Notepad", class_name='Notepad', process='notepad.exe')
+    return backend
+
+
+def bench_lookup(count, matcher):
+    """Microseconds per lookup: full enumeration (miss) and cached window (hit)"""
+    backend = make_desktop(count)
+    resolver = WindowResolver(backend)
+    lookups = max(5, LOOKUPS * 10 // count)
+
+    start = time.perf_counter()
+    for _ in range(lookups):
+        resolver.begin_tick()
+        resolver.invalidate()
+        window = resolver.resolve(matcher)
+    miss = (time.perf_counter() - start) / lookups
+    assert window is not None and window.title == "Untitled - Notepad"
+
+    start = time.perf_counter()
+    for _ in range(LOOKUPS):
+        resolver.resolve(matcher)
+    hit = (time.perf_counter() - start) / LOOKUPS
+    return miss * 1e6, hit * 1e6
+
+
+def collect():
+    """Results for benchmarks.run"""
+    results = {}
+    for size in SIZES:
+        for label, matcher in MATCHERS:
+            miss, hit = bench_lookup(size, matcher)
+            results[f"{label}_miss_us_{size}"] = miss
+            results[f"{label}_hit_us_{size}"] = hit
+    return results
+
+
+def main():
+    results = collect()
+    print(f"{'windows':>8} {'matcher':>10} {'miss':>12} {'hit':>10}")
+    for size in SIZES:
+        for label, _ in MATCHERS:
+            print(f"{size:>8} {label:>10} {results[f'{label}_miss_us_{size}']:>9.1f} us "
+                  f"{results[f'{label}_hit_us_{size}']:>7.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import argparse
+import importlib
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Benchmarks of the suite, in run order; each module has a collect() that
+# returns {metric: number}
+BENCHMARKS = ['scheduler', 'simulation', 'capacity', 'window_resolver', 'typing', 'i18n', 'config_save', 'activity_log']
+RESULTS_DIR = Path(__file__).parent / 'results'
+# Relative change above which a metric counts as a regression
+THRESHOLD = 0.25
+
+
+def higher_is_better(metric):
+    """Throughput metrics improve upwards, everything else (times, errors, counts) downwards"""
+    return '_per_s' in metric
+
+
+def git_commit():
+    """Current commit of the repository, or None"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names):
+    """Runs the benchmarks and returns the results document"""
+    document = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': {},
+        'seconds': {}
+    }
+    for name in names:
+        print(f"Running {name}...", flush=True)
+        module = importlib.import_module(f'benchmarks.bench_{name}')
+        start = time.perf_counter()
+        document['results'][name] = module.collect()
+        document['seconds'][name] = round(time.perf_counter() - start, 2)
+    return document
+
+
+def compare(baseline, current, threshold=THRESHOLD):
+    """Prints metrics that changed by more than ``threshold``; returns the regressions"""
+    regressions = []
+    for name, metrics in current['results'].items():
+        previous = baseline.get('results', {}).get(name, {})
+        for metric, value in metrics.items():
+            old = previous.get(metric)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not isinstance(old, (int, float)):
+                continue
+            if old == value:
+                continue
+            change = (value - old) / abs(old) if old else float('inf')
+            worse = change < 0 if higher_is_better(metric) else change > 0
+            if abs(change) <= threshold:
+                continue
+            label = 'REGRESSION' if worse else 'improved'
+            print(f"  {label:>10} {name}.{metric}: {old:.4g} -> {value:.4g} ({change:+.0%})")
+            if worse:
+                regressions.append(f"{name}.{metric}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run',
+                                     description="Runs the benchmark suite and stores the results as JSON")
+    parser.add_argument('names', nargs='*', metavar='NAME',
+                        help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument('--output', metavar='FILE',
+                        help="results file (default: benchmarks/results/<date>-<commit>.json)")
+    parser.add_argument('--compare', metavar='FILE', help="earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help=f"relative change reported as a regression (default: {THRESHOLD})")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    document = run(args.names or BENCHMARKS)
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{document['commit'] or 'unknown'}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2), encoding='utf-8')
+    print(f"Results written to {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        print(f"Compared with {args.compare} ({baseline.get('commit')}, {baseline.get('created')}):")
+        regressions = compare(baseline, document, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressions above {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"No regressions above {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import heapq
+
+from scheduler import interval_seconds
+from typing_engine import ClipboardPaster, DELIVERY_AUTO, DELIVERY_PASTE, DELIVERY_TYPE
+from metrics import PHASE_RESOLVE, PHASE_FOCUS, PHASE_SUBMIT
+
+DAY = 24 * 60 * 60
+# Keyboard share above which the plan is reported as tight
+HIGH_UTILISATION = 0.8
+# Collision points kept in a plan, worst first
+MAX_COLLISIONS = 10
+# Fire times swept at most; a longer sweep stops early and covers less than the horizon
+MAX_SWEEP_STEPS = 200000
+
+
+class Overheads:
+    """Per-execution costs of the backend on top of the configured delays, in seconds
+
+    ``key`` is the time one keystroke call takes; the typing engine
+    absorbs it while it is shorter than the typing speed.
+    """
+
+    __slots__ = ('resolve', 'focus', 'key', 'submit')
+
+    def __init__(self, resolve=0.01, focus=0.05, key=0.0, submit=0.01):
+        self.resolve = resolve
+        self.focus = focus
+        self.key = key
+        self.submit = submit
+
+    @classmethod
+    def from_metrics(cls, metrics):
+        """Overheads measured by earlier executions, defaults for phases not seen yet"""
+        overheads = cls()
+        for phase, attribute in ((PHASE_RESOLVE, 'resolve'), (PHASE_FOCUS, 'focus'), (PHASE_SUBMIT, 'submit')):
+            histogram = metrics.phases[phase]
+            if histogram.count:
+                setattr(overheads, attribute, histogram.total / histogram.count / 1000)
+        if metrics.phases[PHASE_SUBMIT].count:
+            overheads.key = overheads.submit
+        return overheads
+
+
+class Collision:
+    """A moment where commands are due while the keyboard is busy"""
+
+    __slots__ = ('time', 'count', 'delay')
+
+    def __init__(self, time, count, delay):
+        self.time = time    # Seconds from the start
+        self.count = count  # Number of commands due at that moment
+        self.delay = delay  # Worst wait of one of them, in seconds
+
+
+class CapacityPlan:
+    """Expected keyboard load of a command set"""
+
+    def __init__(self, horizon, misfire_grace):
+        self.horizon = horizon  # Seconds swept; shorter than asked when truncated
+        self.truncated = False
+        self.misfire_grace = misfire_grace
+        self.utilisation = 0.0
+        self.worst_delay = 0.0
+        self.worst_delay_at = 0.0
+        self.collision_count = 0
+        self.collisions = []  # The worst Collisions, worst first
+        self.fires = 0
+        self.longest = None  # (command, seconds) with the longest execution
+
+    @property
+    def feasible(self):
+        """False when commands cannot all run on time"""
+        return self.utilisation < 1.0 and self.worst_delay <= self.misfire_grace
+
+    def problems(self):
+        """Returns one message per reason the plan is infeasible or tight"""
+        messages = []
+        if self.utilisation >= 1.0:
+            messages.append(f"The commands need {self.utilisation * 100:.0f}% of the keyboard time: "
+                            f"the backlog grows without bound")
+        elif self.utilisation >= HIGH_UTILISATION:
+            messages.append(f"The commands need {self.utilisation * 100:.0f}% of the keyboard time")
+        if self.worst_delay > self.misfire_grace:
+            messages.append(f"Commands can wait up to {format_duration(self.worst_delay)} for the keyboard, "
+                            f"more than the {format_duration(self.misfire_grace)} misfire grace")
+        return messages
+
+    def summary(self):
+        """Returns a short multi-line report"""
+        lines = [f"Keyboard utilisation: {self.utilisation * 100:.1f}%",
+                 f"Worst-case queueing delay: {format_duration(self.worst_delay)} "
+                 f"(at {format_offset(self.worst_delay_at)})",
+                 f"Collision points in {format_duration(self.horizon)}: {self.collision_count} "
+                 f"of {self.fires} fire times" + (" (sweep cut short)" if self.truncated else "")]
+        if self.longest is not None:
+            command, seconds = self.longest
+            text = command.text if len(command.text) <= 40 else command.text[:37] + '...'
+            lines.append(f"Longest execution: '{text}' ({format_duration(seconds)})")
+        return "\n".join(lines)
+
+
+def format_duration(seconds):
+    """Formats seconds as e.g. '45.0 s', '12.5 min' or '3.2 h'"""
+    if seconds < 60:
+        return f"{seconds:.1f} s"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+def format_offset(seconds):
+    """Formats seconds from the start as 'day N HH:MM:SS'"""
+    seconds = int(seconds)
+    days, seconds = divmod(seconds, DAY)
+    return f"day {days + 1} {seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def execution_cost(command, typing_speed, open_delay, inter_message_gap, overheads,
+                   delivery_mode=DELIVERY_TYPE, paste_threshold=200):
+    """Seconds the keyboard is held by one execution of a command"""
+    chars = len(command.text)
+    mode = command.delivery or delivery_mode
+    if mode == DELIVERY_AUTO:
+        mode = DELIVERY_PASTE if chars >= paste_threshold else DELIVERY_TYPE
+    if mode == DELIVERY_PASTE:
+        typing = ClipboardPaster.RESTORE_DELAY + overheads.key
+    else:
+        typing = chars * max(typing_speed, overheads.key)
+    return (overheads.resolve + overheads.focus + overheads.key + open_delay + typing
+            + overheads.submit + inter_message_gap)
+
+
+def plan_capacity(commands, typing_speed, open_delay=0.5, inter_message_gap=0.5, overheads=None,
+                  delivery_mode=DELIVERY_TYPE, paste_threshold=200, misfire_grace=60.0, horizon=DAY):
+    """Plans the keyboard load of the enabled commands over ``horizon`` seconds
+
+    Assumes the worst case: every command fires at the start and keeps
+    its fixed-rate grid, so commands whose slots coincide always arrive
+    together. Commands are aggregated by interval first, so the sweep over
+    fire times costs one step per distinct interval and fire time, not per
+    command, and large command sets plan as fast as small ones with the
+    same intervals. Intervals are counted in whole milliseconds, at least
+    one, and the sweep stops after ``MAX_SWEEP_STEPS`` fire times.
+    """
+    if overheads is None:
+        overheads = Overheads()
+    plan = CapacityPlan(horizon, misfire_grace)
+
+    # Interval in ms -> [total cost, cheapest cost, commands]
+    classes = {}
+    for command in commands:
+        if not command.enabled:
+            continue
+        interval = interval_seconds(command)
+        cost = execution_cost(command, typing_speed, open_delay, inter_message_gap, overheads,
+                              delivery_mode, paste_threshold)
+        plan.utilisation += cost / interval
+        if plan.longest is None or cost > plan.longest[1]:
+            plan.longest = (command, cost)
+        interval_ms = max(1, round(interval * 1000))
+        entry = classes.get(interval_ms)
+        if entry is None:
+            classes[interval_ms] = [cost, cost, 1]
+        else:
+            entry[0] += cost
+            entry[1] = min(entry[1], cost)
+            entry[2] += 1
+    if not classes:
+        return plan
+
+    # Single-server sweep over fire times in integer ms, so coinciding
+    # slots of different intervals compare equal
+    horizon_ms = round(horizon * 1000)
+    pending = [(0, interval) for interval in classes]
+    heapq.heapify(pending)
+    free_at = 0.0
+    collisions = []
+    while pending and pending[0][0] < horizon_ms:
+        now_ms = pending[0][0]
+        if plan.fires == MAX_SWEEP_STEPS:
+            plan.horizon = now_ms / 1000
+            plan.truncated = True
+            break
+        batch_cost = 0.0
+        cheapest = None
+        count = 0
+        while pending and pending[0][0] == now_ms:
+            _, interval = heapq.heappop(pending)
+            total, minimum, members = classes[interval]
+            batch_cost += total
+            cheapest = minimum if cheapest is None else min(cheapest, minimum)
+            count += members
+            heapq.heappush(pending, (now_ms + interval, interval))
+
+        now = now_ms / 1000
+        queued = max(free_at - now, 0.0)
+        # The command typed last waits for the backlog and the rest of its batch
+        delay = queued + batch_cost - cheapest
+        free_at = max(free_at, now) + batch_cost
+        plan.fires += 1
+        if delay > 0:
+            plan.collision_count += 1
+            if delay > plan.worst_delay:
+                plan.worst_delay = delay
+                plan.worst_delay_at = now
+            if len(collisions) < MAX_COLLISIONS:
+                heapq.heappush(collisions, (delay, now, count))
+            elif delay > collisions[0][0]:
+                heapq.heapreplace(collisions, (delay, now, count))
+
+    plan.collisions = [Collision(now, count, delay) for delay, now, count in sorted(collisions, reverse=True)]
+    return plan
+
+
+def plan_from_config(commands, config, typing_speed, metrics=None, horizon=DAY):
+    """Plans with the timing settings of a Config and overheads measured so far"""
+    return plan_capacity(commands, typing_speed,
+                         open_delay=config.get_open_delay(),
+                         inter_message_gap=config.get_inter_message_gap(),
+                         overheads=Overheads.from_metrics(metrics) if metrics is not None else None,
+                         delivery_mode=config.get_delivery_mode(),
+                         paste_threshold=config.get_paste_threshold(),
+                         misfire_grace=config.get_misfire_grace(),
+                         horizon=horizon)
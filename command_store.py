@@ -0,0 +1,282 @@
+import json
+import sqlite3
+import threading
+
+# Command keys stored in their own columns; every other key goes to ``extra``
+COLUMNS = ('id', 'text', 'interval_minutes', 'enabled', 'window', 'tags', 'created_date')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commands (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    interval_minutes INTEGER NOT NULL,
+    enabled INTEGER NOT NULL DEFAULT 1,
+    window_spec TEXT,
+    window_title TEXT,
+    created_date TEXT,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS command_tags (
+    command_id TEXT NOT NULL REFERENCES commands(id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (command_id, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_commands_position ON commands(position);
+CREATE INDEX IF NOT EXISTS idx_commands_text ON commands(text);
+CREATE INDEX IF NOT EXISTS idx_commands_window ON commands(window_title);
+CREATE INDEX IF NOT EXISTS idx_commands_enabled ON commands(enabled, position);
+CREATE INDEX IF NOT EXISTS idx_command_tags_tag ON command_tags(tag);
+"""
+
+# External-content full-text index kept in sync by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS commands_fts USING fts5(text, content='commands', content_rowid='seq');
+CREATE TRIGGER IF NOT EXISTS commands_fts_insert AFTER INSERT ON commands BEGIN
+    INSERT INTO commands_fts(rowid, text) VALUES (new.seq, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS commands_fts_delete AFTER DELETE ON commands BEGIN
+    INSERT INTO commands_fts(commands_fts, rowid, text) VALUES ('delete', old.seq, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS commands_fts_update AFTER UPDATE OF text ON commands BEGIN
+    INSERT INTO commands_fts(commands_fts, rowid, text) VALUES ('delete', old.seq, old.text);
+    INSERT INTO commands_fts(rowid, text) VALUES (new.seq, new.text);
+END;
+"""
+
+
+def window_title_of(spec):
+    """Returns the title part of a command's ``window`` spec, or None"""
+    if not spec:
+        return None
+    if isinstance(spec, str):
+        return spec
+    return spec.get('title')
+
+
+class CommandStore:
+    """SQLite library of text commands
+
+    Commands go in and come out as the same dicts the JSON settings use,
+    ordered by their position in the list. Text, tags, target window and
+    enabled state are indexed; ``search`` uses an FTS5 index when SQLite
+    provides one and falls back to LIKE otherwise. ``update`` and
+    ``replace_all`` only write the rows and columns that changed.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA foreign_keys = ON")
+            self._conn.executescript(SCHEMA)
+        try:
+            with self._conn:
+                self._conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+
+    def close(self):
+        """Closes the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def _row_values(self, command, position):
+        """Maps a command dict to the column values of its row"""
+        extra = {key: value for key, value in command.items()
+                 if key not in COLUMNS and key != 'position'}
+        spec = command.get('window')
+        return {
+            'id': command['id'],
+            'position': position,
+            'text': command['text'],
+            'interval_minutes': command['interval_minutes'],
+            'enabled': 1 if command.get('enabled', True) else 0,
+            'window_spec': json.dumps(spec, ensure_ascii=False) if spec else None,
+            'window_title': window_title_of(spec),
+            'created_date': command.get('created_date'),
+            'extra': json.dumps(extra, ensure_ascii=False, sort_keys=True)
+        }
+
+    def _to_command(self, row, tags):
+        """Builds a command dict from a row and its tags"""
+        command = {
+            'id': row['id'],
+            'text': row['text'],
+            'interval_minutes': row['interval_minutes'],
+            'enabled': bool(row['enabled'])
+        }
+        if row['window_spec']:
+            command['window'] = json.loads(row['window_spec'])
+        if tags:
+            command['tags'] = tags
+        if row['created_date']:
+            command['created_date'] = row['created_date']
+        command.update(json.loads(row['extra']))
+        return command
+
+    def _select(self, where='', params=()):
+        """Runs a SELECT over commands and returns command dicts in list order"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM commands {where} ORDER BY position", params).fetchall()
+            tags = {}
+            for command_id, tag in self._conn.execute(
+                    f"SELECT command_id, tag FROM command_tags "
+                    f"WHERE command_id IN (SELECT id FROM commands {where}) ORDER BY tag", params):
+                tags.setdefault(command_id, []).append(tag)
+        return [self._to_command(row, tags.get(row['id'])) for row in rows]
+
+    def _write_tags(self, command_id, tags):
+        self._conn.execute("DELETE FROM command_tags WHERE command_id = ?", (command_id,))
+        self._conn.executemany("INSERT OR IGNORE INTO command_tags (command_id, tag) VALUES (?, ?)",
+                               [(command_id, tag) for tag in tags or ()])
+
+    def _insert(self, command, position):
+        values = self._row_values(command, position)
+        columns = ', '.join(values)
+        placeholders = ', '.join(f":{column}" for column in values)
+        self._conn.execute(f"INSERT INTO commands ({columns}) VALUES ({placeholders})", values)
+        self._write_tags(command['id'], command.get('tags'))
+
+    def count(self):
+        """Number of stored commands"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM commands").fetchone()[0]
+
+    def all(self):
+        """Every command, in list order"""
+        return self._select()
+
+    def enabled(self):
+        """Only the enabled commands, in list order"""
+        return self._select("WHERE enabled = 1")
+
+    def get(self, command_id):
+        """The command with an id, or None"""
+        found = self._select("WHERE id = ?", (command_id,))
+        return found[0] if found else None
+
+    def by_window(self, title):
+        """Commands whose window spec targets a title"""
+        return self._select("WHERE window_title = ?", (title,))
+
+    def by_tag(self, tag):
+        """Commands carrying a tag"""
+        return self._select("WHERE id IN (SELECT command_id FROM command_tags WHERE tag = ?)", (tag,))
+
+    def search(self, query, limit=100):
+        """Commands whose text matches a full-text query, best match first"""
+        with self._lock:
+            if self.has_fts:
+                try:
+                    ids = [row[0] for row in self._conn.execute(
+                        "SELECT c.id FROM commands_fts f JOIN commands c ON c.seq = f.rowid "
+                        "WHERE commands_fts MATCH ? ORDER BY rank LIMIT ?", (query, limit))]
+                except sqlite3.OperationalError:
+                    # Not valid FTS syntax; search for the words as typed
+                    quoted = ' '.join('"' + word.replace('"', '""') + '"' for word in query.split())
+                    ids = [row[0] for row in self._conn.execute(
+                        "SELECT c.id FROM commands_fts f JOIN commands c ON c.seq = f.rowid "
+                        "WHERE commands_fts MATCH ? ORDER BY rank LIMIT ?", (quoted, limit))]
+            else:
+                ids = [row[0] for row in self._conn.execute(
+                    "SELECT id FROM commands WHERE text LIKE ? ORDER BY position LIMIT ?",
+                    (f"%{query}%", limit))]
+        found = {command['id']: command for command in self._select(
+            f"WHERE id IN ({', '.join('?' * len(ids))})", ids)} if ids else {}
+        return [found[command_id] for command_id in ids if command_id in found]
+
+    def add(self, command):
+        """Appends a command (which must have an id) to the end of the list"""
+        with self._lock, self._conn:
+            position = self._conn.execute(
+                "SELECT COALESCE(MAX(position) + 1, 0) FROM commands").fetchone()[0]
+            self._insert(command, position)
+
+    def update(self, command_id, **fields):
+        """Changes only the given fields of one command; returns False if it does not exist"""
+        with self._lock:
+            current = self.get(command_id)
+            if current is None:
+                return False
+            current.update(fields)
+            position = self._conn.execute(
+                "SELECT position FROM commands WHERE id = ?", (command_id,)).fetchone()[0]
+            values = self._row_values(current, position)
+            changed = {column for column in ('text', 'interval_minutes', 'enabled', 'created_date')
+                       if column in fields}
+            if 'window' in fields:
+                changed.update(('window_spec', 'window_title'))
+            if any(key not in COLUMNS for key in fields):
+                changed.add('extra')
+            with self._conn:
+                if changed:
+                    assignments = ', '.join(f"{column} = :{column}" for column in sorted(changed))
+                    self._conn.execute(f"UPDATE commands SET {assignments} WHERE id = :id", values)
+                if 'tags' in fields:
+                    self._write_tags(command_id, fields['tags'])
+            return True
+
+    def delete(self, command_id):
+        """Removes one command"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM commands WHERE id = ?", (command_id,))
+
+    def replace_all(self, commands):
+        """Makes the store hold exactly ``commands``, in order
+
+        Rows that did not change are not written; new rows are inserted,
+        changed ones updated and missing ones deleted, in one transaction.
+        Returns the number of rows written.
+        """
+        with self._lock:
+            existing = {}
+            for row in self._conn.execute("SELECT * FROM commands"):
+                existing[row['id']] = dict(row)
+            existing_tags = {}
+            for command_id, tag in self._conn.execute("SELECT command_id, tag FROM command_tags"):
+                existing_tags.setdefault(command_id, set()).add(tag)
+
+            written = 0
+            with self._conn:
+                keep = set()
+                for position, command in enumerate(commands):
+                    keep.add(command['id'])
+                    values = self._row_values(command, position)
+                    old = existing.get(command['id'])
+                    if old is None:
+                        self._insert(command, position)
+                        written += 1
+                        continue
+                    changed = [column for column, value in values.items() if old[column] != value]
+                    if changed:
+                        assignments = ', '.join(f"{column} = :{column}" for column in changed)
+                        self._conn.execute(f"UPDATE commands SET {assignments} WHERE id = :id", values)
+                        written += 1
+                    if set(command.get('tags') or ()) != existing_tags.get(command['id'], set()):
+                        self._write_tags(command['id'], command.get('tags'))
+                removed = [(command_id,) for command_id in existing if command_id not in keep]
+                self._conn.executemany("DELETE FROM commands WHERE id = ?", removed)
+                written += len(removed)
+            return written
+
+    def import_commands(self, commands):
+        """Appends commands from a ``text_commands`` array, skipping known ids"""
+        with self._lock, self._conn:
+            known = {row[0] for row in self._conn.execute("SELECT id FROM commands")}
+            position = self._conn.execute(
+                "SELECT COALESCE(MAX(position) + 1, 0) FROM commands").fetchone()[0]
+            imported = 0
+            for command in commands:
+                if command['id'] in known:
+                    continue
+                self._insert(command, position)
+                known.add(command['id'])
+                position += 1
+                imported += 1
+            return imported
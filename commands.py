@@ -0,0 +1,195 @@
+from datetime import datetime
+
+from config import new_command_id
+from scheduler import SCHEDULE_MODES, MISSED_FIRE_POLICIES
+from typing_engine import DELIVERY_MODES
+from window_resolver import MATCH_MODES, MATCH_SUBSTRING
+
+# Shortest interval accepted: one second
+MIN_INTERVAL_MINUTES = 1 / 60
+
+
+class Command:
+    """One scheduled text command
+
+    Commands are validated once, when they are loaded, and treated as
+    immutable afterwards: edits build a new Command with ``replace`` so a
+    thread holding the old one never sees it change. Optional settings left
+    as None fall back to the application defaults.
+    """
+
+    __slots__ = ('id', 'text', 'interval_minutes', 'enabled', 'window', 'schedule_mode',
+                 'missed_fire_policy', 'delivery', 'tags', 'created_date', 'extra')
+
+    # Keys of the settings.json representation, in the order they are written
+    KEYS = ('id', 'text', 'interval_minutes', 'enabled', 'window', 'schedule_mode',
+            'missed_fire_policy', 'delivery', 'tags', 'created_date')
+
+    def __init__(self, text, interval_minutes, enabled=True, window=None, schedule_mode=None,
+                 missed_fire_policy=None, delivery=None, tags=(), created_date=None, id=None,
+                 extra=None):
+        self.id = id or new_command_id()
+        self.text = text
+        self.interval_minutes = interval_minutes
+        self.enabled = enabled
+        self.window = window
+        self.schedule_mode = schedule_mode
+        self.missed_fire_policy = missed_fire_policy
+        self.delivery = delivery
+        self.tags = tuple(tags)
+        self.created_date = created_date or datetime.now().isoformat()
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data):
+        """Validates a settings.json command entry and builds a Command
+
+        Raises ValueError describing the first invalid field.
+        """
+        if not isinstance(data, dict):
+            raise ValueError("Command must be an object")
+
+        text = data.get('text')
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("'text' must be a non-empty string")
+
+        interval = data.get('interval_minutes')
+        if isinstance(interval, bool) or not isinstance(interval, (int, float)) or interval <= 0:
+            raise ValueError(f"'interval_minutes' must be a positive number, got {interval!r}")
+        if interval < MIN_INTERVAL_MINUTES:
+            raise ValueError(f"'interval_minutes' must be at least one second ({MIN_INTERVAL_MINUTES:.4f}), "
+                             f"got {interval!r}")
+
+        enabled = data.get('enabled', True)
+        if not isinstance(enabled, (bool, int)):
+            raise ValueError(f"'enabled' must be true or false, got {enabled!r}")
+
+        for key, allowed in (('schedule_mode', SCHEDULE_MODES),
+                             ('missed_fire_policy', MISSED_FIRE_POLICIES),
+                             ('delivery', DELIVERY_MODES)):
+            value = data.get(key)
+            if value is not None and value not in allowed:
+                raise ValueError(f"'{key}' must be one of {', '.join(allowed)}, got {value!r}")
+
+        window = data.get('window') or None
+        if window is not None:
+            if isinstance(window, dict):
+                if window.get('match', MATCH_SUBSTRING) not in MATCH_MODES:
+                    raise ValueError(f"'window.match' must be one of {', '.join(MATCH_MODES)}")
+            elif not isinstance(window, str):
+                raise ValueError("'window' must be a title or an object")
+
+        tags = data.get('tags') or ()
+        if not isinstance(tags, (list, tuple)) or not all(isinstance(tag, str) for tag in tags):
+            raise ValueError("'tags' must be a list of strings")
+
+        extra = {key: value for key, value in data.items() if key not in cls.KEYS}
+        return cls(text, interval, bool(enabled), window, data.get('schedule_mode'),
+                   data.get('missed_fire_policy'), data.get('delivery'), tags,
+                   data.get('created_date'), data.get('id'), extra or None)
+
+    def to_dict(self):
+        """Returns the settings.json representation, omitting unset options"""
+        data = {}
+        for key in self.KEYS:
+            value = getattr(self, key)
+            if value is None or (key == 'tags' and not value):
+                continue
+            data[key] = list(value) if key == 'tags' else value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def replace(self, **changes):
+        """Returns a copy with some fields changed, keeping id and creation date"""
+        values = {key: getattr(self, key) for key in self.__slots__}
+        values.update(changes)
+        return Command(**values)
+
+    def __repr__(self):
+        return f"Command({self.text!r}, {self.interval_minutes!r}, id={self.id!r})"
+
+
+def load_commands(entries, cache=None, enabled_only=False, changes=None):
+    """Validates settings.json command entries once
+
+    Returns ``(commands, errors)``: the valid entries as Commands, in order,
+    and one message per skipped entry. Duplicate ids are replaced by new
+    ones. ``cache`` is a dict kept between calls: entries equal to last
+    time return the same Command object without being validated again.
+    Entries are kept in the cache as they are, so they must not be mutated
+    afterwards. With ``enabled_only`` the entries are just the enabled
+    commands, and cached disabled commands are kept for the full list.
+
+    With a cache, ``changes`` is an empty CommandDiff that receives what
+    changed since the cached list, found in the same pass; only the entries
+    that changed are validated, so comparing again is not needed.
+    """
+    commands = []
+    errors = []
+    seen = set()
+    for index, entry in enumerate(entries):
+        cached = cache.get(entry.get('id')) if cache and isinstance(entry, dict) else None
+        if cached is not None and cached[0] == entry and cached[1].id not in seen:
+            command = cached[1]
+        else:
+            try:
+                command = Command.from_dict(entry)
+            except ValueError as e:
+                errors.append(f"Command {index + 1}: {e}")
+                continue
+            if command.id in seen:
+                command.id = new_command_id()
+            if changes is not None:
+                if cached is not None and cached[1].id == command.id:
+                    changes.changed.append((cached[1], command))
+                else:
+                    changes.added.append(command)
+            if cache is not None:
+                cache[command.id] = (entry, command)
+        seen.add(command.id)
+        commands.append(command)
+    # Every command seen is cached, so a cache of the same size has no stale entries
+    if cache and len(cache) > len(seen):
+        for stale in cache.keys() - seen:
+            if not enabled_only or cache[stale][1].enabled:
+                if changes is not None:
+                    changes.removed.append(cache[stale][1])
+                del cache[stale]
+    return commands, errors
+
+
+class CommandDiff:
+    """Commands added, removed and changed between two command lists"""
+
+    __slots__ = ('added', 'removed', 'changed')
+
+    def __init__(self, added, removed, changed):
+        self.added = added
+        self.removed = removed
+        self.changed = changed  # (old, new) pairs sharing an id
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self):
+        return (f"CommandDiff({len(self.added)} added, {len(self.removed)} removed, "
+                f"{len(self.changed)} changed)")
+
+
+def diff_commands(previous, current):
+    """Compares two command lists by id
+
+    Commands are immutable, so a command is unchanged when both lists hold
+    the very same object for its id.
+    """
+    remaining = {command.id: command for command in previous}
+    added = []
+    changed = []
+    for command in current:
+        old = remaining.pop(command.id, None)
+        if old is None:
+            added.append(command)
+        elif old is not command:
+            changed.append((old, command))
+    return CommandDiff(added, list(remaining.values()), changed)
@@ -0,0 +1,28 @@
+def sync_rows(tree, previous, rows):
+    """Brings a Treeview in line with ``rows`` by touching only what changed
+
+    ``previous`` and ``rows`` map a row id to its values tuple, in display
+    order; ``previous`` must describe what the tree currently shows. Rows
+    that disappeared are deleted in one call, new rows are inserted at their
+    position and changed rows are updated in place. Rows are only moved when
+    the relative order of surviving rows changed. Returns ``rows``, the new
+    state to pass as ``previous`` next time.
+    """
+    removed = [row_id for row_id in previous if row_id not in rows]
+    if removed:
+        tree.delete(*removed)
+
+    survivors_before = [row_id for row_id in previous if row_id in rows]
+    survivors_after = [row_id for row_id in rows if row_id in previous]
+    reordered = survivors_before != survivors_after
+
+    for index, (row_id, values) in enumerate(rows.items()):
+        old_values = previous.get(row_id)
+        if old_values is None:
+            tree.insert('', index, iid=row_id, values=values)
+            continue
+        if old_values != values:
+            tree.item(row_id, values=values)
+        if reordered:
+            tree.move(row_id, '', index)
+    return rows
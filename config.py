@@ -1,32 +1,90 @@
 import json
 import os
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
 
 class Config:
-    """Enhanced configuration manager for complete application persistence"""
+    """Enhanced configuration manager for complete application persistence
     
-    def __init__(self):
+    Auto-saves are write-behind: changes arriving within ``save_delay``
+    seconds of each other are coalesced into one write, made from a
+    background thread. Pending changes are flushed on exit. A
+    ``save_delay`` of 0 writes synchronously on every auto-save.
+    
+    Edits made to settings.json outside the application are picked up by
+    ``reload_if_changed``, or by ``watch`` on a background thread.
+    """
+    
+    # Seconds of quiet after the last change before an auto-save is written
+    SAVE_DELAY = 0.5
+    
+    # Seconds between checks of settings.json for outside edits
+    RELOAD_INTERVAL = 1.0
+    
+    def __init__(self, config_dir=None, save_delay=SAVE_DELAY, config_file=None):
+        # An explicit settings file keeps its state files next to it
+        if config_file is not None:
+            config_file = Path(config_file)
+            config_dir = config_file.parent
         # Use AppData for better Windows integration
-        appdata = Path(os.environ.get('APPDATA', Path.home()))
-        self.config_dir = appdata / 'WindowsAutoTextWriter'
-        self.config_file = self.config_dir / 'settings.json'
+        if config_dir is None:
+            appdata = Path(os.environ.get('APPDATA', Path.home()))
+            config_dir = appdata / 'WindowsAutoTextWriter'
+        self.config_dir = Path(config_dir)
+        self.config_file = config_file or self.config_dir / 'settings.json'
+        # Append-only log of when each command last fired
+        self.schedule_state_file = self.config_dir / 'schedule_state.log'
         
         # Ensure directory exists
         self.config_dir.mkdir(parents=True, exist_ok=True)
         
+        # ((mtime_ns, size), content hash) of settings.json as last read or written
+        self._file_state = None
+        # List position -> id given to an id-less command on the last read
+        self._generated_ids = {}
         self.config_data = self.load_config()
         self._has_changes = False
+        
+        # Write-behind state; the lock also guards config_data while it is
+        # serialised on the background thread
+        self.save_delay = save_delay
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._save_wakeup = threading.Condition(self._lock)
+        self._save_due = None
+        self._save_thread = None
+        self.saves_requested = 0
+        self.writes = 0
+        
+        # SQLite command library, opened on first use when enabled
+        self._command_store = None
+        self._unsaved_commands = None
+        
+        # Validated commands by id, reused while their entry is unchanged
+        self._command_cache = {}
+        # (text_commands list, Commands built from it) of the JSON storage
+        self._commands = None
+        # What the last reload changed, until taken; None once unknown
+        self._reload_diff = None
+        self._reload_pending = False
+        
+        # Outside-edit watcher
+        self._watch_thread = None
+        self._watch_stop = threading.Event()
+        self.reloads = 0
     
     def load_config(self):
         """Load configuration from file or create default"""
         try:
             if self.config_file.exists():
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Migrate old config format if needed
-                    return self._migrate_config(data)
-        except (json.JSONDecodeError, FileNotFoundError) as e:
+                key, raw = self._read_settings()
+                self._file_state = (key, self._digest(raw))
+                data = json.loads(raw)
+                # Migrate old config format if needed
+                return self._assign_command_ids(self._migrate_config(data))
+        except (ValueError, FileNotFoundError) as e:
             print(f"Error loading config: {e}")
         
         # Return default configuration with full structure
@@ -45,11 +103,54 @@ class Config:
                 'window_title': '',  # Empty means use default
                 'typing_speed': 0.2,
                 'last_window_title': '',
-                'last_typing_speed': 0.2
+                'last_typing_speed': 0.2,
+                'schedule_mode': 'fixed_rate',
+                'missed_fire_policy': 'coalesce',
+                'misfire_grace_seconds': 60,
+                'input_backend': 'pyautogui',
+                'delivery_mode': 'type',
+                'paste_threshold': 200,
+                'focus_timeout': 1.0,
+                'open_delay': 0.5,
+                'inter_message_gap': 0.5,
+                'input_queue_size': 64,
+                'log_capacity': 100,
+                'command_storage': 'json',
+                'resume_schedule': True,
+                'metrics_textfile': '',
+                'metrics_port': 0
             },
             'text_commands': []  # Empty list for user commands
         }
     
+    def _read_settings(self):
+        """Returns ((mtime_ns, size), raw bytes) of the settings file"""
+        # Stat before reading, so an edit racing with the read shows up as
+        # a changed stat on the next check
+        stat = os.stat(self.config_file)
+        return (stat.st_mtime_ns, stat.st_size), self.config_file.read_bytes()
+    
+    @staticmethod
+    def _digest(raw):
+        import hashlib
+        return hashlib.blake2b(raw, digest_size=16).digest()
+    
+    def _assign_command_ids(self, data):
+        """Gives the id-less commands of freshly read settings an id
+        
+        A command at a position that held an id-less command on the last
+        read keeps that command's id, so editing the text of a hand-written
+        command does not turn it into a new one.
+        """
+        commands = data.get('text_commands') or []
+        if _has_own_ids(commands):
+            self._generated_ids = {}
+            return data
+        missing = [index for index, cmd in enumerate(commands) if isinstance(cmd, dict) and not cmd.get('id')]
+        ensure_command_ids(commands, self._generated_ids)
+        self._generated_ids = {index: commands[index]['id'] for index in missing}
+        return data
+    
     def _migrate_config(self, data):
         """Migrate old config format to new structure"""
         if 'app_version' in data:
@@ -71,7 +172,22 @@ class Config:
                 'window_title': '',
                 'typing_speed': data.get('typing_speed', 0.2),
                 'last_window_title': '',
-                'last_typing_speed': 0.2
+                'last_typing_speed': 0.2,
+                'schedule_mode': 'fixed_rate',
+                'missed_fire_policy': 'coalesce',
+                'misfire_grace_seconds': 60,
+                'input_backend': 'pyautogui',
+                'delivery_mode': 'type',
+                'paste_threshold': 200,
+                'focus_timeout': 1.0,
+                'open_delay': 0.5,
+                'inter_message_gap': 0.5,
+                'input_queue_size': 64,
+                'log_capacity': 100,
+                'command_storage': 'json',
+                'resume_schedule': True,
+                'metrics_textfile': '',
+                'metrics_port': 0
             },
             'text_commands': []
         }
@@ -80,23 +196,194 @@ class Config:
         return migrated
     
     def save_config(self, force=False):
-        """Save configuration to file"""
+        """Save configuration to file now, superseding any pending auto-save"""
         try:
+            with self._lock:
+                self._save_due = None
+            if self._unsaved_commands is not None:
+                self.command_store.replace_all(self._unsaved_commands)
+                self._unsaved_commands = None
+            self._write()
+            self._has_changes = False
+            return True
+        except Exception as e:
+            print(f"Error saving config: {e}")
+            return False
+    
+    def _write(self):
+        """Serialise the configuration and atomically replace the settings file"""
+        with self._lock:
             # Update timestamp
             self.config_data['last_saved'] = datetime.now().isoformat()
-            
+            raw = json.dumps(self.config_data, indent=2, ensure_ascii=False).encode('utf-8')
+        
+        with self._write_lock:
             # Create directory if it doesn't exist
             self.config_file.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config_data, f, indent=2, ensure_ascii=False)
+            # Write a sibling temp file and rename it over the settings, so
+            # a crash mid-write never leaves a truncated settings.json
+            temp_file = self.config_file.with_name(self.config_file.name + '.tmp')
+            with open(temp_file, 'wb') as f:
+                f.write(raw)
+            os.replace(temp_file, self.config_file)
+            self.writes += 1
             
-            self._has_changes = False
+            # Remember what was written so it is not mistaken for an outside edit
+            stat = os.stat(self.config_file)
+            with self._lock:
+                self._file_state = ((stat.st_mtime_ns, stat.st_size), self._digest(raw))
+    
+    def schedule_save(self):
+        """Request an auto-save, written once changes stop for save_delay seconds"""
+        self.saves_requested += 1
+        if self.save_delay <= 0:
+            self.save_config()
+            return
+        
+        with self._lock:
+            self._save_due = time.monotonic() + self.save_delay
+            if self._save_thread is None:
+                self._save_thread = threading.Thread(target=self._save_loop, name='config-writer', daemon=True)
+                self._save_thread.start()
+                import atexit
+                atexit.register(self.flush)
+            self._save_wakeup.notify()
+    
+    def _save_loop(self):
+        """Background thread that writes pending auto-saves once they settle"""
+        while True:
+            with self._lock:
+                while self._save_due is None:
+                    self._save_wakeup.wait()
+                remaining = self._save_due - time.monotonic()
+                if remaining > 0:
+                    self._save_wakeup.wait(remaining)
+                    continue
+                self._save_due = None
+            try:
+                self._write()
+            except Exception as e:
+                print(f"Error saving config: {e}")
+    
+    def has_pending_save(self):
+        """Check if an auto-save is waiting to be written"""
+        return self._save_due is not None
+    
+    def flush(self):
+        """Write any pending auto-save immediately"""
+        with self._lock:
+            pending = self._save_due is not None
+            self._save_due = None
+        if not pending:
+            # Let a write already in progress on the background thread finish
+            with self._write_lock:
+                return True
+        try:
+            self._write()
             return True
         except Exception as e:
             print(f"Error saving config: {e}")
             return False
     
+    def reload_if_changed(self):
+        """Re-read settings.json if it was edited outside the application
+        
+        Usually costs one stat(): the file is only read when its modification
+        time or size moved, and only parsed when its content hash differs
+        from what was last read or written. Outside edits are ignored while
+        this process has changes of its own waiting to be saved, which will
+        overwrite them. Returns True when new settings were loaded.
+        """
+        try:
+            stat = os.stat(self.config_file)
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            if self._file_state is not None and self._file_state[0] == (stat.st_mtime_ns, stat.st_size):
+                return False
+        
+        try:
+            key, raw = self._read_settings()
+        except OSError as e:
+            print(f"Error reloading config: {e}")
+            return False
+        digest = self._digest(raw)
+        
+        with self._lock:
+            unchanged = self._file_state is not None and self._file_state[1] == digest
+            # Recorded even when the file cannot be used, so a broken edit is
+            # reported once rather than on every check
+            self._file_state = (key, digest)
+            if unchanged:
+                return False
+            if self._has_changes or self._save_due is not None or self._unsaved_commands is not None:
+                print("settings.json changed on disk; keeping unsaved changes")
+                return False
+            try:
+                data = json.loads(raw)
+            except ValueError as e:
+                print(f"Error reloading config: {e}")
+                return False
+            self.config_data = self._assign_command_ids(self._migrate_config(data))
+            self.reloads += 1
+            if self.get_command_storage() != 'sqlite':
+                # Only entries that differ from the cached ones are validated,
+                # and the delta falls out of the same pass
+                from commands import CommandDiff
+                changes = CommandDiff([], [], [])
+                self._build_commands(changes)
+                # Two reloads without a take in between have no single base list
+                self._reload_diff = None if self._reload_pending else changes
+                self._reload_pending = True
+        return True
+    
+    def _build_commands(self, changes=None):
+        """Validates the JSON text_commands into Commands, reusing cached ones"""
+        from commands import load_commands
+        entries = self.config_data.get('text_commands', [])
+        commands, errors = load_commands(entries, self._command_cache, changes=changes)
+        for error in errors:
+            print(f"Skipping invalid command: {error}")
+        self._commands = (entries, commands)
+        return commands
+    
+    def take_reload_diff(self):
+        """The ``CommandDiff`` of the last reload, relative to the commands
+        returned before it; None when it is not known, such as after two
+        reloads in a row. The caller then compares the lists itself.
+        """
+        with self._lock:
+            diff, self._reload_diff, self._reload_pending = self._reload_diff, None, False
+        return diff
+    
+    def watch(self, on_reload, interval=RELOAD_INTERVAL):
+        """Check settings.json for outside edits every ``interval`` seconds
+        
+        Runs on a background thread, which calls ``on_reload()`` after new
+        settings were loaded.
+        """
+        if self._watch_thread is not None:
+            return
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(target=self._watch_loop, args=(on_reload, interval),
+                                              name='config-watcher', daemon=True)
+        self._watch_thread.start()
+    
+    def _watch_loop(self, on_reload, interval):
+        """Background thread that polls settings.json"""
+        while not self._watch_stop.wait(interval):
+            try:
+                if self.reload_if_changed():
+                    on_reload()
+            except Exception as e:
+                print(f"Error reloading config: {e}")
+    
+    def stop_watching(self):
+        """Stop checking settings.json for outside edits"""
+        self._watch_stop.set()
+        self._watch_thread = None
+    
     def mark_changed(self):
         """Mark configuration as changed"""
         self._has_changes = True
@@ -111,13 +398,14 @@ class Config:
     
     def set(self, section, key, value, auto_save=False):
         """Set configuration value in section"""
-        if section not in self.config_data:
-            self.config_data[section] = {}
-        
-        self.config_data[section][key] = value
+        with self._lock:
+            if section not in self.config_data:
+                self.config_data[section] = {}
+            
+            self.config_data[section][key] = value
         
         if auto_save:
-            self.save_config()
+            self.schedule_save()
         else:
             self.mark_changed()
     
@@ -153,24 +441,200 @@ class Config:
         """Set typing speed"""
         self.set('application_config', 'typing_speed', speed, auto_save)
     
+    def get_schedule_mode(self):
+        """Get default schedule mode ('fixed_rate' or 'fixed_delay')"""
+        return self.get('application_config', 'schedule_mode', 'fixed_rate')
+    
+    def set_schedule_mode(self, mode, auto_save=False):
+        """Set default schedule mode"""
+        self.set('application_config', 'schedule_mode', mode, auto_save)
+    
+    def get_missed_fire_policy(self):
+        """Get default missed-fire policy ('catch_up', 'coalesce' or 'skip')"""
+        return self.get('application_config', 'missed_fire_policy', 'coalesce')
+    
+    def set_missed_fire_policy(self, policy, auto_save=False):
+        """Set default missed-fire policy"""
+        self.set('application_config', 'missed_fire_policy', policy, auto_save)
+    
+    def get_misfire_grace(self):
+        """Get seconds a fire may be late before it counts as missed"""
+        return self.get('application_config', 'misfire_grace_seconds', 60)
+    
+    def get_input_backend(self):
+        """Get input backend name ('pyautogui', 'pynput' or 'recording')"""
+        return self.get('application_config', 'input_backend', 'pyautogui')
+    
+    def set_input_backend(self, name, auto_save=False):
+        """Set input backend name"""
+        self.set('application_config', 'input_backend', name, auto_save)
+    
+    def get_delivery_mode(self):
+        """Get default delivery mode ('type', 'paste' or 'auto')"""
+        return self.get('application_config', 'delivery_mode', 'type')
+    
+    def set_delivery_mode(self, mode, auto_save=False):
+        """Set default delivery mode"""
+        self.set('application_config', 'delivery_mode', mode, auto_save)
+    
+    def get_paste_threshold(self):
+        """Get minimum text length pasted in 'auto' delivery mode"""
+        return self.get('application_config', 'paste_threshold', 200)
+    
+    def get_focus_timeout(self):
+        """Get max seconds to wait for the target window to reach the front"""
+        return self.get('application_config', 'focus_timeout', 1.0)
+    
+    def get_open_delay(self):
+        """Get pause after the opening Enter, in seconds"""
+        return self.get('application_config', 'open_delay', 0.5)
+    
+    def get_inter_message_gap(self):
+        """Get pause between commands typed into the same window, in seconds"""
+        return self.get('application_config', 'inter_message_gap', 0.5)
+    
+    def get_input_queue_size(self):
+        """Get max number of jobs waiting for the input arbiter"""
+        return self.get('application_config', 'input_queue_size', 64)
+    
+    def get_log_capacity(self):
+        """Get max number of lines kept in the activity log"""
+        return self.get('application_config', 'log_capacity', 100)
+    
+    def get_resume_schedule(self):
+        """Get whether a new run resumes the previous run's schedule"""
+        return self.get('application_config', 'resume_schedule', True)
+    
+    def get_metrics_textfile(self):
+        """Get the file execution metrics are exported to, empty for none"""
+        return self.get('application_config', 'metrics_textfile', '')
+    
+    def get_metrics_port(self):
+        """Get the local port serving execution metrics over HTTP, 0 for none"""
+        return self.get('application_config', 'metrics_port', 0)
+    
+    def get_command_storage(self):
+        """Get where commands are stored ('json' or 'sqlite')"""
+        return self.get('application_config', 'command_storage', 'json')
+    
+    def set_command_storage(self, storage, auto_save=False):
+        """Set where commands are stored"""
+        self.set('application_config', 'command_storage', storage, auto_save)
+    
+    @property
+    def command_store(self):
+        """SQLite command library, created and migrated on first use"""
+        with self._lock:
+            if self._command_store is None:
+                # Imported here so sqlite3 stays off the startup path
+                from command_store import CommandStore
+                self._command_store = CommandStore(self.config_dir / 'commands.db')
+                self._migrate_commands_to_store()
+            return self._command_store
+    
+    def _migrate_commands_to_store(self):
+        """Move commands from the settings.json array into the SQLite store
+        
+        Entries that fail validation are reported and stay in the array, so
+        they can be fixed and are moved on a later start.
+        """
+        legacy = self.config_data.get('text_commands')
+        if not legacy:
+            return
+        from commands import Command
+        valid = []
+        invalid = []
+        for index, entry in enumerate(legacy):
+            try:
+                Command.from_dict(entry)
+            except ValueError as e:
+                print(f"Skipping invalid command: Command {index + 1}: {e}")
+                invalid.append(entry)
+                continue
+            valid.append(entry)
+        imported = self._command_store.import_commands(ensure_command_ids(valid))
+        self.config_data['text_commands'] = invalid
+        self.save_config()
+        print(f"Migrated {imported} commands to {self._command_store.path}")
+    
     def get_text_commands(self):
-        """Get saved text commands"""
+        """Get saved text commands, each with a stable id"""
+        if self.get_command_storage() == 'sqlite':
+            if self._unsaved_commands is not None:
+                return self._unsaved_commands
+            return self.command_store.all()
+        # Ids are given when the settings are read and when commands are set
         return self.config_data.get('text_commands', [])
     
+    def get_enabled_commands(self):
+        """Get only the enabled text commands"""
+        if self.get_command_storage() == 'sqlite' and self._unsaved_commands is None:
+            return self.command_store.enabled()
+        return [cmd for cmd in self.get_text_commands() if cmd.get('enabled', True)]
+    
     def set_text_commands(self, commands, auto_save=False):
         """Set text commands"""
-        # Add timestamps to new commands
+        # Add ids and timestamps to new commands
+        ensure_command_ids(commands)
         for cmd in commands:
             if 'created_date' not in cmd:
                 cmd['created_date'] = datetime.now().isoformat()
         
-        self.config_data['text_commands'] = commands
+        if self.get_command_storage() == 'sqlite':
+            # Only changed rows are written, so there is nothing to debounce
+            if auto_save:
+                self.command_store.replace_all(commands)
+                self._unsaved_commands = None
+            else:
+                self._unsaved_commands = commands
+                self.mark_changed()
+            return
+        
+        with self._lock:
+            self.config_data['text_commands'] = commands
+            self._commands = None
         
         if auto_save:
-            self.save_config()
+            self.schedule_save()
         else:
             self.mark_changed()
     
+    def get_commands(self, enabled_only=False):
+        """Get saved text commands as validated Command records
+        
+        Entries that fail validation are reported and left out. Commands
+        whose entry did not change since the last call are the same objects
+        as before. With ``enabled_only``, disabled commands are left out
+        (the SQLite store does not even read them). With the JSON storage the
+        list is built once per change of the settings and then reused.
+        """
+        from commands import load_commands
+        if self.get_command_storage() != 'sqlite':
+            with self._lock:
+                if self._commands is None or self._commands[0] is not self.config_data.get('text_commands', []):
+                    self._build_commands()
+                commands = self._commands[1]
+            if enabled_only:
+                return [command for command in commands if command.enabled]
+            return list(commands)
+        if enabled_only:
+            commands, errors = load_commands(self.get_enabled_commands(), self._command_cache, enabled_only=True)
+        else:
+            commands, errors = load_commands(self.get_text_commands(), self._command_cache)
+        for error in errors:
+            print(f"Skipping invalid command: {error}")
+        return commands
+    
+    def set_commands(self, commands, auto_save=False):
+        """Set text commands from Command records"""
+        entries = [command.to_dict() for command in commands]
+        self._command_cache = {command.id: (entry, command)
+                               for command, entry in zip(commands, entries)}
+        self.set_text_commands(entries, auto_save)
+        if self.get_command_storage() != 'sqlite':
+            with self._lock:
+                self._commands = (entries, list(commands))
+    
     def get_auto_save(self):
         """Get auto-save preference"""
         return self.get('user_preferences', 'auto_save', True)
@@ -187,9 +651,63 @@ class Config:
         """Set confirm-on-exit preference"""
         self.set('user_preferences', 'confirm_on_exit', confirm, True)
 
-# Global configuration instance
-_config = Config()
+def new_command_id():
+    """Generate a unique id for a text command"""
+    import uuid
+    return uuid.uuid4().hex[:12]
+
+def _has_own_ids(commands):
+    """True when every command is an object with an id no other command has"""
+    try:
+        ids = {cmd['id'] for cmd in commands}
+    except (KeyError, TypeError):
+        return False
+    return len(ids) == len(commands) and all(ids)
+
+def ensure_command_ids(commands, previous_ids=None):
+    """Give every command without an id, or with a duplicate one, a new id
+    
+    ``previous_ids`` maps list positions to ids generated on an earlier
+    read; a command without an id takes the one for its position unless a
+    command in the list has it. Otherwise a missing id is derived from the
+    command's content, so a command added to settings.json by hand gets the
+    same id each time the file is read. A repeated id is replaced by one
+    derived from the content and the list position, which is just as stable.
+    Entries that are not objects are left for validation to report.
+    """
+    if _has_own_ids(commands):
+        return commands
+    import hashlib
+    def derived_id(cmd, salt=''):
+        content = json.dumps(cmd, sort_keys=True, ensure_ascii=False) + salt
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=6).hexdigest()
+    
+    explicit = {cmd.get('id') for cmd in commands if isinstance(cmd, dict)} if previous_ids else ()
+    seen = set()
+    for index, cmd in enumerate(commands):
+        if not isinstance(cmd, dict):
+            continue
+        if not cmd.get('id') and previous_ids and index in previous_ids and previous_ids[index] not in explicit:
+            cmd['id'] = previous_ids[index]
+        if not cmd.get('id'):
+            cmd['id'] = derived_id(cmd)
+        attempt = 0
+        while cmd['id'] in seen:
+            attempt += 1
+            cmd['id'] = derived_id(cmd, f"#{index}.{attempt}")
+        seen.add(cmd['id'])
+    return commands
+
+# Global configuration instance, created on first use so that importing
+# this module neither touches the disk nor parses settings.json
+_config = None
+_config_lock = threading.Lock()
 
 def get_config():
     """Get global configuration instance"""
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                _config = Config()
     return _config
\ No newline at end of file
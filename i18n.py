@@ -1,9 +1,16 @@
 import json
 import os
+import threading
 from pathlib import Path
 
 class I18n:
-    """Internationalization manager for multi-language support"""
+    """Internationalization manager for multi-language support
+    
+    Language files are loaded on demand: only the current language and the
+    English fallback are ever read from disk. Each language is flattened once
+    into a table of dotted keys merged over English, so ``t()`` is a single
+    dict lookup.
+    """
     
     def __init__(self, default_language='en'):
         self.current_language = default_language
@@ -12,39 +19,68 @@ class I18n:
             'en': 'English',
             'es': 'Español'
         }
-        self.load_languages()
+        # Flat translation tables per language, and the keys whose text is a
+        # valid format template
+        self._tables = {}
+        self._templates = {}
+        self._table = None
+        self._current_templates = None
         
     def load_languages(self):
         """Load all available language files"""
+        for lang_code in self.available_languages.keys():
+            self.load_language(lang_code)
+    
+    def load_language(self, lang_code):
+        """Load one language file unless it is already loaded"""
+        if lang_code in self.languages:
+            return self.languages[lang_code]
+        
         lang_dir = Path(__file__).parent / 'lang'
+        lang_file = lang_dir / f"{lang_code}.json"
         
-        if not lang_dir.exists():
-            # If lang directory doesn't exist, create it and use fallback
-            lang_dir.mkdir(exist_ok=True)
-            self.languages = self._get_fallback_languages()
-            return
-            
-        for lang_code in self.available_languages.keys():
-            lang_file = lang_dir / f"{lang_code}.json"
-            
-            try:
-                if lang_file.exists():
-                    with open(lang_file, 'r', encoding='utf-8') as f:
-                        self.languages[lang_code] = json.load(f)
-                else:
-                    # Use fallback if file doesn't exist
-                    self.languages[lang_code] = self._get_fallback_language(lang_code)
-                    
-            except (json.JSONDecodeError, FileNotFoundError) as e:
-                print(f"Error loading language {lang_code}: {e}")
+        try:
+            if lang_file.exists():
+                with open(lang_file, 'r', encoding='utf-8') as f:
+                    self.languages[lang_code] = json.load(f)
+            else:
+                # Use fallback if file doesn't exist
                 self.languages[lang_code] = self._get_fallback_language(lang_code)
+                
+        except (json.JSONDecodeError, FileNotFoundError) as e:
+            print(f"Error loading language {lang_code}: {e}")
+            self.languages[lang_code] = self._get_fallback_language(lang_code)
+        return self.languages[lang_code]
     
-    def _get_fallback_languages(self):
-        """Fallback languages if files are not available"""
-        return {
-            'en': self._get_fallback_language('en'),
-            'es': self._get_fallback_language('es')
-        }
+    def _flatten(self, data, prefix=''):
+        """Flatten nested translation dicts into {'section.key': text}"""
+        flat = {}
+        for key, value in data.items():
+            if isinstance(value, dict):
+                flat.update(self._flatten(value, f"{prefix}{key}."))
+            elif isinstance(value, str):
+                flat[prefix + key] = value
+        return flat
+    
+    def _is_template(self, text):
+        """Check that text parses as a format string with at least one field"""
+        import string
+        try:
+            return any(field is not None for _, field, _, _ in string.Formatter().parse(text))
+        except ValueError:
+            print(f"Invalid translation template: {text!r}")
+            return False
+    
+    def load_table(self, lang_code):
+        """Build (once) the flat table of a language, merged over English"""
+        if lang_code not in self._tables:
+            table = {}
+            if lang_code != 'en':
+                table.update(self.load_table('en'))
+            table.update(self._flatten(self.load_language(lang_code)))
+            self._templates[lang_code] = {key for key, text in table.items() if self._is_template(text)}
+            self._tables[lang_code] = table
+        return self._tables[lang_code]
     
     def _get_fallback_language(self, lang_code):
         """Get fallback language data"""
@@ -71,6 +107,10 @@ class I18n:
         """Set the current language"""
         if language_code in self.available_languages:
             self.current_language = language_code
+            # Templates first, so t() never sees a table without them
+            table = self.load_table(language_code)
+            self._current_templates = self._templates[language_code]
+            self._table = table
             return True
         return False
     
@@ -93,85 +133,55 @@ class I18n:
         Returns:
             str: Translated string or key_path if not found
         """
-        try:
-            # Get the current language data
-            lang_data = self.languages.get(self.current_language, {})
-            
-            # Navigate through the nested dictionary
-            keys = key_path.split('.')
-            value = lang_data
-            
-            for key in keys:
-                if isinstance(value, dict) and key in value:
-                    value = value[key]
-                else:
-                    # Fallback to English if key not found in current language
-                    if self.current_language != 'en':
-                        return self._get_english_fallback(key_path, *args)
-                    return key_path  # Return key path if not found
-            
-            # Format string with arguments if provided
-            if args and isinstance(value, str):
-                try:
-                    return value.format(*args)
-                except (IndexError, ValueError):
-                    # If formatting fails, return unformatted string
-                    return value
-            
-            return value if isinstance(value, str) else key_path
-            
-        except Exception as e:
-            print(f"Translation error for key '{key_path}': {e}")
-            return key_path
-    
-    def _get_english_fallback(self, key_path, *args):
-        """Get English translation as fallback"""
-        try:
-            eng_data = self.languages.get('en', {})
-            keys = key_path.split('.')
-            value = eng_data
-            
-            for key in keys:
-                if isinstance(value, dict) and key in value:
-                    value = value[key]
-                else:
-                    return key_path
-            
-            if args and isinstance(value, str):
-                try:
-                    return value.format(*args)
-                except (IndexError, ValueError):
-                    return value
-                    
-            return value if isinstance(value, str) else key_path
-            
-        except Exception:
+        table = self._table
+        if table is None:
+            self.set_language(self.current_language)
+            table = self._table
+        
+        text = table.get(key_path)
+        if text is None:
             return key_path
+        
+        # Format string with arguments if provided
+        if args and key_path in self._current_templates:
+            try:
+                return text.format(*args)
+            except (IndexError, KeyError, ValueError):
+                # If formatting fails, return unformatted string
+                return text
+        return text
     
     def get_language_name(self, language_code=None):
         """Get the display name of a language"""
         code = language_code or self.current_language
         return self.available_languages.get(code, code)
 
-# Global instance
-_i18n = I18n()
+# Global instance, created on first use so that importing this module reads
+# no language files
+_i18n = None
+_i18n_lock = threading.Lock()
 
 def t(key_path, *args):
     """Global translation function"""
-    return _i18n.t(key_path, *args)
+    return get_i18n().t(key_path, *args)
 
 def set_language(language_code):
     """Global function to set language"""
-    return _i18n.set_language(language_code)
+    return get_i18n().set_language(language_code)
 
 def get_language():
     """Global function to get current language"""
-    return _i18n.get_language()
+    return get_i18n().get_language()
 
 def get_available_languages():
     """Global function to get available languages"""
-    return _i18n.get_available_languages()
+    return get_i18n().get_available_languages()
 
 def get_i18n():
     """Get the global i18n instance"""
+    global _i18n
+    if _i18n is None:
+        with _i18n_lock:
+            if _i18n is None:
+                _i18n = I18n()
     return _i18n
\ No newline at end of file
@@ -0,0 +1,131 @@
+import itertools
+import queue
+import threading
+import time
+
+from scheduler import LatenessHistogram
+
+# Job priorities, lower runs first
+PRIORITY_MANUAL = 0
+PRIORITY_SCHEDULED = 10
+
+
+class InputJob:
+    """One unit of work for the input arbiter"""
+
+    def __init__(self, fn, args, priority, on_done, submitted_at):
+        self.fn = fn
+        self.args = args
+        self.priority = priority
+        self.on_done = on_done
+        self.submitted_at = submitted_at
+        self.started_at = None
+        self.result = None
+        self.error = None
+        self.cancelled = False
+        self.done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Waits for the job to finish and returns its result"""
+        self.done.wait(timeout)
+        return self.result
+
+
+class InputArbiter:
+    """Single thread that owns all keyboard and focus injection
+
+    Producers (the scheduler, manual triggers) submit jobs to a bounded
+    priority queue; the arbiter runs them one at a time so two producers can
+    never type into the desktop at once. A full queue blocks producers
+    (backpressure) until there is room or their timeout expires.
+    """
+
+    _STOP = object()
+
+    def __init__(self, maxsize=64, clock=time.perf_counter):
+        self.clock = clock
+        self._queue = queue.PriorityQueue(maxsize)
+        self._counter = itertools.count()
+        self._thread = None
+        self.wait_times = LatenessHistogram()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self):
+        """Number of jobs waiting in the queue"""
+        return self._queue.qsize()
+
+    def start(self):
+        """Starts the arbiter thread if it is not running"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='input-arbiter', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Cancels pending jobs and stops the arbiter thread"""
+        self.cancel_pending()
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put((float('inf'), next(self._counter), self._STOP))
+            self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, fn, *args, priority=PRIORITY_SCHEDULED, on_done=None, block=True, timeout=None):
+        """Queues ``fn(*args)`` and returns its InputJob
+
+        Raises ``queue.Full`` when the queue stays full for ``timeout``
+        seconds, or at once when ``block`` is false. ``on_done(job)`` runs on
+        the arbiter thread after the job finishes.
+        """
+        job = InputJob(fn, args, priority, on_done, self.clock())
+        try:
+            self._queue.put((priority, next(self._counter), job), block, timeout)
+        except queue.Full:
+            self.rejected += 1
+            raise
+        self.submitted += 1
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        return job
+
+    def cancel_pending(self):
+        """Drops every queued job that has not started yet"""
+        while True:
+            try:
+                _, _, job = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if job is self._STOP:
+                continue
+            job.cancelled = True
+            self.cancelled += 1
+            job.done.set()
+
+    def _run(self):
+        """Runs queued jobs one at a time until stopped"""
+        while True:
+            _, _, job = self._queue.get()
+            if job is self._STOP:
+                return
+            job.started_at = self.clock()
+            self.wait_times.record(job.started_at - job.submitted_at)
+            try:
+                job.result = job.fn(*job.args)
+                self.completed += 1
+            except Exception as e:
+                job.error = e
+                self.failed += 1
+            if job.on_done is not None:
+                try:
+                    job.on_done(job)
+                except Exception as e:
+                    print(f"Error in input job callback: {e}")
+            job.done.set()
+
+    def summary(self):
+        """Returns a one-line summary of queue depth and wait times"""
+        return (f"depth {self.depth} (max {self.max_depth}), {self.completed} done, "
+                f"{self.failed} failed, {self.rejected} rejected, wait {self.wait_times.summary()}")
@@ -0,0 +1,269 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+from scheduler import LatenessHistogram
+
+# Phases of one execution, in order: window lookup, bringing it to the front,
+# Enter plus the open delay, typing or pasting, and the Enter that sends it
+PHASE_RESOLVE = 'resolve'
+PHASE_FOCUS = 'focus'
+PHASE_OPEN = 'open'
+PHASE_TYPE = 'type'
+PHASE_SUBMIT = 'submit'
+PHASES = (PHASE_RESOLVE, PHASE_FOCUS, PHASE_OPEN, PHASE_TYPE, PHASE_SUBMIT)
+
+# Execution outcomes
+RESULT_OK = 'ok'
+RESULT_WINDOW_NOT_FOUND = 'window_not_found'
+RESULT_FOCUS_FAILED = 'focus_failed'
+RESULT_WRITE_FAILED = 'write_failed'
+RESULTS = (RESULT_OK, RESULT_WINDOW_NOT_FOUND, RESULT_FOCUS_FAILED, RESULT_WRITE_FAILED)
+
+PREFIX = 'auto_text_writer'
+# Command text is cut to this length in metric labels
+LABEL_TEXT_LIMIT = 80
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Histogram bucket bounds as exported, in seconds
+BUCKET_BOUNDS = [f'{bound / 1000:g}' for bound in LatenessHistogram.BOUNDS_MS]
+
+
+class PhaseTimer:
+    """Times the phases of one execution
+
+    ``mark(phase)`` charges the time since the previous mark (or since the
+    timer was created) to that phase.
+    """
+
+    __slots__ = ('durations', '_last')
+
+    def __init__(self):
+        self.durations = {}
+        self._last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.durations[phase] = self.durations.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def ms(self, phase):
+        """Milliseconds charged to a phase so far"""
+        return self.durations.get(phase, 0.0) * 1000
+
+    def total_ms(self):
+        return sum(self.durations.values()) * 1000
+
+    def breakdown(self):
+        """Formats the phases timed so far for a log line"""
+        return ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in self.durations.items())
+
+
+class CommandMetrics:
+    """Phase histograms and outcome counters of one command"""
+
+    __slots__ = ('text', 'phases', 'total', 'results')
+
+    def __init__(self, text):
+        self.text = text
+        self.phases = {phase: LatenessHistogram() for phase in PHASES}
+        self.total = LatenessHistogram()
+        self.results = dict.fromkeys(RESULTS, 0)
+
+
+def escape_label(value):
+    """Escapes a Prometheus label value"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def histogram_lines(name, labels, histogram):
+    """Prometheus sample lines of one histogram, in seconds"""
+    count, total_ms, cumulative = histogram.cumulative()
+    lines = [f'{name}_bucket{{{labels}le="{bound}"}} {hits}' for bound, hits in zip(BUCKET_BOUNDS, cumulative)]
+    lines.append(f'{name}_bucket{{{labels}le="+Inf"}} {count}')
+    labels = labels.rstrip(',')
+    lines.append(f'{name}_sum{{{labels}}} {total_ms / 1000!r}' if labels else f'{name}_sum {total_ms / 1000!r}')
+    lines.append(f'{name}_count{{{labels}}} {count}' if labels else f'{name}_count {count}')
+    return lines
+
+
+class ExecutionMetrics:
+    """Per-command latency breakdown of every execution, kept in memory
+
+    Front ends time each execution with a PhaseTimer and ``record`` it with
+    its outcome. The metrics render in the Prometheus text format, and can be
+    exported continuously to a file (for node_exporter's textfile collector)
+    and on a local HTTP endpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.commands = {}  # command id -> CommandMetrics
+        self.phases = {phase: LatenessHistogram() for phase in PHASES}  # every command together
+        # Other histograms exported as they are: name -> (help, LatenessHistogram)
+        self.histograms = {}
+        self._changed = threading.Event()
+        self._export_stop = threading.Event()
+        self._export_thread = None
+        self._server = None
+
+    def add_histogram(self, name, help_text, histogram):
+        """Exports another histogram, such as the scheduler's lateness"""
+        self.histograms[name] = (help_text, histogram)
+
+    def record(self, command, timer, result):
+        """Records one execution of ``command`` timed by ``timer``"""
+        with self._lock:
+            text = command.text[:LABEL_TEXT_LIMIT]
+            metrics = self.commands.get(command.id)
+            if metrics is None:
+                metrics = self.commands[command.id] = CommandMetrics(text)
+            metrics.text = text
+            metrics.results[result] += 1
+        for phase, seconds in timer.durations.items():
+            metrics.phases[phase].record(seconds)
+            self.phases[phase].record(seconds)
+        if result == RESULT_OK:
+            metrics.total.record(sum(timer.durations.values()))
+        self._changed.set()
+
+    def summary(self):
+        """Returns a one-line summary of the mean time of each phase"""
+        parts = []
+        for phase in PHASES:
+            histogram = self.phases[phase]
+            if histogram.count:
+                parts.append(f"{phase} {histogram.total / histogram.count:.1f}ms")
+        return ", ".join(parts) if parts else "no executions yet"
+
+    def render(self):
+        """Returns every metric in the Prometheus text exposition format
+
+        Phase buckets are exported for all commands together; per command,
+        each phase exports its sum and count, and only the total duration
+        of an execution keeps its buckets, so the output stays small with
+        thousands of commands.
+        """
+        with self._lock:
+            commands = [(f'command="{escape_label(command_id)}"', metrics)
+                        for command_id, metrics in self.commands.items()]
+            texts = [escape_label(metrics.text) for _, metrics in commands]
+
+        name = f'{PREFIX}_command_info'
+        lines = [f'# HELP {name} Text of each command id', f'# TYPE {name} gauge']
+        lines += [f'{name}{{{label},text="{text}"}} 1' for (label, _), text in zip(commands, texts)]
+
+        name = f'{PREFIX}_executions_total'
+        lines += [f'# HELP {name} Executions of each command by outcome', f'# TYPE {name} counter']
+        for label, metrics in commands:
+            lines += [f'{name}{{{label},result="{result}"}} {count}'
+                      for result, count in metrics.results.items() if count or result == RESULT_OK]
+
+        name = f'{PREFIX}_phase_seconds'
+        lines += [f'# HELP {name} Time spent in each phase of an execution, all commands',
+                  f'# TYPE {name} histogram']
+        for phase, histogram in self.phases.items():
+            lines += histogram_lines(name, f'phase="{phase}",', histogram)
+
+        name = f'{PREFIX}_command_phase_seconds'
+        lines += [f'# HELP {name} Time spent in each phase of an execution, per command',
+                  f'# TYPE {name} summary']
+        for label, metrics in commands:
+            for phase, histogram in metrics.phases.items():
+                count, total_ms, _ = histogram.cumulative()
+                if count:
+                    lines.append(f'{name}_sum{{{label},phase="{phase}"}} {total_ms / 1000!r}')
+                    lines.append(f'{name}_count{{{label},phase="{phase}"}} {count}')
+
+        name = f'{PREFIX}_execution_seconds'
+        lines += [f'# HELP {name} Duration of successful executions, all phases included',
+                  f'# TYPE {name} histogram']
+        for label, metrics in commands:
+            if metrics.total.count:
+                lines += histogram_lines(name, f'{label},', metrics.total)
+
+        for short_name, (help_text, histogram) in self.histograms.items():
+            name = f'{PREFIX}_{short_name}'
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+            lines += histogram_lines(name, '', histogram)
+        lines.append('')
+        return '\n'.join(lines)
+
+    def write_textfile(self, path):
+        """Writes the metrics to a file, replacing it atomically"""
+        path = Path(path)
+        temp_file = path.with_name(path.name + '.tmp')
+        temp_file.write_text(self.render(), encoding='utf-8')
+        os.replace(temp_file, path)
+
+    def start_export(self, textfile=None, port=0, host='127.0.0.1', min_interval=5.0):
+        """Starts exporting to ``textfile`` and on ``http://host:port/metrics``
+
+        Either may be left out. The file is rewritten after executions, at
+        most once every ``min_interval`` seconds; the exporter thread sleeps
+        while nothing runs. Returns the HTTP port, or None.
+        """
+        self.stop_export()
+        self._export_stop.clear()
+        if textfile:
+            self.write_textfile(textfile)
+            self._changed.clear()
+            self._export_thread = threading.Thread(target=self._export_loop, args=(textfile, min_interval),
+                                                   name='metrics-export', daemon=True)
+            self._export_thread.start()
+        if port:
+            # Imported here: http.server alone would double the start-up time
+            from http.server import ThreadingHTTPServer
+            self._server = ThreadingHTTPServer((host, port), self._handler())
+            self._server.daemon_threads = True
+            threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True).start()
+            return self._server.server_address[1]
+        return None
+
+    def stop_export(self):
+        """Stops the exporter thread and the HTTP endpoint"""
+        self._export_stop.set()
+        self._changed.set()
+        if self._export_thread is not None:
+            self._export_thread.join()
+            self._export_thread = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _export_loop(self, textfile, min_interval):
+        """Rewrites the metrics file after executions until export stops"""
+        while True:
+            self._changed.wait()
+            if self._export_stop.is_set():
+                return
+            self._changed.clear()
+            try:
+                self.write_textfile(textfile)
+            except OSError as e:
+                print(f"Error writing metrics file: {e}")
+            if self._export_stop.wait(min_interval):
+                return
+
+    def _handler(self):
+        """Request handler class serving the metrics on /metrics"""
+        from http.server import BaseHTTPRequestHandler
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return MetricsHandler
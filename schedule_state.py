@@ -0,0 +1,127 @@
+import os
+import threading
+from pathlib import Path
+
+
+class ScheduleState:
+    """Append-only record of when each command last fired
+
+    Every fire appends one ``<command id>\\t<wall-clock time>`` line and
+    flushes it, so a crash loses at most the line being written and a torn
+    last line is simply ignored on the next load. A forgotten command is a
+    line with an empty time. The log is compacted to one line per command
+    when it is opened and whenever it grows past ``COMPACT_FACTOR`` lines
+    per tracked command.
+
+    Only one process writes the log: the first to open it holds a lock on
+    ``<log>.lock`` until it closes. Other instances, such as the console
+    next to the GUI, resume from the log but do not record their fires.
+    """
+
+    COMPACT_FACTOR = 4
+    # Never compact logs shorter than this
+    MIN_COMPACT_LINES = 1000
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.last = {}
+        self._lines = 0
+        self._file = None
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._load()
+        if self._acquire():
+            self._compact()
+        else:
+            print(f"{self.path} is in use by another instance; fire times of this run are not saved")
+
+    @property
+    def writable(self):
+        """True while this process records fires in the log"""
+        return self._file is not None
+
+    def _acquire(self):
+        """Takes the lock that makes this process the only writer; False if another one holds it"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self.path.with_name(self.path.name + '.lock'), 'a+')
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _load(self):
+        """Reads the log; later lines win over earlier ones"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    command_id, _, fired_at = line.rstrip('\n').rpartition('\t')
+                    if command_id and not fired_at:
+                        self.last.pop(command_id, None)
+                        continue
+                    try:
+                        self.last[command_id] = float(fired_at)
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+
+    def _compact(self):
+        """Rewrites the log with one line per command and reopens it for appending"""
+        if self._file is not None:
+            self._file.close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.path.with_name(self.path.name + '.tmp')
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.writelines(f"{command_id}\t{fired_at!r}\n" for command_id, fired_at in self.last.items())
+        os.replace(temp_file, self.path)
+        self._lines = len(self.last)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def last_fired(self, command_id):
+        """Wall-clock time a command last fired, or None"""
+        return self.last.get(command_id)
+
+    def record(self, fired):
+        """Appends ``(command id, wall-clock time)`` pairs in one write"""
+        if not fired:
+            return
+        with self._lock:
+            if self._file is None:
+                return
+            for command_id, fired_at in fired:
+                self.last[command_id] = fired_at
+            self._append([f"{command_id}\t{fired_at!r}\n" for command_id, fired_at in fired])
+
+    def forget(self, command_ids):
+        """Drops the records of commands that no longer exist, in the log too"""
+        with self._lock:
+            forgotten = [command_id for command_id in command_ids if self.last.pop(command_id, None) is not None]
+            if forgotten and self._file is not None:
+                self._append([f"{command_id}\t\n" for command_id in forgotten])
+
+    def _append(self, lines):
+        """Writes lines to the log in one write; compacts it once it has grown"""
+        self._file.write(''.join(lines))
+        self._file.flush()
+        self._lines += len(lines)
+        if self._lines > max(self.MIN_COMPACT_LINES, self.COMPACT_FACTOR * len(self.last)):
+            self._compact()
+
+    def close(self):
+        """Closes the log and gives up the writer lock; later records are ignored"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
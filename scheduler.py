@@ -0,0 +1,432 @@
+import bisect
+from array import array
+import itertools
+import math
+import threading
+import time
+
+# Schedule modes: fixed rate keeps slots on a grid anchored to the first fire,
+# fixed delay waits a full interval after each execution finishes
+FIXED_RATE = 'fixed_rate'
+FIXED_DELAY = 'fixed_delay'
+SCHEDULE_MODES = (FIXED_RATE, FIXED_DELAY)
+
+# Missed-fire policies for slots that passed while the process could not run
+CATCH_UP = 'catch_up'
+COALESCE = 'coalesce'
+SKIP = 'skip'
+MISSED_FIRE_POLICIES = (CATCH_UP, COALESCE, SKIP)
+
+
+def interval_seconds(command):
+    """Returns the interval of a command in seconds"""
+    return command.interval_minutes * 60
+
+
+class LatenessHistogram:
+    """Histogram of how late each fire was compared to its slot"""
+
+    # Upper bucket bounds in milliseconds, the last bucket is open-ended
+    BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000, 60000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clears every recorded sample"""
+        with self._lock:
+            self.buckets = [0] * (len(self.BOUNDS_MS) + 1)
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
+
+    def record(self, lateness):
+        """Records the lateness of one fire, in seconds"""
+        lateness_ms = max(lateness, 0.0) * 1000
+        with self._lock:
+            self.buckets[bisect.bisect_left(self.BOUNDS_MS, lateness_ms)] += 1
+            self.count += 1
+            self.total += lateness_ms
+            self.max = max(self.max, lateness_ms)
+
+    def percentile(self, fraction):
+        """Returns the bucket bound (ms) below which the given fraction falls"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = fraction * self.count
+            seen = 0
+            for bound, hits in zip(self.BOUNDS_MS, self.buckets):
+                seen += hits
+                if seen >= target:
+                    return float(bound)
+            return self.max
+
+    def snapshot(self):
+        """Returns the histogram as a plain dictionary"""
+        with self._lock:
+            buckets = {f"le_{bound}ms": hits for bound, hits in zip(self.BOUNDS_MS, self.buckets)}
+            buckets['inf'] = self.buckets[-1]
+            return {
+                'count': self.count,
+                'mean_ms': self.total / self.count if self.count else 0.0,
+                'max_ms': self.max,
+                'buckets': buckets
+            }
+
+    def cumulative(self):
+        """Returns (count, total ms, cumulative count at each bound of BOUNDS_MS)"""
+        with self._lock:
+            return self.count, self.total, list(itertools.accumulate(self.buckets[:-1]))
+
+    def summary(self):
+        """Returns a one-line summary suitable for logs"""
+        if not self.count:
+            return "no executions yet"
+        mean = self.total / self.count
+        return (f"n={self.count} mean={mean:.1f}ms p50<={self.percentile(0.5):.0f}ms "
+                f"p99<={self.percentile(0.99):.0f}ms max={self.max:.1f}ms")
+
+
+class Scheduler:
+    """Priority-queue scheduler shared by the console and GUI front ends
+
+    Commands are kept in a heap keyed on their next due time, so finding the
+    next command to run is O(1) and rescheduling one is O(log n) no matter how
+    many commands are configured. Times come from ``time.monotonic()`` so wall
+    clock changes do not move the schedule.
+
+    Schedule state is stored as parallel arrays indexed by slot (command,
+    due time, sequence number, heap position) and the heap itself is an
+    array of slots, so a scheduled command costs a few machine words rather
+    than a heap entry object. Knowing each slot's heap position lets a
+    command be moved or cancelled in O(log n) without leaving stale entries
+    behind.
+
+    With a ``ScheduleState`` every fire is checkpointed in wall-clock time,
+    and ``resume`` picks the schedule up from there after a restart.
+
+    ``wait`` blocks on a condition until the earliest due time. Scheduling a
+    new earliest command or calling ``interrupt`` wakes it early, so an idle
+    process makes no wakeups and a stop takes effect at once. Pass a
+    ``sleep`` function to wait on a virtual clock instead.
+    """
+
+    def __init__(self, clock=time.monotonic, sleep=None,
+                 schedule_mode=FIXED_RATE, missed_fire_policy=COALESCE, misfire_grace=60.0,
+                 state=None, wall_clock=time.time):
+        self.clock = clock
+        self.sleep = sleep
+        self.state = state
+        self.wall_clock = wall_clock
+        self.schedule_mode = schedule_mode
+        self.missed_fire_policy = missed_fire_policy
+        self.misfire_grace = misfire_grace
+        self.lateness = LatenessHistogram()
+        self._heap = array('q')  # slots ordered as a binary min-heap on (due, seq)
+        self._commands = []      # slot -> command, None for a free slot
+        self._due = array('d')   # slot -> due time
+        self._seq = array('q')   # slot -> scheduling sequence, breaks ties in FIFO order
+        self._pos = array('q')   # slot -> index in the heap
+        self._slots = {}         # id(command) -> slot
+        self._free = []
+        self._counter = itertools.count()
+        # Reentrant, so interrupt() is safe from a signal handler that lands
+        # while the waiting thread holds the lock
+        self._lock = threading.RLock()
+        self._wakeup = threading.Condition(self._lock)
+        self.wakeups = 0  # Times wait() woke up with nothing due
+        self.missed = 0
+
+    def __len__(self):
+        return len(self._slots)
+
+    def mode_of(self, command):
+        """Returns the schedule mode of a command"""
+        return command.schedule_mode or self.schedule_mode
+
+    def policy_of(self, command):
+        """Returns the missed-fire policy of a command"""
+        return command.missed_fire_policy or self.missed_fire_policy
+
+    def schedule(self, command, due):
+        """Schedules a command to fire at the given due time"""
+        with self._lock:
+            self._push(command, due)
+
+    def schedule_in(self, command, seconds):
+        """Schedules a command to fire the given number of seconds from now"""
+        self.schedule(command, self.clock() + seconds)
+
+    def reschedule(self, command, due):
+        """Schedules the fire that follows the one planned for ``due``
+
+        Fixed-rate commands advance on their slot grid, fixed-delay commands
+        wait a full interval from now. When fixed-rate slots have already
+        passed, ``catch_up`` keeps them so they fire back to back while
+        ``coalesce`` and ``skip`` jump to the first slot still ahead.
+        """
+        interval = interval_seconds(command)
+        now = self.clock()
+        if self.mode_of(command) == FIXED_DELAY:
+            self.schedule(command, now + interval)
+            return
+
+        next_due = due + interval
+        if next_due <= now and self.policy_of(command) != CATCH_UP:
+            missed_slots = math.floor((now - due) / interval)
+            self.missed += missed_slots
+            next_due = due + (missed_slots + 1) * interval
+        self.schedule(command, next_due)
+
+    def cancel(self, command):
+        """Removes a command from the schedule"""
+        with self._lock:
+            self._remove_entry(command)
+
+    def apply_changes(self, diff):
+        """Brings the schedule in line with a ``CommandDiff``
+
+        Only the commands in the diff are touched. Removed and disabled
+        commands are cancelled. A changed command keeps its due time,
+        shifted by any change of interval; added or re-enabled commands are
+        due one interval from now.
+        """
+        for command in diff.removed:
+            self.cancel(command)
+        if self.state is not None and diff.removed:
+            try:
+                self.state.forget(command.id for command in diff.removed)
+            except OSError as e:
+                print(f"Error saving schedule state: {e}")
+        for old, new in diff.changed:
+            with self._lock:
+                due = self.due_time(old)
+                self._remove_entry(old)
+                if new.enabled:
+                    if due is None:
+                        due = self.clock() + interval_seconds(new)
+                    else:
+                        due += interval_seconds(new) - interval_seconds(old)
+                    self._push(new, due)
+        for command in diff.added:
+            if command.enabled:
+                self.schedule_in(command, interval_seconds(command))
+
+    def clear(self):
+        """Removes every command from the schedule"""
+        with self._lock:
+            self._heap = array('q')
+            self._commands = []
+            self._due = array('d')
+            self._seq = array('q')
+            self._pos = array('q')
+            self._slots = {}
+            self._free = []
+
+    def _before(self, a, b):
+        """True if slot ``a`` fires before slot ``b``"""
+        due_a, due_b = self._due[a], self._due[b]
+        return due_a < due_b or (due_a == due_b and self._seq[a] < self._seq[b])
+
+    def _place(self, index, slot):
+        self._heap[index] = slot
+        self._pos[slot] = index
+
+    def _sift_up(self, index):
+        heap = self._heap
+        slot = heap[index]
+        while index:
+            parent = (index - 1) >> 1
+            if not self._before(slot, heap[parent]):
+                break
+            self._place(index, heap[parent])
+            index = parent
+        self._place(index, slot)
+
+    def _sift_down(self, index):
+        heap = self._heap
+        size = len(heap)
+        slot = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and self._before(heap[child + 1], heap[child]):
+                child += 1
+            if not self._before(heap[child], slot):
+                break
+            self._place(index, heap[child])
+            index = child
+        self._place(index, slot)
+
+    def _push(self, command, due):
+        """Schedules a command at ``due``, moving it if it is already scheduled"""
+        slot = self._slots.get(id(command))
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+                self._commands[slot] = command
+            else:
+                slot = len(self._commands)
+                self._commands.append(command)
+                self._due.append(0.0)
+                self._seq.append(0)
+                self._pos.append(0)
+            self._slots[id(command)] = slot
+            self._due[slot] = due
+            self._seq[slot] = next(self._counter)
+            self._heap.append(slot)
+            self._sift_up(len(self._heap) - 1)
+        else:
+            self._due[slot] = due
+            self._seq[slot] = next(self._counter)
+            self._sift_up(self._pos[slot])
+            self._sift_down(self._pos[slot])
+        # A new earliest deadline: the waiting thread has to sleep less
+        if self._pos[slot] == 0:
+            self._wakeup.notify_all()
+
+    def _remove_slot(self, slot):
+        """Takes a slot out of the heap and frees it"""
+        index = self._pos[slot]
+        last = self._heap.pop()
+        if last != slot:
+            self._place(index, last)
+            self._sift_up(index)
+            self._sift_down(self._pos[last])
+        del self._slots[id(self._commands[slot])]
+        self._commands[slot] = None
+        self._free.append(slot)
+
+    def _remove_entry(self, command):
+        """Removes a command from the schedule, if it is scheduled"""
+        slot = self._slots.get(id(command))
+        if slot is not None:
+            self._remove_slot(slot)
+
+    def next_due(self):
+        """Returns the due time of the earliest command, or None if empty"""
+        with self._lock:
+            return self._due[self._heap[0]] if self._heap else None
+
+    def due_time(self, command):
+        """Returns the due time of a scheduled command, or None"""
+        slot = self._slots.get(id(command))
+        return self._due[slot] if slot is not None else None
+
+    def pop_due(self, now=None):
+        """Removes and returns (command, due) for every command that is due
+
+        Fires later than ``misfire_grace`` seconds count as missed; commands
+        with the ``skip`` policy are moved to their next slot instead of
+        being returned.
+        """
+        if now is None:
+            now = self.clock()
+        due = []
+        skipped = []
+        with self._lock:
+            while self._heap and self._due[self._heap[0]] <= now:
+                slot = self._heap[0]
+                command = self._commands[slot]
+                slot_due = self._due[slot]
+                self._remove_slot(slot)
+                late = now - slot_due > self.misfire_grace
+                if late and self.policy_of(command) == SKIP:
+                    skipped.append((command, slot_due))
+                else:
+                    due.append((command, slot_due))
+
+        for command, slot in skipped:
+            self.missed += 1
+            self.reschedule(command, slot)
+        for command, slot in due:
+            self.lateness.record(now - slot)
+        self._checkpoint(due, now)
+        return due
+
+    def _checkpoint(self, fired, now):
+        """Records fires in the schedule state, in wall-clock time
+
+        Fixed-rate commands record the slot they fired for, so the grid
+        survives a restart; fixed-delay commands record the time they fired.
+        """
+        if self.state is None or not fired:
+            return
+        offset = self.wall_clock() - now
+        # A full disk or an unwritable log must not stop the schedule itself
+        try:
+            self.state.record([(command.id, (slot if self.mode_of(command) == FIXED_RATE else now) + offset)
+                               for command, slot in fired])
+        except OSError as e:
+            print(f"Error saving schedule state: {e}")
+
+    def resume(self, commands):
+        """Schedules commands from their checkpoints after a (re)start
+
+        A command that fired before is due one interval after that fire, as
+        if the process had kept running; slots that passed in the meantime
+        are handled by its missed-fire policy when they are popped. Returns
+        ``(command, due)`` pairs for commands with no checkpoint, which are
+        due now and recorded as fired.
+        """
+        now = self.clock()
+        offset = self.wall_clock() - now
+        fresh = []
+        for command in commands:
+            last_fired = self.state.last_fired(command.id) if self.state is not None else None
+            if last_fired is None:
+                fresh.append((command, now))
+            else:
+                self.schedule(command, last_fired - offset + interval_seconds(command))
+        self._checkpoint(fresh, now)
+        return fresh
+
+    def wait(self, is_running):
+        """Blocks until the earliest deadline and returns the commands due
+
+        Returns an empty list when ``is_running()`` turns false; call
+        ``interrupt()`` after changing it so a blocked wait notices. On a
+        virtual clock an empty schedule also returns an empty list, since
+        nothing else can add a command while the only thread sleeps.
+        """
+        while True:
+            with self._lock:
+                woken = False
+                while True:
+                    if not is_running():
+                        return []
+                    now = self.clock()
+                    if self._heap and self._due[self._heap[0]] <= now:
+                        remaining = 0.0
+                        break
+                    if woken:
+                        self.wakeups += 1
+                    remaining = self._due[self._heap[0]] - now if self._heap else None
+                    if self.sleep is not None:
+                        break
+                    self._wakeup.wait(min(remaining, threading.TIMEOUT_MAX) if remaining is not None else None)
+                    woken = True
+            # Virtual clocks sleep outside the lock, straight to the deadline
+            if remaining is None:
+                return []
+            if remaining > 0:
+                self.sleep(remaining)
+                continue
+            due = self.pop_due()
+            if due:
+                return due
+
+    def interrupt(self):
+        """Wakes a thread blocked in wait() so it checks ``is_running()`` again"""
+        with self._lock:
+            self._wakeup.notify_all()
+
+    def upcoming(self):
+        """Returns (command, due) pairs ordered by due time"""
+        with self._lock:
+            entries = [(self._due[slot], self._seq[slot], slot) for slot in self._slots.values()]
+            entries.sort()
+            return [(self._commands[slot], slot_due) for slot_due, _, slot in entries]
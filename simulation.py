@@ -0,0 +1,254 @@
+import bisect
+import csv
+import time
+
+from backends import RecordingBackend
+from scheduler import Scheduler, LatenessHistogram, FIXED_RATE, COALESCE
+from typing_engine import TypingEngine, ClipboardPaster, DELIVERY_TYPE
+from window_resolver import WindowResolver, WindowMatcher
+
+DAY = 24 * 60 * 60
+
+
+class VirtualClock:
+    """Clock whose sleep() advances time instantly
+
+    Time starts at ``EPOCH`` rather than 0: all times of a simulation then
+    lie within a factor of two of each other, so subtracting two of them is
+    exact and sleeping until a deadline lands exactly on it. The typing
+    engine relies on that to stop waiting.
+    """
+
+    EPOCH = 1000000.0
+
+    def __init__(self, start=EPOCH):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.now += seconds
+
+
+class Fire:
+    """One simulated execution of a command"""
+
+    __slots__ = ('command', 'due', 'start', 'end', 'blocked_by', 'ok')
+
+    def __init__(self, command, due, start, end, blocked_by, ok):
+        self.command = command
+        self.due = due
+        self.start = start
+        self.end = end
+        self.blocked_by = blocked_by  # Command typing while this one was due, if any
+        self.ok = ok
+
+    @property
+    def lateness(self):
+        """Seconds between the slot and the start of the execution"""
+        return self.start - self.due
+
+    @property
+    def overlapped(self):
+        return self.blocked_by is not None
+
+
+class SimulationResult:
+    """Timeline and statistics of a simulation run"""
+
+    def __init__(self, start, seconds):
+        self.start = start
+        self.seconds = seconds
+        self.fires = []  # Fire records in execution order, if kept
+        self.count = 0
+        self.overlaps = 0
+        self.failures = 0
+        self.busy = 0.0  # Seconds the keyboard was in use
+        self.max_lateness = 0.0
+        self.lateness = LatenessHistogram()
+        self.missed = 0
+        self.elapsed = 0.0  # Real seconds the simulation took
+
+    @property
+    def utilisation(self):
+        """Fraction of the simulated time the keyboard was in use"""
+        return self.busy / self.seconds if self.seconds else 0.0
+
+    def offset(self, moment):
+        """Formats a simulated moment as ``day N HH:MM:SS`` from the start"""
+        seconds = int(moment - self.start)
+        days, seconds = divmod(seconds, DAY)
+        return f"day {days + 1} {seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+    def summary(self):
+        """Returns a short multi-line report"""
+        rate = self.count / self.elapsed if self.elapsed > 0 else 0.0
+        return "\n".join([
+            f"Simulated {self.seconds / DAY:.2f} days in {self.elapsed:.2f} s ({rate:,.0f} fires/s)",
+            f"Fires: {self.count}, failed: {self.failures}, missed slots: {self.missed}",
+            f"Keyboard busy: {self.utilisation * 100:.2f}% of the time",
+            f"Overlaps: {self.overlaps} fires waited for another command to finish typing",
+            f"Lateness: {self.lateness.summary()}"
+        ])
+
+    def write_timeline(self, path):
+        """Writes every kept fire to a CSV file"""
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['due', 'start', 'end', 'lateness_s', 'command_id', 'text', 'ok', 'blocked_by'])
+            for fire in self.fires:
+                writer.writerow([self.offset(fire.due), self.offset(fire.start), self.offset(fire.end),
+                                 f"{fire.lateness:.3f}", fire.command.id, fire.command.text, fire.ok,
+                                 fire.blocked_by.text if fire.blocked_by is not None else ''])
+
+
+class Simulator:
+    """Replays a command schedule on a virtual clock
+
+    The real Scheduler, WindowResolver and TypingEngine run against the
+    recording backend, with every sleep advancing a VirtualClock instead of
+    waiting, so days of schedule take seconds. Executions follow the front
+    ends: commands due together are grouped by window, each execution is
+    focus, Enter, ``open_delay``, typing at ``typing_speed`` and Enter, and
+    commands for the same window are ``inter_message_gap`` apart. One
+    keyboard serialises everything, as the input arbiter does.
+    ``focus_time`` and ``key_overhead`` add the cost a real backend has per
+    focus and per keystroke.
+    """
+
+    def __init__(self, commands, window_title, typing_speed=0.2, open_delay=0.5, inter_message_gap=0.5,
+                 focus_time=0.0, key_overhead=0.0, schedule_mode=FIXED_RATE, missed_fire_policy=COALESCE,
+                 misfire_grace=60.0, delivery_mode=DELIVERY_TYPE, paste_threshold=200):
+        self.commands = [command for command in commands if command.enabled]
+        self.window_title = window_title
+        self.typing_speed = typing_speed
+        self.open_delay = open_delay
+        self.inter_message_gap = inter_message_gap
+        self.focus_time = focus_time
+        self.key_overhead = key_overhead
+        self.delivery_mode = delivery_mode
+
+        self.clock = VirtualClock()
+        self.backend = RecordingBackend(clock=self.clock.time)
+        self.scheduler = Scheduler(clock=self.clock.time, sleep=self.clock.sleep, schedule_mode=schedule_mode,
+                                   missed_fire_policy=missed_fire_policy, misfire_grace=misfire_grace)
+        self.typing_engine = TypingEngine(self.write_char, clock=self.clock.time, sleep=self.clock.sleep,
+                                          paster=ClipboardPaster(self.backend, self.clock.time, self.clock.sleep),
+                                          paste_threshold=paste_threshold)
+        # Deadlines land exactly on virtual time, so there is nothing to spin for
+        self.typing_engine.SPIN_THRESHOLD = 0
+        self.window_resolver = WindowResolver(self.backend)
+
+        # One fake window per target, like a dry run
+        self.matchers = {}
+        titles = set()
+        for command in self.commands:
+            try:
+                matcher = WindowMatcher.from_spec(command.window, window_title)
+            except ValueError:
+                matcher = WindowMatcher(window_title)
+            self.matchers[id(command)] = matcher
+            if matcher.key not in titles:
+                titles.add(matcher.key)
+                spec = command.window if isinstance(command.window, dict) else {}
+                self.backend.add_window(matcher.title, class_name=spec.get('class_name') or '',
+                                        process=spec.get('process') or '')
+
+    def write_char(self, char):
+        self.backend.write_char(char)
+        self.clock.sleep(self.key_overhead)
+
+    def press(self, key):
+        self.backend.press(key)
+        self.clock.sleep(self.key_overhead)
+
+    def execute(self, command, window):
+        """Focuses the window and writes one command, advancing virtual time"""
+        if not self.backend.focus(window, 1.0, self.clock.time, self.clock.sleep):
+            return False
+        self.clock.sleep(self.focus_time)
+        self.press('enter')
+        self.clock.sleep(self.open_delay)
+        result = self.typing_engine.deliver(command.text, self.typing_speed,
+                                            command.delivery or self.delivery_mode)
+        if not result.completed:
+            return False
+        self.press('enter')
+        return True
+
+    def run(self, seconds, timeline=True):
+        """Simulates ``seconds`` of schedule and returns a SimulationResult
+
+        Every enabled command fires at the start, as on a fresh start of
+        the front ends. With ``timeline`` false only the statistics are
+        kept, for very large command sets.
+        """
+        clock = self.clock
+        scheduler = self.scheduler
+        result = SimulationResult(clock.now, seconds)
+        end = clock.now + seconds
+        # Start times and commands of every execution, to find who was typing
+        starts = []
+        running = []
+        started_at = time.perf_counter()
+
+        for command in self.commands:
+            scheduler.schedule(command, clock.now)
+        while True:
+            next_due = scheduler.next_due()
+            if next_due is None or next_due >= end:
+                break
+            # Nothing happens between executions, so jump to the next one
+            if clock.now < next_due:
+                clock.now = next_due
+            due_commands = scheduler.pop_due()
+
+            self.window_resolver.begin_tick()
+            groups = {}
+            for command, due in due_commands:
+                groups.setdefault(self.matchers[id(command)].key, []).append((command, due))
+            for group in groups.values():
+                window = self.window_resolver.resolve(self.matchers[id(group[0][0])])
+                for position, (command, due) in enumerate(group):
+                    if position:
+                        clock.sleep(self.inter_message_gap)
+                    start = clock.now
+                    ok = window is not None and self.execute(command, window)
+                    blocked_by = None
+                    if start > due and starts:
+                        # Whoever started last before the slot held the keyboard
+                        index = bisect.bisect_right(starts, due) - 1
+                        blocked_by = running[index] if index >= 0 else running[0]
+                    starts.append(start)
+                    running.append(command)
+
+                    result.count += 1
+                    result.busy += clock.now - start
+                    result.lateness.record(start - due)
+                    result.max_lateness = max(result.max_lateness, start - due)
+                    if blocked_by is not None:
+                        result.overlaps += 1
+                    if not ok:
+                        result.failures += 1
+                    if timeline:
+                        result.fires.append(Fire(command, due, start, clock.now, blocked_by, ok))
+
+            for command, due in due_commands:
+                scheduler.reschedule(command, due)
+            # Keystrokes are not needed once the batch is accounted for
+            self.backend.clear_events()
+            for window in self.backend.windows:
+                window.typed.clear()
+            if not timeline and len(starts) > 1:
+                del starts[:-1], running[:-1]
+
+        result.missed = scheduler.missed
+        result.elapsed = time.perf_counter() - started_at
+        return result
+
+
+def simulate(commands, window_title, days=7, **settings):
+    """Simulates ``days`` of schedule; ``settings`` are Simulator options"""
+    return Simulator(commands, window_title, **settings).run(days * DAY)
@@ -0,0 +1,155 @@
+import time
+
+# Delivery modes: type character by character, paste through the clipboard,
+# or paste only texts of at least ``paste_threshold`` characters
+DELIVERY_TYPE = 'type'
+DELIVERY_PASTE = 'paste'
+DELIVERY_AUTO = 'auto'
+DELIVERY_MODES = (DELIVERY_TYPE, DELIVERY_PASTE, DELIVERY_AUTO)
+
+
+class TypingResult:
+    """Outcome of typing one text: characters sent, time taken and rate"""
+
+    def __init__(self, chars, elapsed, seconds_per_char, completed=True, method=DELIVERY_TYPE):
+        self.chars = chars
+        self.elapsed = elapsed
+        self.seconds_per_char = seconds_per_char
+        self.completed = completed
+        self.method = method
+        self.fallback = False
+
+    @property
+    def rate(self):
+        """Achieved characters per second"""
+        return self.chars / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def target_rate(self):
+        """Configured characters per second"""
+        return 1.0 / self.seconds_per_char if self.seconds_per_char > 0 else 0.0
+
+    def summary(self):
+        """Returns a one-line summary suitable for logs"""
+        return (f"{self.chars} chars in {self.elapsed:.2f}s "
+                f"({self.rate:.1f} chars/s, target {self.target_rate:.1f})")
+
+
+class ClipboardPaster:
+    """Delivers a whole text with a single paste chord
+
+    The previous clipboard text is restored afterwards. A paste counts as
+    rejected, and ``paste_text`` returns None, when the clipboard cannot be
+    written or read back or the paste chord fails.
+    """
+
+    # Time the target window gets to read the clipboard before it is restored
+    RESTORE_DELAY = 0.05
+
+    def __init__(self, backend, clock=time.perf_counter, sleep=time.sleep):
+        self.backend = backend
+        self.clock = clock
+        self.sleep = sleep
+
+    def _restore(self, previous):
+        """Puts the saved clipboard text back, ignoring failures"""
+        if previous is None:
+            return
+        try:
+            self.backend.set_clipboard(previous)
+        except Exception:
+            pass
+
+    def paste_text(self, text):
+        """Pastes text into the focused window and returns a TypingResult"""
+        start = self.clock()
+        try:
+            previous = self.backend.get_clipboard()
+        except Exception:
+            previous = None
+
+        try:
+            self.backend.set_clipboard(text)
+            if self.backend.get_clipboard() != text:
+                self._restore(previous)
+                return None
+            self.backend.paste()
+        except Exception:
+            self._restore(previous)
+            return None
+
+        elapsed = self.clock() - start
+        self.sleep(self.RESTORE_DELAY)
+        self._restore(previous)
+        return TypingResult(len(text), elapsed, 0.0, method=DELIVERY_PASTE)
+
+
+class TypingEngine:
+    """Types text at a fixed rate by pacing keystrokes against deadlines
+
+    Character ``i`` is sent at ``start + i * seconds_per_char``. Time spent
+    inside the keystroke call itself (for example ``pyautogui.PAUSE``) is
+    absorbed by the next wait instead of being added on top of it, so the
+    configured speed is the speed actually achieved.
+    """
+
+    # Below this many seconds the engine spins instead of sleeping, because
+    # OS sleep granularity would overshoot the deadline
+    SPIN_THRESHOLD = 0.002
+
+    def __init__(self, write_char, clock=time.perf_counter, sleep=time.sleep,
+                 paster=None, paste_threshold=200):
+        self.write_char = write_char
+        self.clock = clock
+        self.sleep = sleep
+        self.paster = paster
+        self.paste_threshold = paste_threshold
+        self.paste_fallbacks = 0
+        self.last_result = None
+
+    def _wait_until(self, deadline):
+        """Waits until the given deadline on the engine clock"""
+        remaining = deadline - self.clock()
+        if remaining > self.SPIN_THRESHOLD:
+            self.sleep(remaining - self.SPIN_THRESHOLD)
+        while self.clock() < deadline:
+            pass
+
+    def type_text(self, text, seconds_per_char, should_continue=None):
+        """Types text one character per slot and returns a TypingResult
+
+        Stops early, with ``completed=False``, when ``should_continue()``
+        returns false.
+        """
+        start = self.clock()
+        sent = 0
+        for index, char in enumerate(text):
+            if should_continue is not None and not should_continue():
+                self.last_result = TypingResult(sent, self.clock() - start, seconds_per_char, False)
+                return self.last_result
+            self._wait_until(start + index * seconds_per_char)
+            self.write_char(char)
+            sent += 1
+
+        # Keep the gap after the last character, like every other one
+        self._wait_until(start + sent * seconds_per_char)
+        self.last_result = TypingResult(sent, self.clock() - start, seconds_per_char)
+        return self.last_result
+
+    def deliver(self, text, seconds_per_char, mode=DELIVERY_TYPE, should_continue=None):
+        """Delivers text by typing or pasting, depending on the mode
+
+        Pastes that the backend rejects fall back to typing.
+        """
+        if mode == DELIVERY_AUTO:
+            mode = DELIVERY_PASTE if len(text) >= self.paste_threshold else DELIVERY_TYPE
+        if mode == DELIVERY_PASTE and self.paster is not None:
+            result = self.paster.paste_text(text)
+            if result is not None:
+                self.last_result = result
+                return result
+            self.paste_fallbacks += 1
+            result = self.type_text(text, seconds_per_char, should_continue)
+            result.fallback = True
+            return result
+        return self.type_text(text, seconds_per_char, should_continue)
@@ -0,0 +1,207 @@
+import re
+import threading
+
+# Title match modes for window matcher specs
+MATCH_EXACT = 'exact'
+MATCH_SUBSTRING = 'substring'
+MATCH_REGEX = 'regex'
+MATCH_MODES = (MATCH_EXACT, MATCH_SUBSTRING, MATCH_REGEX)
+
+
+class WindowMatcher:
+    """Window matcher compiled once from a command's ``window`` spec
+
+    A spec is either a plain title (case-insensitive substring match) or a
+    dict such as ``{"title": "Notepad", "match": "regex",
+    "class_name": "Notepad", "process": "notepad.exe"}``. Class and process
+    filters are optional and only evaluated for windows whose title matches.
+    """
+
+    def __init__(self, title, match=MATCH_SUBSTRING, class_name=None, process=None):
+        if match not in MATCH_MODES:
+            raise ValueError(f"Unknown window match mode: {match}")
+        self.title = title
+        self.match = match
+        self.class_name = class_name or None
+        self.process = process.lower() if process else None
+        self.key = (title, match, self.class_name, self.process)
+
+        if match == MATCH_REGEX:
+            try:
+                self._regex = re.compile(title)
+            except re.error as e:
+                raise ValueError(f"Invalid window title regex '{title}': {e}")
+        else:
+            self._regex = None
+        self._lowered = title.lower()
+
+    @classmethod
+    def from_spec(cls, spec, default_title):
+        """Builds a matcher from a command's ``window`` spec or the default title"""
+        if not spec:
+            return cls(default_title)
+        if isinstance(spec, str):
+            return cls(spec)
+        return cls(spec.get('title', default_title),
+                   spec.get('match', MATCH_SUBSTRING),
+                   spec.get('class_name'),
+                   spec.get('process'))
+
+    def matches_title(self, title):
+        """Checks a window title against the compiled title pattern"""
+        if not title:
+            return False
+        if self.match == MATCH_EXACT:
+            return title == self.title
+        if self.match == MATCH_REGEX:
+            return self._regex.search(title) is not None
+        return self._lowered in title.lower()
+
+    def matches(self, window, window_backend, info=None):
+        """Checks title, class and process filters against a window"""
+        try:
+            title = window.title
+        except Exception:
+            return False
+        if not self.matches_title(title):
+            return False
+        info = info if info is not None else WindowInfo(window, window_backend)
+        if self.class_name is not None and info.class_name != self.class_name:
+            return False
+        if self.process is not None and info.process != self.process:
+            return False
+        return True
+
+    def rank(self, window):
+        """Sort key that makes the choice between duplicate windows deterministic
+
+        Visible windows come first, then exact title matches, then shorter
+        titles, then titles in alphabetical order.
+        """
+        title = window.title or ''
+        return (not window.visible, title.lower() != self._lowered, len(title), title)
+
+    def __str__(self):
+        return self.title
+
+    def __repr__(self):
+        return f"WindowMatcher({self.title!r}, {self.match!r})"
+
+
+class WindowInfo:
+    """Lazily looked-up class and process name of one window"""
+
+    def __init__(self, window, window_backend):
+        self.window = window
+        self.window_backend = window_backend
+        self._class_name = None
+        self._process = None
+
+    @property
+    def class_name(self):
+        if self._class_name is None:
+            self._class_name = self.window_backend.get_window_class(self.window)
+        return self._class_name
+
+    @property
+    def process(self):
+        if self._process is None:
+            self._process = self.window_backend.get_window_process(self.window).lower()
+        return self._process
+
+
+class WindowSnapshot:
+    """One enumeration of the desktop, shared by every lookup in a tick"""
+
+    def __init__(self, window_backend):
+        self.window_backend = window_backend
+        self.windows = window_backend.get_all_windows()
+        self._info = {}
+
+    def info(self, index):
+        """Returns the cached WindowInfo of the window at an index"""
+        info = self._info.get(index)
+        if info is None:
+            info = self._info[index] = WindowInfo(self.windows[index], self.window_backend)
+        return info
+
+    def find_all(self, matcher):
+        """Returns every matching window, best candidate first"""
+        found = [window for index, window in enumerate(self.windows)
+                 if matcher.matches(window, self.window_backend, self.info(index))]
+        found.sort(key=matcher.rank)
+        return found
+
+
+class WindowResolver:
+    """Caches the window resolved for each matcher
+
+    A cached window is reused as long as the backend reports it still exists
+    and it still matches; only then is the enumeration skipped. Misses within
+    one tick share a single WindowSnapshot. ``hits`` and ``misses`` count how
+    often each path ran, ``enumerations`` how many snapshots were taken.
+    ``on_miss(matcher, candidates)`` is called with every candidate found
+    on a miss, best first, e.g. to report duplicate windows.
+    """
+
+    def __init__(self, window_backend, on_miss=None):
+        self.window_backend = window_backend
+        self.on_miss = on_miss
+        self._cache = {}
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.enumerations = 0
+
+    def begin_tick(self):
+        """Drops the current snapshot so the next miss enumerates again"""
+        self._snapshot = None
+
+    def snapshot(self):
+        """Returns the snapshot of the current tick, enumerating if needed"""
+        if self._snapshot is None:
+            self._snapshot = WindowSnapshot(self.window_backend)
+            self.enumerations += 1
+        return self._snapshot
+
+    def _still_matches(self, matcher, window):
+        """Checks that a cached window is alive and still matches"""
+        if not self.window_backend.is_window_valid(window):
+            return False
+        return matcher.matches(window, self.window_backend)
+
+    def resolve(self, matcher):
+        """Returns the window for a matcher, or None"""
+        with self._lock:
+            cached = self._cache.get(matcher.key)
+        if cached is not None and self._still_matches(matcher, cached):
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        candidates = self.snapshot().find_all(matcher)
+        if self.on_miss is not None:
+            self.on_miss(matcher, candidates)
+        window = candidates[0] if candidates else None
+        with self._lock:
+            if window is None:
+                self._cache.pop(matcher.key, None)
+            else:
+                self._cache[matcher.key] = window
+        return window
+
+    def invalidate(self, matcher=None):
+        """Forgets the cached window for a matcher, or every cached window"""
+        with self._lock:
+            if matcher is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(matcher.key, None)
+
+    def summary(self):
+        """Returns a one-line summary of cache hits and misses"""
+        total = self.hits + self.misses
+        ratio = self.hits / total * 100 if total else 0.0
+        return (f"{self.hits} hits / {self.misses} misses ({ratio:.0f}% cached), "
+                f"{self.enumerations} enumerations")